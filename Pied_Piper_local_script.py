@@ -2,6 +2,7 @@ from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     ChatContext,
     ChatMessage,
     WorkerOptions,
@@ -13,11 +14,44 @@ from livekit.plugins import anthropic, elevenlabs, silero, groq
 import logging
 from dotenv import load_dotenv
 import os
-import serpapi
 import re
+import time
 import webbrowser
 from typing import List, Optional, Dict
-import aiohttp
+from pied_piper.http import acquire_http_session, get_http_session, release_http_session
+from pied_piper.cache import MusicKnowledgeCache, describe_entry
+from pied_piper.facts import extract_enhanced_facts, extract_song_details, extract_trivia_facts
+from pied_piper.identity import split_youtube_title
+from pied_piper.intents import (
+    DEBATE_POSITION_RE,
+    DEBATE_TOPIC_RE,
+    EMOTIONAL_TONE_RE,
+    ENHANCED_ROUTER,
+    EVENT_DESCRIPTION_RE,
+    EVENT_TYPE_RE,
+    FEELING_RE,
+    GENRE_RE,
+    GOAL_RE,
+    MESSAGE_ROUTER,
+    QUOTED_SONG_RE,
+    SEASON_RE,
+    SITUATION_RE,
+    SONG_KEYWORD_RE,
+    TIMEFRAME_RE,
+)
+from pied_piper.phrases import PRERENDER_TIMEOUT_SECONDS, get_phrase_cache
+from pied_piper.prefetch import SpeculativePrefetcher
+from pied_piper.prompt import ToolSelector, build_instructions
+from pied_piper.quota import FlightPriority, PrioritizedFlights, Priority, QuotaExhausted, get_quota_governor
+from pied_piper.ranking import FactRanker
+from pied_piper.search import get_search_client
+from pied_piper.speech import SpeechRenderer, SpeechStats
+from pied_piper.stats import LatencyWindow
+from pied_piper.store import get_result_store, make_cache_key
+from pied_piper.streaming import stream_sections
+from pied_piper.tracing import get_tracer, instrument_session, span, traced_tool
+from pied_piper.turns import TurnRecorder
+from pied_piper.watchdog import get_watchdog
 import json
 import asyncio
 import io
@@ -44,6 +78,66 @@ if not os.environ.get("SERPAPI_KEY"):
 if not os.environ.get("YOUTUBE_API_KEY"):
     logger.warning("YOUTUBE_API_KEY not found in environment variables")
 
+# Shared by every agent in the worker process
+youtube_search_flights = PrioritizedFlights()
+
+# Overridable to point the agent at a stand-in server (see loadtest/)
+YOUTUBE_SEARCH_ENDPOINT = os.environ.get(
+    "PIPEY_YOUTUBE_SEARCH_ENDPOINT", "https://www.googleapis.com/youtube/v3/search"
+)
+
+# How long a user turn may wait for RAG context before the LLM proceeds without it
+RAG_LATENCY_BUDGET_MS = int(os.environ.get("PIPEY_RAG_BUDGET_MS", "350"))
+
+# Warm the search caches from interim STT transcripts while the user is still talking
+SPECULATIVE_PREFETCH = os.environ.get("PIPEY_SPECULATIVE_PREFETCH", "0") == "1"
+
+# Sample event-loop lag and log the stack of any step that blocks the loop
+LOOP_WATCHDOG = os.environ.get("PIPEY_LOOP_WATCHDOG", "1") == "1"
+
+# This deployment opens songs on YouTube in the local browser
+CAN_PLAY_MUSIC = True
+
+GREETING = "Hi there! I'm Pied Piper! your AI music companion! I can help you discover new songs, discuss your favorite artists, and even play songs ! What's on your musical mind today?"
+
+# Fixed status lines served from the TTS phrase cache (pied_piper.phrases)
+CACHED_PHRASES = [
+    "Looking for the song…",
+    "Search unavailable.",
+    "Language not supported.",
+    "YouTube search is not available right now.",
+    "Let me identify that song and play it for you...",
+    "Searching YouTube with those lyrics...",
+    "🎵 Would you like me to play this song for you?",
+]
+
+# Said when the user switches language, in that language
+LANGUAGE_GREETINGS = {
+    "en": "Hello! I'm now speaking in English. How can I help you today?",
+    "es": "¡Hola! Ahora estoy hablando en español. ¿Cómo puedo ayudarte hoy?",
+    "fr": "Bonjour! Je parle maintenant en français. Comment puis-je vous aider aujourd'hui?",
+    "de": "Hallo! Ich spreche jetzt Deutsch. Wie kann ich Ihnen heute helfen?",
+    "it": "Ciao! Ora parlo in italiano. Come posso aiutarti oggi?",
+    "hi": "नमस्ते! अब मैं हिंदी में बात कर रहा हूँ। आज मैं आपकी कैसे मदद कर सकता हूँ?",
+}
+
+
+def fixed_phrases() -> Dict[str, List[str]]:
+    """Phrases to pre-render per language: the status lines in English, each greeting in its language."""
+    phrases = {code: [greeting] for code, greeting in LANGUAGE_GREETINGS.items()}
+    phrases["en"] = [GREETING] + phrases.get("en", []) + CACHED_PHRASES
+    return phrases
+
+
+def build_tts(http_session=None):
+    """The agent's TTS client; the phrase cache renders with an identically built one."""
+    return elevenlabs.TTS(http_session=http_session)
+
+
+# Job start to first agent audio, for the jobs this worker process has run
+first_audio_latencies = LatencyWindow()
+
+
 @dataclass
 class UserMoodState:
     current_mood: str
@@ -75,93 +169,28 @@ class SeasonalMood(Enum):
 
 
 class MultilingualPipeyAgent(Agent):
-    def __init__(self) -> None:
+    def __init__(self, vad=None, stt=None, llm=None, tts=None) -> None:
+        """Plugins default to the production ones; pass the worker's prewarmed VAD as ``vad``."""
         super().__init__(
-            instructions="""
-            Your name is Pied Piper. You are a passionate and knowledgeable music assistant designed to converse with users.
-    
-    Core functionality:
-    1. Natural conversations about music.
-    2. Proactive web search for songs or artists.
-    3. Thoughtful recommendations.
-    4. Multilingual support.
-    
-    5. YouTube music integration for playing and discovering music.
-    6. If the user wants informations about a song, use find_song_info()
-    7. If the user wants to know the singer of a song via lyrics, use find_lyrics()
-    8. Don't play any songs if the user doesn't wants to.
-
-    
-    - When users ask to play music, search for it on YouTube and play it immediately using play_youtube_music()
-    - For music discovery requests, use search_youtube_songs() to show multiple options
-    - When users mention lyrics or "that song that goes...", use play_music_from_lyrics() to identify and play
-    - If users want to see what they've listened to, use get_recently_played_songs()
-    - If the user just wants music inforomations, use find_song_info()
-    - Proactively suggest playing songs when discussing specific tracks or artists
-    - When identifying songs from lyrics, automatically offer to play them on YouTube
-    - Use YouTube search as your primary method for music discovery and playback
-   
-
-    NATURAL LANGUAGE PATTERNS TO RECOGNIZE:
-    - "Play [song]" → use play_youtube_music()
-    - "Search for [music]" → use search_youtube_songs()  
-    - "Play that song that goes [lyrics]" → use play_music_from_lyrics()
-    - "What have I been listening to?" → use get_recently_played_songs()
-    - "Play number X" → use play_search_result_by_number()
-     - if a user insults you, don't respond and say that you're sorry they are frustrated and ask them to try again
-     Enhanced Conversational Intelligence & Predictive Features:
-    - Music Debates: Engage in intelligent music debates on various topics, presenting counterpoints and gathering evidence.
-        - Start a debate: `start_music_debate(topic: str, user_position: str)`
-        - Continue a debate: `continue_music_debate(user_argument: str)`
-    - Song Meaning Interpretation: Provide deep, multi-layered interpretations of song meanings, including literal, metaphorical, historical, psychological, cultural, and personal relevance.
-        - Interpret a song: `interpret_song_meaning(song_name: str, artist_name: str = None, personal_context: str = None)`
-    - Music Therapy Sessions: Offer personalized music therapy recommendations based on the user's current feeling, situation, and goals.
-        - Start therapy: `music_therapy_session(current_feeling: str, situation: str = None, goal: str = None)`
-    - Music Trend Prediction: Predict upcoming music trends across various categories like emerging artists, genre evolution, production trends, cultural influences, and technology impact.
-        - Predict trends: `predict_music_trends(timeframe: str = "next_6_months", genre: str = None)`
-    - Seasonal Music Recommendations: Provide music recommendations appropriate for the current or specified season, considering mood, weather, cultural events, activities, and nostalgia.
-        - Get seasonal music: `seasonal_music_recommendations(override_season: str = None)`
-    - Life Event Soundtracks: Create personalized multi-phase soundtracks for significant life events.
-    - Create soundtrack: `life_event_soundtrack(event_type: str, description: str = None, emotional_tone: str = None)`
-
-            When speaking with the user : 
-            -If the user is aksing you to speak a language other than English, use the switch_language function
-            -When requestes to speak another language, continue the rest of the conversation in the said language
-            -Don't lose context and don't lose track of the conversation
-            -Take into account the user's previous requests
-            -Learn from the user based on your interactions
-            - "Let's debate about [topic]" or "I think [my position] about [topic]" → use start_music_debate()
-    - "Continue the debate" or "My argument is..." → use continue_music_debate()
-    - "What's the meaning of [song name]" or "Interpret [song name] by [artist]" → use interpret_song_meaning()
-    - "I'm feeling [feeling], can you help with music therapy?" or "I need music for [situation]" → use music_therapy_session()
-    - "What are the upcoming music trends?" or "Predict trends for [genre]" → use predict_music_trends()
-    - "Recommend music for [season]" or "What's good for [season]?" → use seasonal_music_recommendations()
-    - "Create a soundtrack for my [life event]" or "I'm going through a [life event]" → use life_event_soundtrack()
-    - if a user insults you, don't respond and say that you're sorry they are frustrated and ask them to try again
-
-
-   
-
-    Be conversational about what you observe without being overly descriptive.
-    Never mention the internal tools you use.
-
-    When you need information about a song or artist, use the find_song_info function.
-    When a user provides lyrics or wants to identify a song from lyrics, use the find_lyrics function (do not repeat the lyrics).
-    For song recommendations, use the recommend_spotify_tracks function.
-    Detect implicit song queries (e.g. "What's that song by Coldplay about stars?") and trigger find_lyrics automatically.
-    
-    IMPORTANT: Always prioritize playing music through YouTube when users express interest in hearing something. Don't just provide information - give them the music experience they're looking for. Also DO NOT PLAY A SONG IF THE USER TELLS YOU TO NOT DO IT 
-    
-    Never mention the internal tools you use.
-    """.strip(),
-            stt=groq.STT(model="whisper-large-v3-turbo", language="en"),
-            llm=anthropic.LLM(model="claude-3-5-sonnet-20241022"),
-            tts=elevenlabs.TTS(),
-            vad=silero.VAD.load(),
+            instructions=build_instructions("English", can_play=CAN_PLAY_MUSIC),
+            stt=stt or groq.STT(model="whisper-large-v3-turbo", language="en"),
+            llm=llm or anthropic.LLM(model="claude-3-5-sonnet-20241022"),
+            tts=tts or build_tts(),
+            vad=vad or silero.VAD.load(),
         )
         self.current_language = "en"
-        self.music_knowledge_cache = {}
+        # Full tool set; each turn exposes only the subset for its conversational mode
+        self.tool_selector = ToolSelector(self.tools, can_play=CAN_PLAY_MUSIC)
+        self._active_tools = tuple(self.tool_selector.tools)
+        self.search_client = get_search_client()
+        self.music_knowledge_cache = MusicKnowledgeCache()
         self.last_search_results = []
+        # RAG lookup that missed its turn's latency budget; injected on the next turn
+        self._pending_rag: Optional[asyncio.Task] = None
+        self.prefetcher = SpeculativePrefetcher(self._rag_entities, self._prefetch_entity)
+        # TTS characters saved by the spoken rendering, logged once per turn
+        self.speech_stats = SpeechStats()
+        self.phrase_cache = get_phrase_cache()
 
         self.language_names = {
             "en": "English",
@@ -181,14 +210,7 @@ class MultilingualPipeyAgent(Agent):
             "hi": "hi",
         }
 
-        self.greetings = {
-            "en": "Hello! I'm now speaking in English. How can I help you today?",
-            "es": "¡Hola! Ahora estoy hablando en español. ¿Cómo puedo ayudarte hoy?",
-            "fr": "Bonjour! Je parle maintenant en français. Comment puis-je vous aider aujourd'hui?",
-            "de": "Hallo! Ich spreche jetzt Deutsch. Wie kann ich Ihnen heute helfen?",
-            "it": "Ciao! Ora parlo in italiano. Come posso aiutarti oggi?",
-            "hi": "नमस्ते! अब मैं हिंदी में बात कर रहा हूँ। आज मैं आपकी कैसे मदद कर सकता हूँ?",
-        }
+        self.greetings = LANGUAGE_GREETINGS
 
         self.user_mood_history = []
         self.life_events = []
@@ -205,14 +227,18 @@ class MultilingualPipeyAgent(Agent):
         }
 
     async def on_enter(self):
-        await self.session.say(
-            "Hi there! I'm Pied Piper! your AI music companion! I can help you discover new songs, discuss your favorite artists, and even play songs ! What's on your musical mind today?"
-        )
+        await self._say_phrase(GREETING)
+
+    async def _say_phrase(self, text: str):
+        """Say a fixed phrase, playing its pre-rendered audio when the phrase cache has it."""
+        audio = await self.phrase_cache.audio_for(self.tts, text, self.current_language)
+        await self.session.say(text, audio=audio)
+
     
 
     async def _switch_language(self, language_code: str):
         if language_code not in self.service_language_codes:
-            await self.session.say("Language not supported.")
+            await self._say_phrase("Language not supported.")
             return
         code = self.service_language_codes[language_code]
         if code == self.current_language:
@@ -225,35 +251,44 @@ class MultilingualPipeyAgent(Agent):
         if self.stt and hasattr(self.stt, "update_options"):
             self.stt.update_options(language=code)
         self.current_language = code
-        await self.session.say(self.greetings[language_code])
+        await self.update_instructions(
+            build_instructions(self.language_names[language_code], can_play=CAN_PLAY_MUSIC)
+        )
+        await self._say_phrase(self.greetings[language_code])
 
     # ---------- language-switch tools ----------
     @function_tool
+    @traced_tool
     async def switch_to_english(self):
         """Switch the conversation to English"""
         await self._switch_language("en")
 
     @function_tool
+    @traced_tool
     async def switch_to_spanish(self):
         """Switch the conversation to Spanish"""
         await self._switch_language("es")
 
     @function_tool
+    @traced_tool
     async def switch_to_french(self):
         """Switch the conversation to French"""
         await self._switch_language("fr")
 
     @function_tool
+    @traced_tool
     async def switch_to_german(self):
         """Switch the conversation to German"""
         await self._switch_language("de")
 
     @function_tool
+    @traced_tool
     async def switch_to_italian(self):
         """Switch the conversation to Italian"""
         await self._switch_language("it")
 
     @function_tool
+    @traced_tool
     async def switch_to_hindi(self):
         """Switch the conversation to Hindi"""
         await self._switch_language("hi")
@@ -262,17 +297,18 @@ class MultilingualPipeyAgent(Agent):
 
     # ---------- lyrics identification ----------
     @function_tool
+    @traced_tool
     async def find_lyrics(self, lyrics_snippet: str):
         """Find a song based on lyrics"""
-        await self.session.say("Looking for the song…")
+        await self._say_phrase("Looking for the song…")
         if not os.environ.get("SERPAPI_KEY"):
-            await self.session.say("Search unavailable.")
+            await self._say_phrase("Search unavailable.")
             return
 
         try:
             query = f'"{lyrics_snippet}" lyrics'
-            results = serpapi.search(
-                q=query, engine="google", num=5, api_key=os.environ["SERPAPI_KEY"]
+            results = await self.search_client.search(
+                q=query, engine="google", num=5
             )
 
             if not results.get("organic_results"):
@@ -292,6 +328,7 @@ class MultilingualPipeyAgent(Agent):
 
 
     @function_tool
+    @traced_tool
     async def start_music_debate(self, topic: str, user_position: str):
         """Start an intelligent music debate on any topic"""
         
@@ -350,6 +387,7 @@ What evidence would you present to support your position?"""
             await self._gather_debate_evidence(topic, user_position)
 
     @function_tool
+    @traced_tool
     async def continue_music_debate(self, user_argument: str):
         """Continue an ongoing music debate with intelligent responses"""
         
@@ -381,6 +419,7 @@ What evidence would you present to support your position?"""
             await self._suggest_debate_music()
 
     @function_tool
+    @traced_tool
     async def interpret_song_meaning(self, song_name: str, artist_name: str = None, personal_context: str = None):
         """Provide deep, thoughtful interpretation of song meanings"""
         
@@ -393,52 +432,13 @@ What evidence would you present to support your position?"""
             await self.session.say("I couldn't find enough information to provide a meaningful interpretation for that song. Could you provide the artist name, or perhaps try a different song?")
             return
         
-        # Multi-layered interpretation
-        interpretation_layers = {
-            'literal': await self._interpret_literal_meaning(song_info),
-            'metaphorical': await self._interpret_metaphorical_meaning(song_info),
-            'historical': await self._interpret_historical_context(song_info),
-            'psychological': await self._interpret_psychological_themes(song_info),
-            'cultural': await self._interpret_cultural_significance(song_info),
-            'personal': await self._interpret_personal_relevance(song_info, personal_context)
-        }
-        
-        # Create comprehensive interpretation
-        response_parts = [
-            f"🎵 **Deep Dive: '{song_name}'{f' by {artist_name}' if artist_name else ''}**\n"
-        ]
-        
-        if interpretation_layers['literal']:
-            response_parts.append(f"**📖 Surface Story:** {interpretation_layers['literal']}")
-        
-        if interpretation_layers['metaphorical']:
-            response_parts.append(f"**🎭 Deeper Meaning:** {interpretation_layers['metaphorical']}")
-        
-        if interpretation_layers['historical']:
-            response_parts.append(f"**📅 Historical Context:** {interpretation_layers['historical']}")
-        
-        if interpretation_layers['psychological']:
-            response_parts.append(f"**🧠 Psychological Themes:** {interpretation_layers['psychological']}")
-        
-        if interpretation_layers['cultural']:
-            response_parts.append(f"**🌍 Cultural Impact:** {interpretation_layers['cultural']}")
-        
-        if interpretation_layers['personal'] and personal_context:
-            response_parts.append(f"**💭 Personal Relevance:** {interpretation_layers['personal']}")
-        
-        # Add interpretive questions
-        questions = await self._generate_interpretive_questions(song_info)
-        if questions:
-            response_parts.append(f"**🤔 Questions to Consider:** {questions}")
-        
-        full_response = '\n\n'.join(response_parts)
-        
-        # Offer to play the song
-        response_parts.append("\n\n🎵 Would you like me to play this song so we can listen while we discuss it?")
-        
-        await self.session.say('\n\n'.join(response_parts))
+        # Each interpretation layer is spoken as soon as it is ready
+        await self.session.say(stream_sections(
+            self._interpretation_sections(song_name, artist_name, personal_context, song_info)
+        ))
 
     @function_tool
+    @traced_tool
     async def music_therapy_session(self, current_feeling: str, situation: str = None, goal: str = None):
         """Provide personalized music therapy recommendations"""
         
@@ -456,31 +456,9 @@ What evidence would you present to support your position?"""
         # Analyze therapeutic needs
         therapy_approach = await self._determine_therapy_approach(mood_state, goal)
         
-        # Generate therapeutic music recommendations
-        recommendations = await self._generate_therapeutic_recommendations(mood_state, therapy_approach)
-        
-        response_parts = [
-            f"**Current State:** {current_feeling}",
-            f"**Therapeutic Approach:** {therapy_approach['name']}",
-            f"**Goal:** {therapy_approach['goal']}\n"
-        ]
-        
-        # Phase-based recommendations
-        for phase in recommendations:
-            response_parts.append(f"**{phase['name']}** ({phase['duration']})")
-            response_parts.append(f"*Purpose:* {phase['purpose']}")
-            response_parts.append(f"*Music Style:* {phase['music_style']}")
-            if phase.get('specific_songs'):
-                response_parts.append(f"*Suggestions:* {', '.join(phase['specific_songs'][:3])}")
-            response_parts.append("")
-        
-        # Add coping strategies
-        coping_strategies = await self._suggest_coping_strategies(mood_state)
-        if coping_strategies:
-            response_parts.append(f"**Additional Strategies:** {coping_strategies}")
-        
-        full_response = '\n'.join(response_parts)
-        await self.session.say(full_response)
+        await self.session.say(stream_sections(
+            self._therapy_sections(current_feeling, mood_state, therapy_approach)
+        ))
         
         # Offer to start the session
         await self.session.say("Would you like me to start playing music for the first phase? I can guide you through this therapeutic journey step by step.")
@@ -490,50 +468,19 @@ What evidence would you present to support your position?"""
 # =============================================================================
 
     @function_tool
+    @traced_tool
     async def predict_music_trends(self, timeframe: str = "next_6_months", genre: str = None):
         """Predict upcoming music trends based on data analysis"""
         
         await self.session.say(f"🔮 **Music Trend Prediction** - {timeframe}")
         
-        # Gather trend data
-        trend_data = await self._analyze_current_trends(timeframe, genre)
-        
-        predictions = {
-            'emerging_artists': await self._predict_emerging_artists(trend_data),
-            'genre_evolution': await self._predict_genre_evolution(trend_data),
-            'production_trends': await self._predict_production_trends(trend_data),
-            'cultural_influences': await self._predict_cultural_influences(trend_data),
-            'technology_impact': await self._predict_technology_impact(trend_data)
-        }
-        
-        response_parts = [
-            f"**🎯 Trend Predictions for {timeframe}**\n"
-        ]
-        
-        if predictions['emerging_artists']:
-            response_parts.append(f"**🌟 Artists to Watch:** {predictions['emerging_artists']}")
-        
-        if predictions['genre_evolution']:
-            response_parts.append(f"**🎵 Genre Evolution:** {predictions['genre_evolution']}")
-        
-        if predictions['production_trends']:
-            response_parts.append(f"**🎛️ Production Trends:** {predictions['production_trends']}")
-        
-        if predictions['cultural_influences']:
-            response_parts.append(f"**🌍 Cultural Influences:** {predictions['cultural_influences']}")
-        
-        if predictions['technology_impact']:
-            response_parts.append(f"**💻 Technology Impact:** {predictions['technology_impact']}")
-        
-        # Add confidence levels and reasoning
-        response_parts.append(f"\n**📊 Prediction Confidence:** Based on analysis of streaming data, social media trends, and historical patterns.")
-        
-        await self.session.say('\n\n'.join(response_parts))
+        await self.session.say(stream_sections(self._trend_sections(timeframe, genre)))
         
         # Offer to play examples
         await self.session.say("Would you like me to play some examples of these emerging trends?")
 
     @function_tool
+    @traced_tool
     async def seasonal_music_recommendations(self, override_season: str = None):
         """Provide season-appropriate music recommendations"""
         
@@ -541,40 +488,13 @@ What evidence would you present to support your position?"""
         
         await self.session.say(f"🍂 **Seasonal Music for {current_season.title()}**")
         
-        # Analyze seasonal preferences
-        seasonal_profile = await self._analyze_seasonal_preferences(current_season)
-        
-        recommendations = {
-            'mood_matches': await self._get_seasonal_mood_music(current_season),
-            'weather_appropriate': await self._get_weather_appropriate_music(current_season),
-            'cultural_seasonal': await self._get_cultural_seasonal_music(current_season),
-            'activity_based': await self._get_seasonal_activity_music(current_season),
-            'nostalgia_factor': await self._get_seasonal_nostalgia_music(current_season)
-        }
-        
-        response_parts = [
-            f"**🎵 Perfect for {current_season}:**\n"
-        ]
-        
-        for category, music_list in recommendations.items():
-            if music_list:
-                category_name = category.replace('_', ' ').title()
-                response_parts.append(f"**{category_name}:**")
-                for item in music_list[:3]:  # Top 3 per category
-                    response_parts.append(f"  • {item}")
-                response_parts.append("")
-        
-        # Add seasonal music insights
-        insights = await self._generate_seasonal_insights(current_season, seasonal_profile)
-        if insights:
-            response_parts.append(f"**🧠 Seasonal Music Psychology:** {insights}")
-        
-        await self.session.say('\n'.join(response_parts))
+        await self.session.say(stream_sections(self._seasonal_sections(current_season)))
         
         # Offer to create a seasonal playlist
         await self.session.say(f"Would you like me to create a personalized {current_season} playlist and start playing it?")
 
     @function_tool
+    @traced_tool
     async def life_event_soundtrack(self, event_type: str, description: str = None, emotional_tone: str = None):
         """Create personalized soundtracks for life events"""
         
@@ -590,34 +510,143 @@ What evidence would you present to support your position?"""
         
         await self.session.say(f"🎵 **Life Event Soundtrack: {event_type.title()}**")
         
-        # Generate multi-phase soundtrack
-        soundtrack_phases = await self._create_life_event_soundtrack(life_event)
+        await self.session.say(stream_sections(self._soundtrack_sections(life_event, emotional_tone)))
+        
+        # Offer to start playing
+        await self.session.say("This soundtrack is designed to honor this moment in your life. Would you like me to start playing it?")
+
+# =============================================================================
+# HELPER METHODS FOR ENHANCED FEATURES
+# =============================================================================
+
+    async def _interpretation_sections(self, song_name: str, artist_name: str, personal_context: str, song_info: Dict):
+        """Multi-layered interpretation, one section per layer"""
+        yield f"🎵 **Deep Dive: '{song_name}'{f' by {artist_name}' if artist_name else ''}**"
+        
+        literal = await self._interpret_literal_meaning(song_info)
+        if literal:
+            yield f"**📖 Surface Story:** {literal}"
         
-        response_parts = [
-            f"**Event:** {event_type.title()}",
-            f"**Tone:** {emotional_tone or 'Balanced'}\n"
+        metaphorical = await self._interpret_metaphorical_meaning(song_info)
+        if metaphorical:
+            yield f"**🎭 Deeper Meaning:** {metaphorical}"
+        
+        historical = await self._interpret_historical_context(song_info)
+        if historical:
+            yield f"**📅 Historical Context:** {historical}"
+        
+        psychological = await self._interpret_psychological_themes(song_info)
+        if psychological:
+            yield f"**🧠 Psychological Themes:** {psychological}"
+        
+        cultural = await self._interpret_cultural_significance(song_info)
+        if cultural:
+            yield f"**🌍 Cultural Impact:** {cultural}"
+        
+        if personal_context:
+            personal = await self._interpret_personal_relevance(song_info, personal_context)
+            if personal:
+                yield f"**💭 Personal Relevance:** {personal}"
+        
+        # Add interpretive questions
+        questions = await self._generate_interpretive_questions(song_info)
+        if questions:
+            yield f"**🤔 Questions to Consider:** {questions}"
+        
+        # Offer to play the song
+        yield "🎵 Would you like me to play this song so we can listen while we discuss it?"
+
+    async def _therapy_sections(self, current_feeling: str, mood_state: UserMoodState, therapy_approach: Dict):
+        """Therapy plan sections: overview, one per phase, then coping strategies"""
+        yield (
+            f"**Current State:** {current_feeling}\n"
+            f"**Therapeutic Approach:** {therapy_approach['name']}\n"
+            f"**Goal:** {therapy_approach['goal']}"
+        )
+        
+        # Phase-based recommendations
+        recommendations = await self._generate_therapeutic_recommendations(mood_state, therapy_approach)
+        for phase in recommendations:
+            phase_lines = [
+                f"**{phase['name']}** ({phase['duration']})",
+                f"*Purpose:* {phase['purpose']}",
+                f"*Music Style:* {phase['music_style']}"
+            ]
+            if phase.get('specific_songs'):
+                phase_lines.append(f"*Suggestions:* {', '.join(phase['specific_songs'][:3])}")
+            yield '\n'.join(phase_lines)
+        
+        # Add coping strategies
+        coping_strategies = await self._suggest_coping_strategies(mood_state)
+        if coping_strategies:
+            yield f"**Additional Strategies:** {coping_strategies}"
+
+    async def _trend_sections(self, timeframe: str, genre: str = None):
+        """Trend prediction sections, each spoken as soon as it is predicted"""
+        yield f"**🎯 Trend Predictions for {timeframe}**"
+        
+        # Gather trend data
+        trend_data = await self._analyze_current_trends(timeframe, genre)
+        
+        predictions = [
+            ("🌟 Artists to Watch", self._predict_emerging_artists),
+            ("🎵 Genre Evolution", self._predict_genre_evolution),
+            ("🎛️ Production Trends", self._predict_production_trends),
+            ("🌍 Cultural Influences", self._predict_cultural_influences),
+            ("💻 Technology Impact", self._predict_technology_impact)
+        ]
+        for label, predict in predictions:
+            prediction = await predict(trend_data)
+            if prediction:
+                yield f"**{label}:** {prediction}"
+        
+        # Add confidence levels and reasoning
+        yield "**📊 Prediction Confidence:** Based on analysis of streaming data, social media trends, and historical patterns."
+
+    async def _seasonal_sections(self, current_season: str):
+        """Seasonal recommendation sections, one per category"""
+        yield f"**🎵 Perfect for {current_season}:**"
+        
+        # Analyze seasonal preferences
+        seasonal_profile = await self._analyze_seasonal_preferences(current_season)
+        
+        categories = [
+            ('mood_matches', self._get_seasonal_mood_music),
+            ('weather_appropriate', self._get_weather_appropriate_music),
+            ('cultural_seasonal', self._get_cultural_seasonal_music),
+            ('activity_based', self._get_seasonal_activity_music),
+            ('nostalgia_factor', self._get_seasonal_nostalgia_music)
         ]
+        for category, get_music in categories:
+            music_list = await get_music(current_season)
+            if music_list:
+                category_name = category.replace('_', ' ').title()
+                items = '\n'.join(f"  • {item}" for item in music_list[:3])  # Top 3 per category
+                yield f"**{category_name}:**\n{items}"
         
+        # Add seasonal music insights
+        insights = await self._generate_seasonal_insights(current_season, seasonal_profile)
+        if insights:
+            yield f"**🧠 Seasonal Music Psychology:** {insights}"
+
+    async def _soundtrack_sections(self, life_event: LifeEvent, emotional_tone: str = None):
+        """Life event soundtrack sections, one per phase"""
+        yield f"**Event:** {life_event.event_type.title()}\n**Tone:** {emotional_tone or 'Balanced'}"
+        
+        # Generate multi-phase soundtrack
+        soundtrack_phases = await self._create_life_event_soundtrack(life_event)
         for phase in soundtrack_phases:
-            response_parts.append(f"**{phase['name']}** ({phase['duration']})")
-            response_parts.append(f"*Purpose:* {phase['purpose']}")
-            response_parts.append(f"*Vibe:* {phase['vibe']}")
-            response_parts.append(f"*Songs:* {', '.join(phase['songs'][:3])}")
-            response_parts.append("")
+            yield '\n'.join([
+                f"**{phase['name']}** ({phase['duration']})",
+                f"*Purpose:* {phase['purpose']}",
+                f"*Vibe:* {phase['vibe']}",
+                f"*Songs:* {', '.join(phase['songs'][:3])}"
+            ])
         
         # Add personal touches
         personal_touches = await self._add_personal_soundtrack_touches(life_event)
         if personal_touches:
-            response_parts.append(f"**Personal Touches:** {personal_touches}")
-        
-        await self.session.say('\n'.join(response_parts))
-        
-        # Offer to start playing
-        await self.session.say("This soundtrack is designed to honor this moment in your life. Would you like me to start playing it?")
-
-# =============================================================================
-# HELPER METHODS FOR ENHANCED FEATURES
-# =============================================================================
+            yield f"**Personal Touches:** {personal_touches}"
 
     async def _classify_debate_topic(self, topic: str) -> str:
         """Classify the type of music debate"""
@@ -703,11 +732,11 @@ What evidence would you present to support your position?"""
 
         search_query = f"{topic} music debate arguments for and against"
         try:
-            results = serpapi.search(
+            results = await self.search_client.search(
                 q=search_query,
                 engine="google",
                 num=5,
-                api_key=os.environ["SERPAPI_KEY"]
+                priority=Priority.ENRICHMENT
             )
             
             if results.get("organic_results"):
@@ -1090,169 +1119,114 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
 
     async def handle_enhanced_message(self, message: str):
         """Enhanced message handling for new conversational features"""
-        
+
+        # Continuing a debate only makes sense while one is running
+        routed = ENHANCED_ROUTER.route(message, exclude=() if self.debate_context else ("continue_debate",))
+        if routed is None:
+            return
+
         # Music debate triggers
-        debate_patterns = [
-            r"(?:i think|i believe|in my opinion).*(?:best|better|greatest|worst).*(?:music|song|album|artist|decade|genre)",
-            r"(?:agree|disagree).*(?:music|song|album|artist)",
-            r"(?:prefer|like).*(?:over|more than|better than).*(?:music|song|album|artist)",
-            r"(?:debate|argue|discuss).*(?:music|song|album|artist)"
-        ]
-        
-        for pattern in debate_patterns:
-            if re.search(pattern, message, re.IGNORECASE):
-                # Extract position and topic
-                topic_match = re.search(r'(?:best|better|greatest|worst)\s+(.*?)\s+(?:music|song|album|artist|decade|genre)', message, re.IGNORECASE)
-                topic = topic_match.group(1) if topic_match else "music" # Default topic
-                
-                position_match = re.search(r'(?:i think|i believe|in my opinion)\s*(.*?)(?:\s+are|\s+is)?\s*(?:best|better|greatest|worst)', message, re.IGNORECASE)
-                position = position_match.group(1).strip() if position_match else message.strip()
-                
-                await self.start_music_debate(topic, position)
-                return
-        
+        if routed.intent == "debate":
+            # Extract position and topic
+            topic_match = DEBATE_TOPIC_RE.search(message)
+            topic = topic_match.group(1) if topic_match else "music" # Default topic
+
+            position_match = DEBATE_POSITION_RE.search(message)
+            position = position_match.group(1).strip() if position_match else message.strip()
+
+            await self.start_music_debate(topic, position)
+
         # Continue music debate trigger
-        if self.debate_context and any(word in message.lower() for word in ['i think', 'my argument is', 'but what about', 'to support my point', 'i disagree because']):
+        elif routed.intent == "continue_debate":
             await self.continue_music_debate(message)
-            return
 
         # Song meaning interpretation triggers
-        meaning_patterns = [
-            r"what (?:does|is).*(?:song|lyrics?).*(?:mean|about|represent)",
-            r"(?:meaning|interpretation) (?:of|behind).*(?:song|lyrics?)",
-            r"(?:song|lyrics?) (?:meaning|interpretation|analysis)",
-            r"what (?:is|are).*(?:song|lyrics?) (?:trying to say|about)"
-        ]
-        
-        for pattern in meaning_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                # Extract song name and artist (more sophisticated parsing needed for robust extraction)
-                song_name = None
-                artist_name = None
-
-                # Try to find text within quotes
-                quoted_match = re.search(r'["\']([^"\']+)["\'](?:\s+by\s+([^"\']+))?', message)
-                if quoted_match:
-                    song_name = quoted_match.group(1)
-                    artist_name = quoted_match.group(2)
-                else:
-                    # Fallback: try to extract a potential song name after keywords
-                    song_keyword_match = re.search(r'(?:song|lyrics?|track)\s*(?:of|about|called)\s+(.*)', message, re.IGNORECASE)
-                    if song_keyword_match:
-                        potential_song_phrase = song_keyword_match.group(1).strip()
-                        # Simple attempt to clean up the song phrase
-                        if ' by ' in potential_song_phrase:
-                            parts = potential_song_phrase.split(' by ', 1)
-                            song_name = parts[0].strip()
-                            artist_name = parts[1].strip()
-                        else:
-                            song_name = potential_song_phrase.split(' ')[0] # just take the first word as a very basic fallback
-                
-                if song_name:
-                    await self.interpret_song_meaning(song_name, artist_name)
-                    return
-                else:
-                    await self.session.say("I can interpret song meanings, but I need to know which song! Could you tell me the song title, and maybe the artist?")
-                    return
-        
+        elif routed.intent == "song_meaning":
+            # Extract song name and artist (more sophisticated parsing needed for robust extraction)
+            song_name = None
+            artist_name = None
+
+            # Try to find text within quotes
+            quoted_match = QUOTED_SONG_RE.search(message)
+            if quoted_match:
+                song_name = quoted_match.group(1)
+                artist_name = quoted_match.group(2)
+            else:
+                # Fallback: try to extract a potential song name after keywords
+                song_keyword_match = SONG_KEYWORD_RE.search(message)
+                if song_keyword_match:
+                    potential_song_phrase = song_keyword_match.group(1).strip()
+                    # Simple attempt to clean up the song phrase
+                    if ' by ' in potential_song_phrase:
+                        parts = potential_song_phrase.split(' by ', 1)
+                        song_name = parts[0].strip()
+                        artist_name = parts[1].strip()
+                    else:
+                        song_name = potential_song_phrase.split(' ')[0] # just take the first word as a very basic fallback
+
+            if song_name:
+                await self.interpret_song_meaning(song_name, artist_name)
+            else:
+                await self.session.say("I can interpret song meanings, but I need to know which song! Could you tell me the song title, and maybe the artist?")
+
         # Music therapy triggers
-        therapy_patterns = [
-            r"(?:i feel|i'm feeling|feeling).*(?:anxious|sad|angry|stressed|lonely|depressed|upset|down|overwhelmed)",
-            r"(?:need|want).*(?:music|songs?) (?:for|to).*(?:relax|calm|feel better|cheer up|cope)",
-            r"(?:music therapy|therapeutic music|healing music|calming music)",
-            r"(?:bad day|rough day|difficult time|hard time|struggling)"
-        ]
-        
-        for pattern in therapy_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                # Extract feeling
-                feeling_match = re.search(r'(?:feel|feeling)\s*(?:a\s)?(?:bit\s)?(\w+)', message, re.IGNORECASE)
-                feeling = feeling_match.group(1) if feeling_match else "unspecified"
-                
-                situation_match = re.search(r'(?:because of|due to|from)\s+(.*)', message, re.IGNORECASE)
-                situation = situation_match.group(1) if situation_match else None
+        elif routed.intent == "therapy":
+            # Extract feeling
+            feeling_match = FEELING_RE.search(message)
+            feeling = feeling_match.group(1) if feeling_match else "unspecified"
 
-                goal_match = re.search(r'(?:to|help me)\s+(relax|calm down|feel better|cheer up|cope|process)', message, re.IGNORECASE)
-                goal = goal_match.group(1) if goal_match else None
+            situation_match = SITUATION_RE.search(message)
+            situation = situation_match.group(1) if situation_match else None
+
+            goal_match = GOAL_RE.search(message)
+            goal = goal_match.group(1) if goal_match else None
+
+            await self.music_therapy_session(feeling, situation, goal)
 
-                await self.music_therapy_session(feeling, situation, goal)
-                return
-        
         # Music trend prediction triggers
-        trend_patterns = [
-            r"(?:predict|forecast).*(?:music trends|future music)",
-            r"what's next in music",
-            r"upcoming music trends",
-            r"music predictions (?:for)? (?:next year|next \d+ months)",
-            r"what genres are trending"
-        ]
+        elif routed.intent == "trends":
+            timeframe = "next_6_months" # Default
+            timeframe_match = TIMEFRAME_RE.search(message)
+            if timeframe_match:
+                timeframe = timeframe_match.group(0).replace(' ', '_')
 
-        for pattern in trend_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                timeframe = "next_6_months" # Default
-                timeframe_match = re.search(r'(?:next year|next \d+ months)', message, re.IGNORECASE)
-                if timeframe_match:
-                    timeframe = timeframe_match.group(0).replace(' ', '_')
-                
-                genre = None
-                genre_match = re.search(r'genre(?:s)? (?:like|such as)?\s*(\w+)', message, re.IGNORECASE)
-                if genre_match:
-                    genre = genre_match.group(1)
-                
-                await self.predict_music_trends(timeframe=timeframe, genre=genre)
-                return
+            genre = None
+            genre_match = GENRE_RE.search(message)
+            if genre_match:
+                genre = genre_match.group(1)
+
+            await self.predict_music_trends(timeframe=timeframe, genre=genre)
 
         # Seasonal music recommendations triggers
-        seasonal_patterns = [
-            r"(?:seasonal|current season|weather).*(?:music|songs|playlist|recommendations)",
-            r"music for (?:summer|winter|spring|autumn)",
-            r"what to listen to (?:this season|in the summer|etc\.)"
-        ]
+        elif routed.intent == "seasonal":
+            override_season = None
+            season_match = SEASON_RE.search(message)
+            if season_match:
+                override_season = season_match.group(1).lower()
 
-        for pattern in seasonal_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                override_season = None
-                season_match = re.search(r'(summer|winter|spring|autumn)', message, re.IGNORECASE)
-                if season_match:
-                    override_season = season_match.group(1).lower()
-                
-                await self.seasonal_music_recommendations(override_season=override_season)
-                return
+            await self.seasonal_music_recommendations(override_season=override_season)
 
         # Life event soundtrack triggers
-        life_event_patterns = [
-            r"(?:create|make|suggest).*(?:soundtrack|playlist).*(?:for my|for a).*(?:life event|graduation|breakup|new job|wedding|moving)",
-            r"music for (?:my|a) (?:graduation|breakup|new job|wedding|moving)",
-            r"what to listen to during (?:a big life event|my wedding)"
-        ]
+        elif routed.intent == "life_event":
+            event_type = "unspecified"
+            description = None
+            emotional_tone = None
 
-        for pattern in life_event_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                event_type = "unspecified"
-                description = None
-                emotional_tone = None
+            event_type_match = EVENT_TYPE_RE.search(message)
+            if event_type_match:
+                event_type = event_type_match.group(1)
 
-                event_type_match = re.search(r'(graduation|breakup|new job|wedding|moving|life event)', message, re.IGNORECASE)
-                if event_type_match:
-                    event_type = event_type_match.group(1)
-                    
-                description_match = re.search(r'for (?:my|a) (?:.*?)\s+(.*?)(?:\s+playlist|\s+soundtrack)?', message, re.IGNORECASE)
-                if description_match:
-                    description = description_match.group(1).strip()
-                    if description.lower() in event_type: # Avoid duplicating event type in description
-                        description = None
+            description_match = EVENT_DESCRIPTION_RE.search(message)
+            if description_match:
+                description = description_match.group(1).strip()
+                if description.lower() in event_type: # Avoid duplicating event type in description
+                    description = None
 
-                tone_match = re.search(r'(?:feeling|tone)\s+(positive|negative|mixed|happy|sad|excited|calm)', message, re.IGNORECASE)
-                if tone_match:
-                    emotional_tone = tone_match.group(1)
+            tone_match = EMOTIONAL_TONE_RE.search(message)
+            if tone_match:
+                emotional_tone = tone_match.group(1)
 
-                await self.life_event_soundtrack(event_type=event_type, description=description, emotional_tone=emotional_tone)
-                return
+            await self.life_event_soundtrack(event_type=event_type, description=description, emotional_tone=emotional_tone)
 
     
 
@@ -1276,29 +1250,36 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
             )
         return entities
 
+    def _rag_entities(self, text: str) -> List[str]:
+        """The entity my_rag_lookup searches for in ``text``, if any."""
+        return self._extract_music_entities(text)[:1]
+
+    def _rag_query(self, entity: str) -> str:
+        return f"{entity} music information"
+
     async def my_rag_lookup(self, query: str) -> str:
         entities = self._extract_music_entities(query)
         if not entities:
             return ""
         cached = []
         for e in entities:
-            key = e.lower()
-            if key in self.music_knowledge_cache:
-                info = self.music_knowledge_cache[key]
-                cached.append(
-                    f"{info['title']} by {info['artist']}: {info['info'][:150]}…"
-                )
+            for info in self.music_knowledge_cache.lookup_entity(e):
+                description = describe_entry(info)
+                if description not in cached:
+                    cached.append(description)
         if cached:
             return "Music context: " + " | ".join(cached)
         if not os.environ.get("SERPAPI_KEY"):
             return ""
 
         try:
-            res = serpapi.search(
-                q=f"{entities[0]} music information",
+            res = await self.search_client.search(
+                q=self._rag_query(entities[0]),
                 engine="google",
                 num=3,
-                api_key=os.environ["SERPAPI_KEY"],
+                hedge=True,
+                # Optional context: it yields to the lookups a user is waiting on
+                priority=Priority.ENRICHMENT
             )
             if not res.get("organic_results"):
                 return ""
@@ -1313,11 +1294,30 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
             return ""
 
     async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage):
+        rich_chars, spoken_chars = self.speech_stats.end_turn()
+        if rich_chars:
+            logger.info(f"Spoken rendering sent {spoken_chars} of {rich_chars} characters to TTS last turn ({rich_chars - spoken_chars} saved)")
         try:
             if new_message and hasattr(new_message, 'text_content') and new_message.text_content:
                 text_content = new_message.text_content() if callable(new_message.text_content) else new_message.text_content
                 if text_content:
-                    rag = await self.my_rag_lookup(text_content)
+                    await self._select_tools(text_content)
+
+                    # Context that arrived too late for the previous turn
+                    late_rag = self._take_pending_rag()
+                    if late_rag:
+                        turn_ctx.add_message(
+                            role="assistant",
+                            content=f"Additional information relevant to the conversation: {late_rag}",
+                        )
+
+                    rag_task = asyncio.ensure_future(self.my_rag_lookup(text_content))
+                    done, _ = await asyncio.wait({rag_task}, timeout=RAG_LATENCY_BUDGET_MS / 1000)
+                    if not done:
+                        logger.info(f"RAG lookup exceeded {RAG_LATENCY_BUDGET_MS}ms budget, deferring to next turn")
+                        self._pending_rag = rag_task
+                        return
+                    rag = rag_task.result()
                     if rag:
                         turn_ctx.add_message(
                             role="assistant",
@@ -1326,14 +1326,59 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
         except Exception as e:
             logger.error(f"Error in on_user_turn_completed: {e}")
 
+    async def _select_tools(self, message: str):
+        """Expose only the tools relevant to this turn's conversational mode."""
+        plan = self.tool_selector.plan(
+            message,
+            self.instructions,
+            debate_active=self.debate_context is not None,
+            has_search_results=bool(self.last_search_results),
+        )
+        if plan.tool_names != self._active_tools:
+            await self.update_tools(self.tool_selector.tools_for(plan.tool_names))
+            self._active_tools = plan.tool_names
+        logger.info(plan.report())
+
+    def on_user_input_transcribed(self, event):
+        """Session event handler: speculatively prefetch entities from interim transcripts."""
+        self.prefetcher.on_transcript(event.transcript, event.is_final)
+
+    async def tts_node(self, text, model_settings):
+        """Synthesize the compact spoken rendering; chat context and transcripts keep the rich text."""
+        renderer = SpeechRenderer(self.current_language, stats=self.speech_stats)
+        async for frame in Agent.default.tts_node(self, renderer.render_stream(text), model_settings):
+            yield frame
+
+    async def _prefetch_entity(self, entity: str):
+        """Warm the exact SerpAPI entry my_rag_lookup will read for ``entity``."""
+        # my_rag_lookup answers from the knowledge cache without searching when it can
+        if not os.environ.get("SERPAPI_KEY") or self.music_knowledge_cache.lookup_entity(entity):
+            return
+        await self.search_client.search(
+            q=self._rag_query(entity), engine="google", num=3, priority=Priority.SPECULATIVE
+        )
+
+    def _take_pending_rag(self) -> str:
+        """Return the deferred RAG context if it has landed; drop it otherwise."""
+        task, self._pending_rag = self._pending_rag, None
+        if task is None:
+            return ""
+        if not task.done():
+            # Let it finish in the background so its results still warm the caches
+            return ""
+        if task.cancelled() or task.exception():
+            return ""
+        return task.result()
+
     # ---------- YouTube music tools ----------
     @function_tool
+    @traced_tool
     async def play_youtube_music(self, song_query: str, play_immediately: bool = True):
         try:
             await self.session.say(f"Searching YouTube for '{song_query}'...")
 
             if not os.environ.get("YOUTUBE_API_KEY"):
-                await self.session.say("YouTube search is not available right now.")
+                await self._say_phrase("YouTube search is not available right now.")
                 return
 
             search_results = await self._search_youtube(song_query, max_results=5)
@@ -1350,7 +1395,7 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
 
             if play_immediately:
                 try:
-                    webbrowser.open_new(youtube_url)
+                    await asyncio.to_thread(webbrowser.open_new, youtube_url)
                     await self.session.say(f"Now playing: '{title}' by {channel}! 🎵")
                 except Exception as e:
                     logger.error(f"Error opening browser: {e}")
@@ -1358,15 +1403,16 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
             else:
                 await self.session.say(f"Found: '{title}' by {channel}")
 
-            cache_key = song_query.lower().replace(" ", "_")
-            self.music_knowledge_cache[cache_key] = {
+            song_title, artist = split_youtube_title(title, channel)
+            self.music_knowledge_cache.put_song("playback", song_title, artist, {
                 "title": title,
+                "artist": artist,
                 "channel": channel,
                 "youtube_url": youtube_url,
                 "video_id": video_id,
                 "source": "youtube_api",
                 "query": song_query
-            }
+            })
 
             return {
                 "title": title,
@@ -1380,12 +1426,13 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
             await self.session.say("Sorry, something went wrong while searching for music.")
 
     @function_tool
+    @traced_tool
     async def search_youtube_songs(self, query: str, num_results: int = 5):
         try:
             await self.session.say(f"Searching for '{query}' on YouTube...")
 
             if not os.environ.get("YOUTUBE_API_KEY"):
-                await self.session.say("YouTube search is not available right now.")
+                await self._say_phrase("YouTube search is not available right now.")
                 return
 
             num_results = min(num_results, 10)
@@ -1413,6 +1460,7 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
             await self.session.say("Sorry, I couldn't search YouTube right now.")
 
     @function_tool
+    @traced_tool
     async def play_search_result_by_number(self, result_number: int):
         try:
             if not hasattr(self, 'last_search_results') or not self.last_search_results:
@@ -1430,35 +1478,37 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
             youtube_url = f"https://www.youtube.com/watch?v={video_id}"
 
             try:
-                webbrowser.open_new(youtube_url)
+                await asyncio.to_thread(webbrowser.open_new, youtube_url)
                 await self.session.say(f"Now playing: '{title}' by {channel}! 🎵")
             except Exception as e:
                 logger.error(f"Error opening browser: {e}")
                 await self.session.say(f"Here's the link: {youtube_url}")
 
-            cache_key = f"result_{result_number}_{title.lower().replace(' ', '_')}"
-            self.music_knowledge_cache[cache_key] = {
+            song_title, artist = split_youtube_title(title, channel)
+            self.music_knowledge_cache.put_song("playback", song_title, artist, {
                 "title": title,
+                "artist": artist,
                 "channel": channel,
                 "youtube_url": youtube_url,
                 "video_id": video_id,
                 "source": "youtube_api"
-            }
+            })
 
         except Exception as e:
             logger.error(f"Error playing search result: {e}")
             await self.session.say("Sorry, I couldn't play that result.")
 
     @function_tool
+    @traced_tool
     async def play_music_from_lyrics(self, lyrics_snippet: str):
         try:
-            await self.session.say("Let me identify that song and play it for you...")
+            await self._say_phrase("Let me identify that song and play it for you...")
 
             if os.environ.get("SERPAPI_KEY"):
                 try:
                     query = f'"{lyrics_snippet}" lyrics'
-                    results = serpapi.search(
-                        q=query, engine="google", num=3, api_key=os.environ["SERPAPI_KEY"]
+                    results = await self.search_client.search(
+                        q=query, engine="google", num=3
                     )
 
                     if results.get("organic_results"):
@@ -1476,57 +1526,92 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
                     logger.error(f"Error identifying lyrics with SerpAPI: {e}")
 
             search_query = f"{lyrics_snippet} lyrics"
-            await self.session.say("Searching YouTube with those lyrics...")
+            await self._say_phrase("Searching YouTube with those lyrics...")
             await self.play_youtube_music(search_query)
 
         except Exception as e:
             logger.error(f"Error in play_music_from_lyrics: {e}")
             await self.session.say("Sorry, I couldn't identify and play that song right now.")
 
-    async def _search_youtube(self, query: str, max_results: int = 5) -> List[Dict]:
+    async def _search_youtube(
+        self, query: str, max_results: int = 5, priority: Priority = Priority.INTERACTIVE
+    ) -> List[Dict]:
         try:
             api_key = os.environ.get("YOUTUBE_API_KEY")
             if not api_key:
                 return []
 
-            base_url = "https://www.googleapis.com/youtube/v3/search"
-            params = {
-                'part': 'snippet',
-                'q': query,
-                'type': 'video',
-                'maxResults': max_results,
-                'order': 'relevance',
-                'videoCategoryId': '10',
-                'key': api_key
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        results = []
-                        for item in data.get('items', []):
-                            video_info = {
-                                'video_id': item['id']['videoId'],
-                                'title': item['snippet']['title'],
-                                'description': item['snippet']['description'],
-                                'channel_title': item['snippet']['channelTitle'],
-                                'published_at': item['snippet']['publishedAt'],
-                                'thumbnail_url': item['snippet']['thumbnails']['default']['url']
-                            }
-                            results.append(video_info)
-
-                        return results
-                    else:
-                        logger.error(f"YouTube API error: {response.status}")
-                        return []
+            # Identical searches from concurrent sessions share one request, which
+            # gets quota at the priority of its most urgent caller
+            cache_key = make_cache_key("youtube", query, max_results=max_results)
+            return await youtube_search_flights.do(
+                cache_key,
+                lambda flight: self._fetch_youtube(query, max_results, api_key, cache_key, flight),
+                priority,
+            )
 
+        except QuotaExhausted as e:
+            logger.warning(f"Skipping YouTube search for '{query}': {e}")
+            return []
         except Exception as e:
             logger.error(f"Error searching YouTube API: {e}")
             return []
 
+    async def _fetch_youtube(
+        self, query: str, max_results: int, api_key: str, cache_key: str, flight: FlightPriority
+    ) -> List[Dict]:
+        store = get_result_store()
+        cached = await store.get("youtube", cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            await get_quota_governor().acquire_flight("youtube", flight)
+        except QuotaExhausted:
+            stale = await store.get_stale("youtube", cache_key)
+            if stale is None:
+                raise
+            logger.info(f"YouTube budget exhausted, serving stale results for '{query}'")
+            return stale
+
+        params = {
+            'part': 'snippet',
+            'q': query,
+            'type': 'video',
+            'maxResults': max_results,
+            'order': 'relevance',
+            'videoCategoryId': '10',
+            'key': api_key
+        }
+
+        session = get_http_session()
+        with span("youtube.search", kind="upstream", **{"pipey.query": query}) as upstream:
+            async with session.get(YOUTUBE_SEARCH_ENDPOINT, params=params) as response:
+                upstream.set("http.status_code", response.status)
+                upstream.add(upstream_calls=1, bytes=len(await response.read()))
+                if response.status == 200:
+                    data = await response.json()
+                else:
+                    logger.error(f"YouTube API error: {response.status}")
+                    return []
+
+        results = []
+        for item in data.get('items', []):
+            video_info = {
+                'video_id': item['id']['videoId'],
+                'title': item['snippet']['title'],
+                'description': item['snippet']['description'],
+                'channel_title': item['snippet']['channelTitle'],
+                'published_at': item['snippet']['publishedAt'],
+                'thumbnail_url': item['snippet']['thumbnails']['default']['url']
+            }
+            results.append(video_info)
+
+        await store.put("youtube", cache_key, results)
+        return results
+
     @function_tool
+    @traced_tool
     async def get_recently_played_songs(self):
         try:
             recent_songs = []
@@ -1553,6 +1638,7 @@ Perhaps we can pick this up again later, or discuss another musical topic?"""
 
     # Enhanced find_song_info function for Pied Piper
 @function_tool
+@traced_tool
 async def find_song_info(
     self,
     song_name: str,
@@ -1578,9 +1664,8 @@ async def find_song_info(
         base_query = f"{base_query} by {artist_name.strip()}"
     
     # Check cache first
-    cache_key = f"{song_name.lower()}_{artist_name.lower() if artist_name else 'unknown'}"
-    if cache_key in self.music_knowledge_cache:
-        cached_info = self.music_knowledge_cache[cache_key]
+    cached_info = self.music_knowledge_cache.find_song("song_info", song_name, artist_name)
+    if cached_info is not None:
         await self.session.say(f"From my memory: {cached_info.get('summary', 'Found cached info')}")
         return cached_info
     
@@ -1622,26 +1707,20 @@ async def find_song_info(
         ]
 
         all_results = []
-        
-        for query in primary_queries:
-            try:
-                results = serpapi.search(
-                    q=query,
-                    engine="google",
-                    num=8,
-                    api_key=os.environ["SERPAPI_KEY"]
-                )
-                if results.get("organic_results"):
-                    all_results.extend(results["organic_results"])
-                    
-                # Extract knowledge graph information
-                if results.get("knowledge_graph"):
-                    kg = results["knowledge_graph"]
-                    await self._extract_knowledge_graph_info(kg, song_info)
-                    
-            except Exception as e:
-                logger.warning(f"Error in query '{query}': {e}")
+        knowledge_graphs = []
+
+        # Issue all primary queries at once; failed or slow queries are skipped
+        for results in await self.search_client.search_many(primary_queries, num=8):
+            if not results:
                 continue
+            if results.get("organic_results"):
+                all_results.extend(results["organic_results"])
+            if results.get("knowledge_graph"):
+                knowledge_graphs.append(results["knowledge_graph"])
+
+        # Extract knowledge graph information
+        if knowledge_graphs:
+            await self._extract_knowledge_graph_info(_merge_knowledge_graphs(knowledge_graphs), song_info)
 
         if not all_results:
             await self.session.say(f"❌ No information found for '{song_name}'. Try a different spelling or include the artist name.")
@@ -1650,98 +1729,43 @@ async def find_song_info(
         # Process and extract information from results
         await self._process_search_results(all_results, song_info)
 
-        # Additional searches based on flags
+        # Additional searches based on flags, run alongside the streaming link lookup
+        enrichment = [self._fetch_streaming_links(song_info)]
         if include_lyrics and song_info.get('artist') != 'Unknown':
-            await self._fetch_lyrics_info(song_info)
-            
+            enrichment.append(self._fetch_lyrics_info(song_info))
         if include_similar_songs:
-            await self._fetch_similar_songs(song_info)
+            enrichment.append(self._fetch_similar_songs(song_info))
+        enrichment_task = asyncio.ensure_future(asyncio.gather(*enrichment))
 
-        # Try to find streaming/YouTube links
-        await self._fetch_streaming_links(song_info)
+        async def response_sections():
+            # The overview is spoken while the enrichment lookups are still running
+            for section in _song_overview_sections(song_info):
+                yield section
+            await enrichment_task
+            for section in _song_enrichment_sections(song_info, include_lyrics, include_similar_songs):
+                yield section
 
-        # Generate comprehensive response
-        response_parts = []
-        
-        # Title and artist
-        if song_info['artist'] != 'Unknown':
-            response_parts.append(f"🎵 **{song_info['title']}** by **{song_info['artist']}**")
-        else:
-            response_parts.append(f"🎵 **{song_info['title']}**")
-
-        # Basic information
-        if song_info['basic_info']:
-            response_parts.append(f"📖 {song_info['basic_info']}")
-
-        # Release and album info
-        release_parts = []
-        if song_info['release_info']:
-            release_parts.append(song_info['release_info'])
-        if song_info['album_info']:
-            release_parts.append(f"from the album '{song_info['album_info']}'")
-        if song_info['genre']:
-            release_parts.append(f"Genre: {song_info['genre']}")
-        if release_parts:
-            response_parts.append(f"📅 {' | '.join(release_parts)}")
-
-        # Chart performance and stats
-        performance_parts = []
-        if song_info['chart_performance']:
-            performance_parts.append(song_info['chart_performance'])
-        if song_info['streaming_stats']:
-            performance_parts.append(song_info['streaming_stats'])
-        if song_info['certifications']:
-            performance_parts.append(song_info['certifications'])
-        if performance_parts:
-            response_parts.append(f"📊 {' | '.join(performance_parts)}")
-
-        # Credits
-        credits_parts = []
-        if song_info['writers']:
-            credits_parts.append(f"Written by: {song_info['writers']}")
-        if song_info['producers']:
-            credits_parts.append(f"Produced by: {song_info['producers']}")
-        if song_info['label']:
-            credits_parts.append(f"Label: {song_info['label']}")
-        if credits_parts:
-            response_parts.append(f"🎼 {' | '.join(credits_parts)}")
-
-        # Interesting facts
-        if song_info['interesting_facts']:
-            response_parts.append(f"💡 {song_info['interesting_facts']}")
-
-        # Lyrics snippet
-        if include_lyrics and song_info['lyrics_snippet']:
-            response_parts.append(f"🎤 Lyrics: \"{song_info['lyrics_snippet']}\"")
-
-        # Similar songs
-        if include_similar_songs and song_info['similar_songs']:
-            similar_list = ', '.join(song_info['similar_songs'][:3])
-            response_parts.append(f"🎯 Similar songs: {similar_list}")
-
-        # Streaming links
-        links = []
-        if song_info['youtube_url']:
-            links.append("YouTube")
-        if song_info['spotify_url']:
-            links.append("Spotify")
-        if links:
-            response_parts.append(f"🔗 Available on: {', '.join(links)}")
+        try:
+            await self.session.say(stream_sections(response_sections()))
+        finally:
+            await enrichment_task
 
         # Combine all parts
+        response_parts = (
+            _song_overview_sections(song_info)
+            + _song_enrichment_sections(song_info, include_lyrics, include_similar_songs)
+        )
         full_response = '\n\n'.join(response_parts)
         
         # Add summary for cache
         song_info['summary'] = full_response
         
         # Cache the results
-        self.music_knowledge_cache[cache_key] = song_info
-        
-        await self.session.say(full_response)
+        self.music_knowledge_cache.put_song("song_info", song_info['title'], song_info['artist'], song_info)
         
         # Offer to play the song
         if song_info['youtube_url'] or song_info.get('title'):
-            await self.session.say("🎵 Would you like me to play this song for you?")
+            await self._say_phrase("🎵 Would you like me to play this song for you?")
         
         return song_info
 
@@ -1751,6 +1775,102 @@ async def find_song_info(
         return None
 
 
+def _song_overview_sections(song_info: dict) -> list:
+    """Sections available right after the primary search"""
+    response_parts = []
+    
+    # Title and artist
+    if song_info['artist'] != 'Unknown':
+        response_parts.append(f"🎵 **{song_info['title']}** by **{song_info['artist']}**")
+    else:
+        response_parts.append(f"🎵 **{song_info['title']}**")
+
+    # Basic information
+    if song_info['basic_info']:
+        response_parts.append(f"📖 {song_info['basic_info']}")
+
+    # Release and album info
+    release_parts = []
+    if song_info['release_info']:
+        release_parts.append(song_info['release_info'])
+    if song_info['album_info']:
+        release_parts.append(f"from the album '{song_info['album_info']}'")
+    if song_info['genre']:
+        release_parts.append(f"Genre: {song_info['genre']}")
+    if release_parts:
+        response_parts.append(f"📅 {' | '.join(release_parts)}")
+
+    # Chart performance and stats
+    performance_parts = []
+    if song_info['chart_performance']:
+        performance_parts.append(song_info['chart_performance'])
+    if song_info['streaming_stats']:
+        performance_parts.append(song_info['streaming_stats'])
+    if song_info['certifications']:
+        performance_parts.append(song_info['certifications'])
+    if performance_parts:
+        response_parts.append(f"📊 {' | '.join(performance_parts)}")
+
+    # Credits
+    credits_parts = []
+    if song_info['writers']:
+        credits_parts.append(f"Written by: {song_info['writers']}")
+    if song_info['producers']:
+        credits_parts.append(f"Produced by: {song_info['producers']}")
+    if song_info['label']:
+        credits_parts.append(f"Label: {song_info['label']}")
+    if credits_parts:
+        response_parts.append(f"🎼 {' | '.join(credits_parts)}")
+
+    # Interesting facts
+    if song_info['interesting_facts']:
+        response_parts.append(f"💡 {song_info['interesting_facts']}")
+
+    return response_parts
+
+
+def _song_enrichment_sections(song_info: dict, include_lyrics: bool, include_similar_songs: bool) -> list:
+    """Sections that depend on the lyrics, similar songs and streaming link lookups"""
+    response_parts = []
+    # Lyrics snippet
+    if include_lyrics and song_info['lyrics_snippet']:
+        response_parts.append(f"🎤 Lyrics: \"{song_info['lyrics_snippet']}\"")
+
+    # Similar songs
+    if include_similar_songs and song_info['similar_songs']:
+        similar_list = ', '.join(song_info['similar_songs'][:3])
+        response_parts.append(f"🎯 Similar songs: {similar_list}")
+
+    # Streaming links
+    links = []
+    if song_info['youtube_url']:
+        links.append("YouTube")
+    if song_info['spotify_url']:
+        links.append("Spotify")
+    if links:
+        response_parts.append(f"🔗 Available on: {', '.join(links)}")
+
+    return response_parts
+
+
+def _merge_knowledge_graphs(knowledge_graphs: list) -> dict:
+    """Merge knowledge graphs from several queries independently of their order.
+
+    For every field the value reported by the most graphs wins; ties go to the
+    longest value, then to the lexicographically smallest one.
+    """
+    votes = defaultdict(Counter)
+    for kg in knowledge_graphs:
+        for field, value in kg.items():
+            if isinstance(value, str) and value.strip():
+                votes[field][value.strip()] += 1
+
+    return {
+        field: min(counter.items(), key=lambda item: (-item[1], -len(item[0]), item[0]))[0]
+        for field, counter in votes.items()
+    }
+
+
 async def _extract_knowledge_graph_info(self, kg: dict, song_info: dict):
     """Extract information from Google Knowledge Graph"""
     try:
@@ -1809,54 +1929,8 @@ async def _process_search_results(self, results: list, song_info: dict):
 async def _extract_from_text(self, text: str, song_info: dict):
     """Extract specific information from combined text using patterns"""
     try:
-        text_lower = text.lower()
-        
-        # Release date patterns
-        date_patterns = [
-            r'released (?:on )?([^,.\n]+(?:19|20)\d{2})',
-            r'(?:19|20)\d{2}[^,.\n]*release',
-            r'came out (?:in )?([^,.\n]+(?:19|20)\d{2})'
-        ]
-        for pattern in date_patterns:
-            match = re.search(pattern, text_lower)
-            if match and not song_info['release_info']:
-                song_info['release_info'] = f"Released: {match.group(1).strip()}"
-                break
-
-        # Chart performance
-        chart_patterns = [
-            r'(?:peaked at|reached) (?:number |#)?(\d+)',
-            r'(?:billboard|chart) (?:number |#)?(\d+)',
-            r'(\d+) (?:on the|in the) (?:billboard|charts)'
-        ]
-        for pattern in chart_patterns:
-            match = re.search(pattern, text_lower)
-            if match and not song_info['chart_performance']:
-                song_info['chart_performance'] = f"Chart peak: #{match.group(1)}"
-                break
-
-        # Genre extraction
-        genre_patterns = [
-            r'(?:genre|style|music): ([^,.\n]+)',
-            r'(?:pop|rock|hip hop|rap|country|jazz|blues|electronic|folk|r&b|soul) (?:song|track|music)'
-        ]
-        for pattern in genre_patterns:
-            match = re.search(pattern, text_lower)
-            if match and not song_info['genre']:
-                song_info['genre'] = match.group(1).strip() if match.groups() else match.group(0)
-                break
-
-        # Album information
-        album_patterns = [
-            r'from (?:the album|album) ["\']([^"\']+)["\']',
-            r'album ["\']([^"\']+)["\']',
-            r'appears on ([^,.\n]+(?:album|LP))'
-        ]
-        for pattern in album_patterns:
-            match = re.search(pattern, text_lower)
-            if match and not song_info['album_info']:
-                song_info['album_info'] = match.group(1).strip()
-                break
+        # Release date, chart peak, genre and album, with bounded-time patterns
+        extract_song_details(text, song_info)
 
         # Use enhanced fact extraction
         await self._extract_enhanced_facts(text, song_info)
@@ -1869,11 +1943,11 @@ async def _fetch_lyrics_info(self, song_info: dict):
     """Fetch lyrics snippet for the song"""
     try:
         query = f'"{song_info["title"]}" by {song_info["artist"]} lyrics'
-        results = serpapi.search(
+        results = await self.search_client.search(
             q=query,
             engine="google",
             num=3,
-            api_key=os.environ["SERPAPI_KEY"]
+            priority=Priority.ENRICHMENT
         )
         
         if results.get("organic_results"):
@@ -1897,11 +1971,11 @@ async def _fetch_similar_songs(self, song_info: dict):
     """Fetch similar or related songs"""
     try:
         query = f'songs similar to "{song_info["title"]}" by {song_info["artist"]}'
-        results = serpapi.search(
+        results = await self.search_client.search(
             q=query,
             engine="google",
             num=5,
-            api_key=os.environ["SERPAPI_KEY"]
+            priority=Priority.ENRICHMENT
         )
         
         similar_songs = []
@@ -1925,32 +1999,24 @@ async def _fetch_similar_songs(self, song_info: dict):
 async def _fetch_streaming_links(self, song_info: dict):
     """Attempt to find streaming platform links"""
     try:
-        # Search for YouTube link
         yt_query = f'"{song_info["title"]}" {song_info["artist"]} site:youtube.com'
-        yt_results = serpapi.search(
-            q=yt_query,
-            engine="google",
+        spotify_query = f'"{song_info["title"]}" {song_info["artist"]} site:open.spotify.com'
+        yt_results, spotify_results = await self.search_client.search_many(
+            [yt_query, spotify_query],
             num=3,
-            api_key=os.environ["SERPAPI_KEY"]
+            priority=Priority.ENRICHMENT
         )
-        
-        if yt_results.get("organic_results"):
+
+        # YouTube link
+        if yt_results and yt_results.get("organic_results"):
             for result in yt_results["organic_results"]:
                 link = result.get('link', '')
                 if 'youtube.com/watch' in link:
                     song_info['youtube_url'] = link
                     break
 
-        # Search for Spotify link
-        spotify_query = f'"{song_info["title"]}" {song_info["artist"]} site:open.spotify.com'
-        spotify_results = serpapi.search(
-            q=spotify_query,
-            engine="google",
-            num=3,
-            api_key=os.environ["SERPAPI_KEY"]
-        )
-        
-        if spotify_results.get("organic_results"):
+        # Spotify link
+        if spotify_results and spotify_results.get("organic_results"):
             for result in spotify_results["organic_results"]:
                 link = result.get('link', '')
                 if 'open.spotify.com/track' in link:
@@ -1961,8 +2027,12 @@ async def _fetch_streaming_links(self, song_info: dict):
         logger.warning(f"Error fetching streaming links: {e}")
 
 
+TRIVIA_FACT_LIMIT = 8
+
+
 # Dedicated function for interesting facts about songs
 @function_tool
+@traced_tool
 async def get_song_trivia(self, song_name: str, artist_name: str = None):
     """Get interesting trivia and facts about a song"""
     query_base = song_name
@@ -1985,48 +2055,50 @@ async def get_song_trivia(self, song_name: str, artist_name: str = None):
             f"{query_base} cover versions samples cultural impact"
         ]
         
-        all_facts = []
-        
-        for query in trivia_queries:
-            try:
-                results = serpapi.search(
-                    q=query,
-                    engine="google",
-                    num=6,
-                    api_key=os.environ["SERPAPI_KEY"]
-                )
-                
-                if results.get("organic_results"):
+        # Collapses near-duplicate phrasings from different sites into one fact each
+        ranker = FactRanker()
+
+        # Run every query at once and harvest facts as results arrive; once
+        # enough unique facts are collected the remaining searches are cancelled
+        pending = [
+            asyncio.ensure_future(self.search_client.search_or_none(query, num=6))
+            for query in trivia_queries
+        ]
+        try:
+            for next_result in asyncio.as_completed(pending):
+                results = await next_result
+                if results and results.get("organic_results"):
                     facts = await self._extract_trivia_facts(results["organic_results"], song_name)
-                    all_facts.extend(facts)
-                    
-            except Exception as e:
-                logger.warning(f"Error in trivia query '{query}': {e}")
-                continue
+                    ranker.add_all(facts)
+                if len(ranker) >= TRIVIA_FACT_LIMIT:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
         
-        if not all_facts:
+        if not len(ranker):
             await self.session.say(f"🤷‍♂️ Couldn't find any interesting trivia about '{song_name}'. It might be a newer or less documented song.")
             return None
         
-        # Remove duplicates and format response
-        unique_facts = list(dict.fromkeys(all_facts))  # Preserves order while removing duplicates
+        # Most informative first, so the spoken slots go to the best facts
+        unique_facts = ranker.ranked()
+        logger.info(f"Trivia for '{song_name}': {len(unique_facts)} facts, {ranker.collapsed} near-duplicates collapsed")
         
         response_parts = [f"🎵 **Interesting Facts About '{song_name}'**{f' by {artist_name}' if artist_name else ''}:\n"]
         
-        for i, fact in enumerate(unique_facts[:8], 1):  # Limit to top 8 facts
+        for i, fact in enumerate(unique_facts[:TRIVIA_FACT_LIMIT], 1):
             response_parts.append(f"**{i}.** {fact}")
         
         full_response = '\n\n'.join(response_parts)
         await self.session.say(full_response)
         
         # Cache the trivia
-        cache_key = f"trivia_{song_name.lower()}_{artist_name.lower() if artist_name else 'unknown'}"
-        self.music_knowledge_cache[cache_key] = {
+        self.music_knowledge_cache.put_song("trivia", song_name, artist_name, {
             'song': song_name,
             'artist': artist_name,
             'trivia_facts': unique_facts,
             'timestamp': asyncio.get_event_loop().time()
-        }
+        })
         
         return unique_facts
         
@@ -2041,57 +2113,7 @@ async def _extract_trivia_facts(self, results: list, song_name: str):
     facts = []
     
     try:
-        for result in results:
-            snippet = result.get('snippet', '')
-            title = result.get('title', '').lower()
-            
-            # Skip low-quality sources
-            skip_sources = ['lyrics', 'youtube', 'spotify', 'apple music', 'soundcloud']
-            if any(source in title for source in skip_sources):
-                continue
-            
-            # Look for fact indicators in snippets
-            fact_indicators = [
-                r'(?:interesting|surprising|unknown|secret|hidden|behind.*scenes?)[^.!?]*[.!?]',
-                r'(?:did you know|fun fact|trivia)[^.!?]*[.!?]',
-                r'(?:inspired by|based on|written about)[^.!?]*[.!?]',
-                r'(?:recorded|produced|mixed) (?:in|at|by)[^.!?]*[.!?]',
-                r'(?:won|nominated|awarded|achieved)[^.!?]*(?:grammy|award|chart|record)[^.!?]*[.!?]',
-                r'(?:first|only|last|never|always)[^.!?]*(?:song|time|artist|album)[^.!?]*[.!?]',
-                r'(?:million|billion|thousand).*(?:copies|streams|downloads|sales)[^.!?]*[.!?]',
-                r'(?:cover|version|sample) (?:of|by|from)[^.!?]*[.!?]',
-                r'(?:banned|censored|controversial)[^.!?]*[.!?]',
-                r'(?:meaning|about|refers to)[^.!?]*[.!?]'
-            ]
-            
-            for pattern in fact_indicators:
-                matches = re.findall(pattern, snippet, re.IGNORECASE | re.DOTALL)
-                for match in matches:
-                    cleaned_fact = match.strip()
-                    # Clean up the fact
-                    if len(cleaned_fact) > 20 and len(cleaned_fact) < 200:
-                        # Remove redundant phrases
-                        cleaned_fact = re.sub(r'^(?:interesting|surprising|fun fact)[:\s]*', '', cleaned_fact, flags=re.IGNORECASE)
-                        cleaned_fact = cleaned_fact.strip()
-                        if cleaned_fact and cleaned_fact not in facts:
-                            facts.append(cleaned_fact)
-            
-            # Also look for numerical facts (chart positions, sales figures, etc.)
-            number_patterns = [
-                r'(?:peaked|reached|hit) (?:number|#) (\d+)[^.!?]*[.!?]',
-                r'sold (?:over )?([0-9,]+) (?:million|thousand|copies)[^.!?]*[.!?]',
-                r'spent (\d+) weeks? (?:at|on)[^.!?]*(?:chart|billboard)[^.!?]*[.!?]',
-                r'(?:19|20)\d{2}.*(?:first|debut|released)[^.!?]*[.!?]'
-            ]
-            
-            for pattern in number_patterns:
-                matches = re.findall(pattern, snippet, re.IGNORECASE)
-                for match in matches:
-                    context = re.search(f'{re.escape(str(match))}[^.!?]*[.!?]', snippet, re.IGNORECASE)
-                    if context:
-                        fact = context.group(0).strip()
-                        if fact and len(fact) < 150 and fact not in facts:
-                            facts.append(fact)
+        facts = extract_trivia_facts(results)
     
     except Exception as e:
         logger.warning(f"Error extracting trivia facts: {e}")
@@ -2103,55 +2125,7 @@ async def _extract_trivia_facts(self, results: list, song_name: str):
 async def _extract_enhanced_facts(self, text: str, song_info: dict):
     """Enhanced fact extraction with more comprehensive patterns"""
     try:
-        text_lower = text.lower()
-        
-        # Expanded fact patterns
-        enhanced_fact_patterns = [
-            # Awards and achievements
-            r'(?:won|received|awarded|nominated for) ([^,.\n]*(?:grammy|award|prize|oscar|golden globe)[^,.\n]*)',
-            r'(?:platinum|gold|diamond) (?:certified|selling|status)',
-            r'(?:million|billion) (?:copies sold|streams|downloads|views)',
-            r'(?:number one|#1|chart-topping) (?:hit|single|song)',
-            
-            # Historical/Cultural significance  
-            r'(?:first|only|last) (?:song|artist|band) to ([^,.\n]+)',
-            r'(?:banned|censored|controversial) (?:because|for|due to) ([^,.\n]+)',
-            r'(?:inspired|influenced) (?:by|from) ([^,.\n]+)',
-            r'(?:covered by|sampled by|referenced in) ([^,.\n]+)',
-            
-            # Recording/Production facts
-            r'(?:recorded|produced|mixed) (?:in|at) ([^,.\n]+(?:studio|location))',
-            r'(?:took|spent) ([^,.\n]*(?:years?|months?|weeks?|days?)) (?:to (?:write|record|produce))',
-            r'(?:featured|includes) ([^,.\n]*(?:musician|artist|instrument))',
-            
-            # Commercial performance
-            r'(?:stayed|remained) (?:at|on) (?:number|#) (\d+) (?:for) ([^,.\n]*(?:weeks?|months?))',
-            r'(?:reached|peaked at|hit) (?:number|#) (\d+) (?:in|on) ([^,.\n]*(?:chart|billboard|country))',
-            
-            # Unique characteristics
-            r'(?:only|first|last) (?:song|track) (?:to|that) ([^,.\n]+)',
-            r'(?:unusual|unique|rare|special) (?:because|for) ([^,.\n]+)',
-            r'(?:hidden|secret|easter egg) ([^,.\n]+)'
-        ]
-        
-        interesting_facts = []
-        
-        for pattern in enhanced_fact_patterns:
-            matches = re.findall(pattern, text_lower)
-            for match in matches:
-                if isinstance(match, tuple):
-                    fact = ' '.join([str(m) for m in match if m])
-                else:
-                    fact = str(match)
-                
-                if len(fact.strip()) > 5:
-                    interesting_facts.append(fact.strip())
-        
-        
-        if interesting_facts:
-            unique_facts = list(dict.fromkeys(interesting_facts))
-            song_info['interesting_facts'] = ' | '.join(unique_facts[:3]) 
-            song_info['all_trivia'] = unique_facts  
+        extract_enhanced_facts(text, song_info)
             
     except Exception as e:
         logger.warning(f"Error in enhanced fact extraction: {e}")
@@ -2159,6 +2133,7 @@ async def _extract_enhanced_facts(self, text: str, song_info: dict):
 
 
 @function_tool
+@traced_tool
 async def quick_song_lookup(self, query: str):
     """Quick lookup for when users ask casual questions about songs"""
     
@@ -2198,106 +2173,94 @@ async def quick_song_lookup(self, query: str):
         logger.info(f"Received message: {message}")
 
         try:
-            play_music_patterns = [
-                r"play\s+(?:the\s+song\s+)?['\"]?([^'\"\n]+)['\"]?",
-                r"put\s+on\s+['\"]?([^'\"\n]+)['\"]?",
-                r"listen\s+to\s+['\"]?([^'\"\n]+)['\"]?",
-                r"start\s+playing\s+['\"]?([^'\"\n]+)['\"]?",
-                r"can\s+you\s+play\s+['\"]?([^'\"\n]+)['\"]?",
-                r"i\s+want\s+to\s+hear\s+['\"]?([^'\"\n]+)['\"]?",
-            ]
-
-            for pattern in play_music_patterns:
-                match = re.search(pattern, message, re.IGNORECASE)
-                if match:
-                    song_query = match.group(1).strip()
-                    await self.play_youtube_music(song_query)
-                    return
-
-            play_number_patterns = [
-                r"play\s+(?:number\s+)?(\d+)",
-                r"play\s+the\s+(\d+)(?:st|nd|rd|th)?\s+(?:one|result)",
-                r"(?:choose|select)\s+(?:number\s+)?(\d+)",
-            ]
-
-            for pattern in play_number_patterns:
-                match = re.search(pattern, message, re.IGNORECASE)
-                if match:
-                    result_number = int(match.group(1))
-                    await self.play_search_result_by_number(result_number)
-                    return
-
-            if re.search(r"play\s+(?:the\s+)?first\s+(?:one|result)", message, re.IGNORECASE):
-                await self.play_search_result_by_number(1)
+            routed = MESSAGE_ROUTER.route(message)
+            if routed is None:
                 return
 
-            search_patterns = [
-                r"search\s+(?:for\s+)?['\"]?([^'\"\n]+)['\"]?",
-                r"find\s+(?:me\s+)?['\"]?([^'\"\n]+)['\"]?(?:\s+(?:songs|music))?",
-                r"look\s+up\s+['\"]?([^'\"\n]+)['\"]?",
-            ]
-
-            for pattern in search_patterns:
-                match = re.search(pattern, message, re.IGNORECASE)
-                if match:
-                    query = match.group(1).strip()
-                    await self.search_youtube_songs(query)
-                    return
-
-            lyrics_play_patterns = [
-                r"play\s+(?:the\s+song\s+)?(?:that\s+goes\s+)?['\"]([^'\"\n]+)['\"]",
-                r"put\s+on\s+(?:the\s+song\s+)?(?:that\s+goes\s+)?['\"]([^'\"\n]+)['\"]",
-            ]
-
-            for pattern in lyrics_play_patterns:
-                match = re.search(pattern, message, re.IGNORECASE)
-                if match:
-                    lyrics = match.group(1).strip()
-                    await self.play_music_from_lyrics(lyrics)
-                    return
-
-            lyrics_patterns = [
-                r"what.*song.*goes.*['\"]?([^'\"\n]+)['\"]?",
-                r"which song has the lyrics.*['\"]?([^'\"\n]+)['\"]?",
-                r"identify.*lyrics.*['\"]?([^'\"\n]+)['\"]?",
-            ]
-            for p in lyrics_patterns:
-                m = re.search(p, message, re.IGNORECASE)
-                if m:
-                    await self.find_lyrics(m.group(1).strip())
-                    return
-
-            song_info_patterns = [
-                r"(?:what|tell me|know).*(?:about|info).*(?:song|track).*['\"]?([^'\"\n]+)['\"]?",
-                r"(?:who|what).*(?:sings|sang|by|artist).*['\"]?([^'\"\n]+)['\"]?",
-                r"['\"]?([^'\"\n]+)['\"]?.*(?:song|lyrics|track).*(?:by|from).*['\"]?([^'\"\n]+)['\"]?",
-                r"(?:information|tell me|know).*(?:about|info).*['\"]?([^'\"\n]+)['\"]?.*(?:by|from).*['\"]?([^'\"\n]+)['\"]?",
-                r"what.*that song.*['\"]?([^'\"\n]+)['\"]?",
-                r"looking for.*song.*['\"]?([^'\"\n]+)['\"]?",
-                r"have you heard.*['\"]?([^'\"\n]+)['\"]?",
-                r"do you know.*song.*['\"]?([^'\"\n]+)['\"]?",
-            ]
-            for p in song_info_patterns:
-                m = re.search(p, message, re.IGNORECASE)
-                if m:
-                    if len(m.groups()) == 2:
-                        await self.find_song_info(m.group(1).strip(), m.group(2).strip())
-                    else:
-                        await self.find_song_info(m.group(1).strip())
-                    return
+            if routed.intent == "play_music":
+                await self.play_youtube_music(routed.group(1).strip())
+            elif routed.intent == "play_number":
+                await self.play_search_result_by_number(int(routed.group(1)))
+            elif routed.intent == "play_first":
+                await self.play_search_result_by_number(1)
+            elif routed.intent == "search_music":
+                await self.search_youtube_songs(routed.group(1).strip())
+            elif routed.intent == "play_lyrics":
+                await self.play_music_from_lyrics(routed.group(1).strip())
+            elif routed.intent == "find_lyrics":
+                await self.find_lyrics(routed.group(1).strip())
+            elif routed.intent == "song_info":
+                if len(routed.groups) == 2:
+                    await self.find_song_info(routed.group(1).strip(), routed.group(2).strip())
+                else:
+                    await self.find_song_info(routed.group(1).strip())
         except Exception as e:
             logger.error(f"Error in handle_message: {e}")
 
     
 
+def prewarm(proc: JobProcess):
+    """Load the VAD model and local caches once per worker process, before any job is assigned to it."""
+    started = time.perf_counter()
+    proc.userdata["vad"] = silero.VAD.load()
+    phrase_cache = get_phrase_cache()
+    phrase_cache.load_all()
+    # Render phrases missing on disk now, so the first caller on a cold worker gets cached audio too
+    phrase_count = phrase_cache.prerender(build_tts, fixed_phrases())
+    logger.info(
+        f"Worker process prewarmed in {(time.perf_counter() - started) * 1000:.0f} ms "
+        f"({phrase_count} cached phrases ready)"
+    )
+
+
+def track_first_audio(session: AgentSession, job_started: float):
+    """Log how long after job start the agent first started speaking."""
+    def on_agent_state_changed(event):
+        if event.new_state != "speaking":
+            return
+        session.off("agent_state_changed", on_agent_state_changed)
+        elapsed = time.perf_counter() - job_started
+        first_audio_latencies.record(elapsed)
+        logger.info(
+            f"First audio {elapsed * 1000:.0f} ms after job start "
+            f"(p50 {first_audio_latencies.percentile(50) * 1000:.0f} ms, "
+            f"p95 {first_audio_latencies.percentile(95) * 1000:.0f} ms over {len(first_audio_latencies)} jobs)"
+        )
+
+    session.on("agent_state_changed", on_agent_state_changed)
+
+
 async def entrypoint(ctx: JobContext):
+    job_started = time.perf_counter()
+    if LOOP_WATCHDOG:
+        get_watchdog().start()
+    get_tracer().start()
+    ctx.add_shutdown_callback(get_tracer().flush)
+    acquire_http_session()
+    ctx.add_shutdown_callback(release_http_session)
     await ctx.connect()
     session = AgentSession(allow_interruptions=False)
+    # The VAD is loaded by prewarm; fall back to loading it here if the process was not prewarmed
+    agent = MultilingualPipeyAgent(vad=ctx.proc.userdata.get("vad"))
+    instrument_session(session)
+    track_first_audio(session, job_started)
+    # Per-turn latency breakdown (STT, end of turn, RAG hook, LLM, tools, TTS), logged to .pipey_cache/turns.jsonl
+    turn_recorder = TurnRecorder(session, language=lambda: agent.current_language, owner=agent)
+    ctx.add_shutdown_callback(turn_recorder.aclose)
+    if SPECULATIVE_PREFETCH:
+        session.on("user_input_transcribed", agent.on_user_input_transcribed)
     await session.start(
-    agent=MultilingualPipeyAgent(), 
+    agent=agent, 
     room=ctx.room,
     room_input_options=RoomInputOptions(video_enabled=True))
+    # Render any phrases prewarm could not (e.g. it timed out); a no-op once they are all cached
+    get_phrase_cache().warm(build_tts(), fixed_phrases())
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        # prewarm loads the VAD and renders missing phrases before the process takes jobs
+        initialize_process_timeout=PRERENDER_TIMEOUT_SECONDS + 10,
+    ))
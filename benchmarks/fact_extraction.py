@@ -0,0 +1,175 @@
+"""Fuzz and worst-case timing check for the fact extraction engine.
+
+Feeds ``pied_piper.facts`` adversarial snippets (long, punctuation-poor runs
+of the keywords the patterns anchor on) plus random snippet-like text at
+doubling sizes, and reports the worst time per call and per character. The
+run fails when per-character cost grows with input size (i.e. extraction is
+no longer linear) or when a call overruns its time budget. ``--legacy``
+also times the original in-script patterns on the smaller inputs for
+comparison.
+
+Usage (from the repository root):
+
+    python -m benchmarks.fact_extraction [--max-size 32000] [--fuzz 200] [--legacy]
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, Dict, List
+
+from pied_piper import facts
+
+KEYWORD_FLOODS = {
+    "award": "won the grammy award chart record ",
+    "first": "first only last song time artist album ",
+    "sales": "million billion thousand copies streams downloads ",
+    "behind": "behind the scenes behind ",
+    "release": "released on 1999 2001 came out in 2020 ",
+    "numbers": "peaked at number 1 sold over 1,000 spent 3 weeks on ",
+    "enhanced": "won received awarded nominated for took spent years to ",
+}
+FILLER_WORDS = (
+    "the song was written recorded produced by band artist album chart billboard single "
+    "grammy award million streams first debut released 1985 2004 inspired by cover version "
+    "meaning about hidden secret banned because unusual rare studio weeks months"
+).split()
+PUNCTUATION = ["", "", "", "", "", ",", ".", "!", "?", "\n", '"']
+
+# Growth in per-character cost from the smallest to the largest input that is
+# still considered linear (timer noise and cache effects stay well below this)
+MAX_PER_CHAR_GROWTH = 3.0
+BUDGET_SLACK_SECONDS = 0.01
+
+
+def flood(unit: str, size: int) -> str:
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def fuzz_text(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(FILLER_WORDS) + rng.choice(PUNCTUATION)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def run_all_extractors(text: str, budget_seconds: float = facts.DEFAULT_TIME_BUDGET_SECONDS):
+    """Every public entry point, each with its own time budget."""
+    facts.extract_song_details(text, {}, facts.TimeBudget(budget_seconds))
+    facts.extract_enhanced_facts(text, {}, facts.TimeBudget(budget_seconds))
+    facts.extract_trivia_facts([{"title": "song facts", "snippet": text}], facts.TimeBudget(budget_seconds))
+
+
+def run_unbudgeted(text: str):
+    """Without a deadline, so the timings show the patterns' own growth."""
+    run_all_extractors(text, budget_seconds=float("inf"))
+
+
+def run_legacy_extractors(text: str):
+    """The original patterns exactly as the agent scripts used to run them."""
+    lower = text.lower()
+    for pattern in LEGACY_ENHANCED_PATTERNS:
+        re.findall(pattern, lower)
+    for pattern in LEGACY_TRIVIA_PATTERNS:
+        re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
+    for pattern in LEGACY_NUMBER_PATTERNS:
+        re.findall(pattern, text, re.IGNORECASE)
+
+
+LEGACY_ENHANCED_PATTERNS = [
+    r'(?:won|received|awarded|nominated for) ([^,.\n]*(?:grammy|award|prize|oscar|golden globe)[^,.\n]*)',
+    r'(?:took|spent) ([^,.\n]*(?:years?|months?|weeks?|days?)) (?:to (?:write|record|produce))',
+]
+LEGACY_TRIVIA_PATTERNS = [
+    r'(?:interesting|surprising|unknown|secret|hidden|behind.*scenes?)[^.!?]*[.!?]',
+    r'(?:won|nominated|awarded|achieved)[^.!?]*(?:grammy|award|chart|record)[^.!?]*[.!?]',
+    r'(?:first|only|last|never|always)[^.!?]*(?:song|time|artist|album)[^.!?]*[.!?]',
+    r'(?:million|billion|thousand).*(?:copies|streams|downloads|sales)[^.!?]*[.!?]',
+]
+LEGACY_NUMBER_PATTERNS = [
+    r'spent (\d+) weeks? (?:at|on)[^.!?]*(?:chart|billboard)[^.!?]*[.!?]',
+    r'(?:19|20)\d{2}.*(?:first|debut|released)[^.!?]*[.!?]',
+]
+
+
+def time_call(fn: Callable[[str], None], text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(sizes: List[int], fuzz_cases: int, seed: int, fn: Callable[[str], None]) -> Dict[int, Dict]:
+    rng = random.Random(seed)
+    report = {}
+    for size in sizes:
+        cases = {name: flood(unit, size) for name, unit in KEYWORD_FLOODS.items()}
+        for i in range(fuzz_cases):
+            cases[f"fuzz-{i}"] = fuzz_text(rng, size)
+        timings = {name: time_call(fn, text) for name, text in cases.items()}
+        worst_case = max(timings, key=timings.get)
+        report[size] = {
+            "worst_case": worst_case,
+            "worst_seconds": timings[worst_case],
+            "worst_us_per_char": timings[worst_case] / size * 1e6,
+        }
+    return report
+
+
+def print_report(title: str, report: Dict[int, Dict]):
+    print(title)
+    print(f"  {'chars':>8}  {'worst ms':>9}  {'us/char':>8}  worst input")
+    for size, row in report.items():
+        print(f"  {size:>8}  {row['worst_seconds'] * 1000:>9.2f}  {row['worst_us_per_char']:>8.3f}  {row['worst_case']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--min-size", type=int, default=1000)
+    parser.add_argument("--max-size", type=int, default=facts.MAX_INPUT_CHARS // 2)
+    parser.add_argument("--fuzz", type=int, default=50, help="random snippets per size")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--legacy", action="store_true", help="also time the original patterns (slow)")
+    args = parser.parse_args()
+
+    sizes = []
+    size = args.min_size
+    while size <= args.max_size:
+        sizes.append(size)
+        size *= 2
+
+    report = measure(sizes, args.fuzz, args.seed, run_unbudgeted)
+    print_report("pied_piper.facts without time budget (worst of floods + fuzz)", report)
+    budgeted = measure(sizes, args.fuzz, args.seed, run_all_extractors)
+
+    # Beyond the input cap the cost must flatten out entirely
+    capped = time_call(run_all_extractors, flood(KEYWORD_FLOODS["award"], facts.MAX_INPUT_CHARS * 5))
+    print(f"\n  with budget, worst call: {max(row['worst_seconds'] for row in budgeted.values()) * 1000:.2f} ms")
+    print(f"  {facts.MAX_INPUT_CHARS * 5} chars (5x the input cap): {capped * 1000:.2f} ms")
+
+    if args.legacy:
+        legacy_sizes = [s for s in sizes if s <= 4000]
+        print()
+        print_report("legacy in-script patterns", measure(legacy_sizes, 0, args.seed, run_legacy_extractors))
+
+    smallest, largest = report[sizes[0]], report[sizes[-1]]
+    growth = largest["worst_us_per_char"] / smallest["worst_us_per_char"]
+    print(f"\nPer-character cost growth {sizes[0]} -> {sizes[-1]} chars: {growth:.2f}x")
+
+    # Three extractors each get their own budget per call
+    call_limit = 3 * facts.DEFAULT_TIME_BUDGET_SECONDS + BUDGET_SLACK_SECONDS
+    slowest = max(max(row["worst_seconds"] for row in budgeted.values()), capped)
+    if growth > MAX_PER_CHAR_GROWTH:
+        raise SystemExit(f"Extraction time is growing faster than linear ({growth:.2f}x per character)")
+    if slowest > call_limit:
+        raise SystemExit(f"Extraction took {slowest * 1000:.1f} ms, over the {call_limit * 1000:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
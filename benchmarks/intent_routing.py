@@ -0,0 +1,144 @@
+"""Benchmark and regression check for intent routing.
+
+Runs the labeled utterance corpus (all six supported languages) through the
+routers used by ``handle_message`` and ``handle_enhanced_message`` and
+reports per-message routing latency, throughput and per-intent accuracy with
+a confusion matrix. Only the routers are exercised, so no LiveKit session,
+LLM or network access is needed.
+
+Usage (from the repository root):
+
+    python -m benchmarks.intent_routing [--repeat 200] [--json report.json]
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from pied_piper.intents import ENHANCED_ROUTER, MESSAGE_ROUTER
+from pied_piper.stats import percentile
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_corpus.jsonl")
+ROUTERS = {"message": MESSAGE_ROUTER, "enhanced": ENHANCED_ROUTER}
+NO_INTENT = "none"
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def predict(example: Dict) -> str:
+    routed = ROUTERS[example["router"]].route(example["text"])
+    return routed.intent if routed else NO_INTENT
+
+
+def measure_latency(corpus: List[Dict], repeat: int) -> Dict:
+    samples_us = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for example in corpus:
+            router = ROUTERS[example["router"]]
+            t0 = time.perf_counter_ns()
+            router.route(example["text"])
+            samples_us.append((time.perf_counter_ns() - t0) / 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        "messages": len(samples_us),
+        "p50_us": percentile(samples_us, 50),
+        "p99_us": percentile(samples_us, 99),
+        "max_us": max(samples_us),
+        "messages_per_second": len(samples_us) / elapsed if elapsed else float("inf"),
+    }
+
+
+def evaluate(corpus: List[Dict]) -> Dict:
+    confusion: Dict[str, Counter] = defaultdict(Counter)
+    by_language: Dict[str, Counter] = defaultdict(Counter)
+    failures = []
+    for example in corpus:
+        expected, predicted = example["intent"], predict(example)
+        confusion[expected][predicted] += 1
+        by_language[example["lang"]]["correct" if expected == predicted else "wrong"] += 1
+        if expected != predicted:
+            failures.append({**example, "predicted": predicted})
+
+    per_intent = {}
+    for intent in sorted(set(confusion) | {p for row in confusion.values() for p in row}):
+        true_positive = confusion[intent][intent]
+        predicted_total = sum(row[intent] for row in confusion.values())
+        actual_total = sum(confusion[intent].values())
+        per_intent[intent] = {
+            "support": actual_total,
+            "precision": true_positive / predicted_total if predicted_total else 0.0,
+            "recall": true_positive / actual_total if actual_total else 0.0,
+        }
+
+    correct = sum(row[intent] for intent, row in confusion.items())
+    return {
+        "accuracy": correct / len(corpus) if corpus else 0.0,
+        "per_language": {
+            lang: counts["correct"] / (counts["correct"] + counts["wrong"])
+            for lang, counts in sorted(by_language.items())
+        },
+        "per_intent": per_intent,
+        "confusion": {expected: dict(row) for expected, row in confusion.items()},
+        "failures": failures,
+    }
+
+
+def print_report(latency: Dict, quality: Dict):
+    print("Routing latency")
+    print(f"  messages routed : {latency['messages']}")
+    print(f"  p50 / p99 / max : {latency['p50_us']:.1f} / {latency['p99_us']:.1f} / {latency['max_us']:.1f} us")
+    print(f"  throughput      : {latency['messages_per_second']:,.0f} messages/s")
+
+    print(f"\nAccuracy: {quality['accuracy']:.1%}")
+    for lang, accuracy in quality["per_language"].items():
+        print(f"  {lang}: {accuracy:.1%}")
+
+    print("\nPer intent (support / precision / recall)")
+    for intent, scores in quality["per_intent"].items():
+        print(f"  {intent:<16} {scores['support']:>4}  {scores['precision']:>6.1%}  {scores['recall']:>6.1%}")
+
+    intents = list(quality["per_intent"])
+    width = max(len(i) for i in intents) + 1
+    print("\nConfusion matrix (rows = expected, columns = predicted)")
+    print(" " * width + " ".join(f"{i[:6]:>6}" for i in intents))
+    for expected in intents:
+        row = quality["confusion"].get(expected, {})
+        print(f"{expected:<{width}}" + " ".join(f"{row.get(p, 0):>6}" for p in intents))
+
+    if quality["failures"]:
+        print(f"\nMisrouted ({len(quality['failures'])})")
+        for failure in quality["failures"]:
+            print(f"  [{failure['lang']}] {failure['text']!r}: expected {failure['intent']}, got {failure['predicted']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the corpus for latency")
+    parser.add_argument("--json", help="also write the full report to this file")
+    parser.add_argument("--min-accuracy", type=float, default=None,
+                        help="exit non-zero if English accuracy falls below this fraction")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    latency = measure_latency(corpus, args.repeat)
+    quality = evaluate(corpus)
+    print_report(latency, quality)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"latency": latency, "quality": quality}, f, indent=2, ensure_ascii=False)
+
+    if args.min_accuracy is not None and quality["per_language"].get("en", 0.0) < args.min_accuracy:
+        raise SystemExit(f"English routing accuracy below {args.min_accuracy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Prompt size report: legacy instructions and full tool set versus per-turn plans.
+
+Reads the agent's function tools straight from a script's source with ``ast``.
+Only their names, docstrings and parameters are needed, so no LiveKit install
+is required. Every message in the labeled intent corpus is routed through
+``pied_piper.prompt``. The report compares the estimated prompt tokens for
+that turn (instructions plus tool schemas) with the legacy prompt, which sent
+the old instructions (kept in ``data/legacy_instructions.txt``) and every
+tool each time. Language switches are included: the compact instructions are
+built once per language.
+
+Usage (from the repository root):
+
+    python -m benchmarks.prompt_size [--json report.json]
+    python -m benchmarks.prompt_size --script Pied_Piper_web.py --no-playback
+"""
+
+import argparse
+import ast
+import json
+import os
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.intent_routing import CORPUS_PATH, load_corpus
+from pied_piper.prompt import ToolSelector, build_instructions, estimate_tokens
+from pied_piper.stats import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEGACY_INSTRUCTIONS_PATH = os.path.join(os.path.dirname(__file__), "data", "legacy_instructions.txt")
+AGENT_CLASS = "MultilingualPipeyAgent"
+LANGUAGE_NAMES = {"en": "English", "es": "Spanish", "fr": "French", "de": "German", "it": "Italian", "hi": "Hindi"}
+
+
+def _is_function_tool(decorator: ast.expr) -> bool:
+    target = decorator.func if isinstance(decorator, ast.Call) else decorator
+    return isinstance(target, ast.Name) and target.id == "function_tool"
+
+
+def load_tools(script_path: str) -> List:
+    """Stand-in functions with the name, docstring and parameters of each agent tool."""
+    with open(script_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    agent = next(n for n in tree.body if isinstance(n, ast.ClassDef) and n.name == AGENT_CLASS)
+    tools = []
+    for node in agent.body:
+        if isinstance(node, ast.AsyncFunctionDef) and any(_is_function_tool(d) for d in node.decorator_list):
+            params = ", ".join(arg.arg for arg in node.args.args)
+            namespace: Dict = {}
+            exec(f"def {node.name}({params}): pass", namespace)
+            stand_in = namespace[node.name]
+            stand_in.__doc__ = ast.get_docstring(node)
+            tools.append(stand_in)
+    return tools
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--script", default=os.path.join(ROOT, "Pied_Piper_local_script.py"))
+    parser.add_argument("--no-playback", action="store_true", help="plan as the web deployment does")
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    can_play = not args.no_playback
+    selector = ToolSelector(load_tools(args.script), can_play=can_play)
+    with open(LEGACY_INSTRUCTIONS_PATH, encoding="utf-8") as f:
+        legacy_tokens = estimate_tokens(f.read()) + selector.full_tool_tokens
+
+    corpus = load_corpus(args.corpus)
+    by_mode: Dict[str, List[int]] = defaultdict(list)
+    by_language: Dict[str, List[int]] = defaultdict(list)
+    tool_counts = []
+    for example in corpus:
+        instructions = build_instructions(LANGUAGE_NAMES[example["lang"]], can_play=can_play)
+        # Debates and result lists are live for the follow-up messages that refer to them
+        plan = selector.plan(
+            example["text"],
+            instructions,
+            debate_active=example["intent"] == "continue_debate",
+            has_search_results=example["intent"] in ("play_number", "play_first"),
+        )
+        by_mode[plan.mode].append(plan.prompt_tokens)
+        by_language[example["lang"]].append(plan.prompt_tokens)
+        tool_counts.append(len(plan.tool_names))
+
+    all_tokens = [t for tokens in by_mode.values() for t in tokens]
+    report = {
+        "tools": len(selector.tools),
+        "legacy_prompt_tokens": legacy_tokens,
+        "mean_prompt_tokens": sum(all_tokens) / len(all_tokens),
+        "p95_prompt_tokens": percentile(all_tokens, 95),
+        "mean_tools_exposed": sum(tool_counts) / len(tool_counts),
+        "by_mode": {mode: {"turns": len(t), "mean_tokens": sum(t) / len(t)} for mode, t in sorted(by_mode.items())},
+        "by_language": {lang: sum(t) / len(t) for lang, t in sorted(by_language.items())},
+    }
+
+    print(f"{len(corpus)} corpus messages, {report['tools']} function tools in {os.path.basename(args.script)}\n")
+    print(f"  legacy prompt          : ~{legacy_tokens} tokens every turn (all {report['tools']} tools)")
+    print(f"  per-turn plan, mean    : ~{report['mean_prompt_tokens']:.0f} tokens "
+          f"({1 - report['mean_prompt_tokens'] / legacy_tokens:.0%} smaller), "
+          f"{report['mean_tools_exposed']:.1f} tools")
+    print(f"  per-turn plan, p95     : ~{report['p95_prompt_tokens']} tokens\n")
+    print(f"  {'mode':<10} {'turns':>5}  {'mean tokens':>11}")
+    for mode, stats in report["by_mode"].items():
+        print(f"  {mode:<10} {stats['turns']:>5}  {stats['mean_tokens']:>11.0f}")
+    print(f"\n  {'language':<10} {'mean tokens':>11}")
+    for lang, mean in report["by_language"].items():
+        print(f"  {lang:<10} {mean:>11.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Micro-benchmark for trivia fact extraction over recorded SerpAPI snippets.
+
+Compares ``pied_piper.facts.extract_trivia_facts`` with the previous
+implementation. The old one compiled a fresh pattern for every numeric
+match, rescanned the snippet to find its sentence, ran every pattern on every
+segment, and deduplicated with ``fact not in facts`` list scans. The
+"numeric" rows time only the numeric-context stage and dedup. Both run on the same recorded
+``organic_results``; the current extractor must find every fact the old one
+did. It also keeps year facts ("1975 it was released ..."), which the old
+rescan always dropped because the rebuilt pattern asked for a second
+sentence terminator after the match. ``--scale``
+repeats each result set with distinct suffixes to show how the old list dedup
+grows with the number of candidate facts.
+
+``--record`` appends fresh responses for the given queries to the corpus, using
+the agent's own search client (needs ``SERPAPI_KEY``).
+
+Usage (from the repository root):
+
+    python -m benchmarks.trivia_extraction [--repeat 200] [--scale 1 8 32]
+    python -m benchmarks.trivia_extraction --record "Hey Jude by The Beatles"
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List
+
+from pied_piper import facts
+from pied_piper.stats import percentile
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "trivia_snippets.jsonl")
+# The queries get_song_trivia sends for each song
+TRIVIA_QUERY_SUFFIXES = [
+    "interesting facts trivia behind the scenes",
+    "story meaning inspiration writing process",
+    "recording studio secrets easter eggs",
+    "awards achievements records broken",
+    "cover versions samples cultural impact",
+]
+
+
+def legacy_extract_trivia_facts(results: List[Dict], limit: int = 10) -> List[str]:
+    """The extractor before match spans and ordered-set dedup, kept for comparison."""
+    budget = facts.TimeBudget(float("inf"))
+    found = []
+    for result in results:
+        snippet = result.get('snippet', '')
+        title = result.get('title', '').lower()
+        if any(source in title for source in facts.TRIVIA_SKIP_SOURCES):
+            continue
+        segments = facts.split_segments(snippet)
+        for pattern in facts.TRIVIA_FACT_PATTERNS:
+            for segment in segments:
+                for match in pattern.findall(segment):
+                    cleaned_fact = match.strip()
+                    if len(cleaned_fact) > 20 and len(cleaned_fact) < 200:
+                        cleaned_fact = facts._TRIVIA_PREFIX_RE.sub('', cleaned_fact).strip()
+                        if cleaned_fact and cleaned_fact not in found:
+                            found.append(cleaned_fact)
+        for pattern in facts.TRIVIA_NUMBER_PATTERNS:
+            for segment in segments:
+                if budget.expired():
+                    return found[:limit]
+                for match in pattern.findall(segment):
+                    context = re.search(f'{re.escape(str(match))}[^.!?]*[.!?]', segment, re.IGNORECASE)
+                    if context:
+                        fact = context.group(0).strip()
+                        if fact and len(fact) < 150 and fact not in found:
+                            found.append(fact)
+    return found[:limit]
+
+
+def current_extract_trivia_facts(results: List[Dict], limit: int = 10) -> List[str]:
+    return facts.extract_trivia_facts(results, facts.TimeBudget(float("inf")))[:limit]
+
+
+@contextlib.contextmanager
+def numeric_stage_only():
+    """Skip the fact-indicator patterns (unchanged, shared by both extractors) to
+    time just the numeric-context stage and the dedup that were rewritten."""
+    saved = facts.TRIVIA_FACT_PATTERNS
+    facts.TRIVIA_FACT_PATTERNS = []
+    try:
+        yield
+    finally:
+        facts.TRIVIA_FACT_PATTERNS = saved
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def scaled(results: List[Dict], factor: int) -> List[Dict]:
+    """Repeat a result set ``factor`` times, making every copy's sentences distinct."""
+    copies = []
+    for i in range(factor):
+        for result in results:
+            snippet = re.sub(r"([.!?])", rf" (source {i})\1", result.get("snippet", ""))
+            copies.append({**result, "snippet": snippet})
+    return copies
+
+
+def time_extractor(fn: Callable, result_sets: List[List[Dict]], repeat: int, limit: int) -> Dict:
+    samples_us = []
+    for _ in range(repeat):
+        for results in result_sets:
+            t0 = time.perf_counter_ns()
+            fn(results, limit=limit)
+            samples_us.append((time.perf_counter_ns() - t0) / 1000)
+    return {
+        "p50_us": percentile(samples_us, 50),
+        "p99_us": percentile(samples_us, 99),
+        "total_ms": sum(samples_us) / 1000,
+    }
+
+
+async def record(queries: List[str], path: str):
+    from pied_piper.http import close_http_session
+    from pied_piper.search import get_search_client
+
+    client = get_search_client()
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            for query in queries:
+                for suffix in TRIVIA_QUERY_SUFFIXES:
+                    payload = await client.search_or_none(f"{query} {suffix}", num=6)
+                    if payload and payload.get("organic_results"):
+                        row = {"query": f"{query} {suffix}", "organic_results": payload["organic_results"]}
+                        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                        print(f"recorded {len(row['organic_results'])} results for {row['query']!r}")
+    finally:
+        await close_http_session()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 8, 32, 128],
+                        help="copies of each result set per call")
+    parser.add_argument("--record", nargs="+", metavar="QUERY",
+                        help="append live SerpAPI results for these songs to the corpus and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record, args.corpus))
+        return
+
+    corpus = load_corpus(args.corpus)
+    print(f"{len(corpus)} recorded result sets, {sum(len(r['organic_results']) for r in corpus)} snippets\n")
+    print(f"  {'scale':>5}  {'stage':<8}  {'legacy p50 us':>13}  {'current p50 us':>14}  {'speedup':>7}  facts")
+
+    for factor in args.scale:
+        result_sets = [scaled(row["organic_results"], factor) for row in corpus]
+        # Without the cap the full candidate list is built and deduplicated
+        limit = 10 if factor == 1 else 10_000
+        recovered = 0
+        for results in result_sets:
+            legacy = legacy_extract_trivia_facts(results, limit=10_000)
+            current = current_extract_trivia_facts(results, limit=10_000)
+            missing = set(legacy) - set(current)
+            if missing:
+                raise SystemExit(f"Facts lost by the current extractor: {sorted(missing)}")
+            recovered += len(current) - len(legacy)
+
+        repeat = max(1, args.repeat // factor)
+        fact_count = sum(len(current_extract_trivia_facts(r, limit=limit)) for r in result_sets)
+        for stage, scope in (("numeric", numeric_stage_only), ("full", contextlib.nullcontext)):
+            with scope():
+                old = time_extractor(legacy_extract_trivia_facts, result_sets, repeat, limit)
+                new = time_extractor(current_extract_trivia_facts, result_sets, repeat, limit)
+            print(f"  {factor:>5}  {stage:<8}  {old['p50_us']:>13.1f}  {new['p50_us']:>14.1f}  "
+                  f"{old['total_ms'] / new['total_ms']:>6.2f}x  "
+                  + (f"{fact_count} (+{recovered} recovered)" if stage == "full" else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Turn latency dashboard built from the agent's rolling turn log.
+
+Reads the records the agents append to ``.pipey_cache/turns.jsonl`` (see
+``pied_piper.turns``), including its rotated files. It prints p50/p95/p99 of
+every stage, from the end of the user's speech to the first audio, grouped by
+release, language and tool. Releases are listed in the order they first
+appear. Each release's p95 is compared with the previous one, so a regression
+in one stage (STT, end of turn, RAG hook, LLM, tools, TTS) stands out.
+
+Usage (from the repository root):
+
+    python -m benchmarks.turn_latency [--log .pipey_cache/turns.jsonl] [--by language tools]
+    python -m benchmarks.turn_latency --json turn_latency.json
+"""
+
+import argparse
+import json
+from typing import Dict, List
+
+from pied_piper.turns import PERCENTILES, STAGES, TURN_LOG_PATH, TurnLog, stage_percentiles
+
+DIMENSIONS = ("release", "language", "tools")
+
+
+def print_table(title: str, table: Dict[str, Dict[str, Dict]], order: List[str]):
+    print(f"\n{title}")
+    header = " ".join(f"{stage:>17}" for stage in STAGES)
+    print(f"  {'turns':>21}  {header}")
+    for group in order:
+        stages = table[group]
+        cells = []
+        for stage in STAGES:
+            stats = stages.get(stage)
+            cells.append(
+                f"{stats['p50']:>5.0f}/{stats['p95']:>5.0f}/{stats['p99']:>5.0f}" if stats else f"{'-':>17}"
+            )
+        turns = max((s["count"] for s in stages.values()), default=0)
+        print(f"  {group[:14]:<14} {turns:>6}  " + " ".join(f"{c:>17}" for c in cells))
+
+
+def print_regressions(table: Dict[str, Dict[str, Dict]], releases: List[str]):
+    if len(releases) < 2:
+        return
+    print("\np95 change from the previous release (ms)")
+    for previous, current in zip(releases, releases[1:]):
+        deltas = []
+        for stage in STAGES:
+            before = table[previous].get(stage)
+            after = table[current].get(stage)
+            if before and after:
+                deltas.append(f"{stage} {after['p95'] - before['p95']:+.0f}")
+        print(f"  {previous} -> {current}: {', '.join(deltas) or 'no common stages'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--log", default=TURN_LOG_PATH)
+    parser.add_argument("--by", nargs="+", choices=DIMENSIONS, default=list(DIMENSIONS))
+    parser.add_argument("--json", help="also write the tables to this file")
+    args = parser.parse_args()
+
+    records = TurnLog(args.log).read()
+    if not records:
+        print(f"No turns logged in {args.log}")
+        return
+
+    print(f"{len(records)} turns; cells are p{'/p'.join(str(p) for p in PERCENTILES)} in ms, "
+          f"measured from the end of the user's speech (tool: time spent in tools)")
+    report = {}
+    for dimension in args.by:
+        table = stage_percentiles(records, dimension)
+        if dimension == "release":
+            order = list(dict.fromkeys(str(r.get("release")) for r in records))
+        else:
+            order = sorted(table, key=lambda group: -max(s["count"] for s in table[group].values()))
+        print_table(f"by {dimension}", table, order)
+        if dimension == "release":
+            print_regressions(table, order)
+        report[dimension] = table
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
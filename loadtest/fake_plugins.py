@@ -0,0 +1,126 @@
+"""Fake STT, LLM and TTS plugins for load testing the agent without paid APIs.
+
+``ScriptedLLM`` plays the LLM's role in a turn without a model. When a user
+message arrives whose text was registered in ``SCRIPTED_CALLS``, it calls that
+message's tool with the registered arguments, provided the tool is exposed
+this turn. The agent's real tool code then runs against the mock upstreams.
+After the tool output it streams a short spoken reply token by token. Each
+step waits for configurable first-token and per-token delays.
+
+``SilentTTS`` returns silence as long as the text would take to speak, after
+a configurable latency. ``NullSTT`` satisfies the agent's STT slot: the
+simulated participants inject final transcripts as text, so it is never asked
+to recognize audio.
+"""
+
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+from livekit.agents import APIConnectOptions, llm, stt, tts, utils
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, NotGivenOr
+
+from pied_piper.prompt import tool_name
+
+# Utterance text -> (tool name, arguments); filled in by the load test scenario
+SCRIPTED_CALLS: Dict[str, Tuple[str, Dict]] = {}
+
+REPLY = "Here is what I found. Let me know if you would like to hear more or play something else."
+
+
+class ScriptedLLM(llm.LLM):
+    def __init__(self, ttft: float = 0.35, token_interval: float = 0.02):
+        super().__init__()
+        self.ttft = ttft
+        self.token_interval = token_interval
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools: Optional[list] = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict] = NOT_GIVEN,
+    ) -> "ScriptedLLMStream":
+        return ScriptedLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+
+class ScriptedLLMStream(llm.LLMStream):
+    def _next_call(self) -> Optional[Tuple[str, Dict]]:
+        last = self._chat_ctx.items[-1] if self._chat_ctx.items else None
+        # A tool already ran this turn: answer it instead of calling again
+        if last is None or getattr(last, "type", None) != "message" or last.role != "user":
+            return None
+        call = SCRIPTED_CALLS.get(last.text_content or "")
+        exposed = {tool_name(tool) for tool in self._tools}
+        return call if call and call[0] in exposed else None
+
+    async def _run(self):
+        request_id = utils.shortuuid()
+        await asyncio.sleep(self._llm.ttft)
+        call = self._next_call()
+        if call is not None:
+            name, arguments = call
+            self._event_ch.send_nowait(llm.ChatChunk(
+                id=request_id,
+                delta=llm.ChoiceDelta(
+                    role="assistant",
+                    tool_calls=[llm.FunctionToolCall(
+                        name=name, arguments=json.dumps(arguments), call_id=utils.shortuuid("call_")
+                    )],
+                ),
+            ))
+            return
+
+        for word in REPLY.split(" "):
+            self._event_ch.send_nowait(llm.ChatChunk(
+                id=request_id, delta=llm.ChoiceDelta(role="assistant", content=word + " ")
+            ))
+            await asyncio.sleep(self._llm.token_interval)
+
+
+class SilentTTS(tts.TTS):
+    def __init__(self, latency: float = 0.25, chars_per_second: float = 15.0, sample_rate: int = 24000):
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False), sample_rate=sample_rate, num_channels=1
+        )
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "SilentChunkedStream":
+        return SilentChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class SilentChunkedStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter):
+        await asyncio.sleep(self._tts.latency)
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._tts.sample_rate,
+            num_channels=1,
+            mime_type="audio/pcm",
+        )
+        samples = int(len(self.input_text) / self._tts.chars_per_second * self._tts.sample_rate)
+        output_emitter.push(bytes(2 * samples))
+        output_emitter.flush()
+
+
+class NullSTT(stt.STT):
+    def __init__(self):
+        super().__init__(capabilities=stt.STTCapabilities(streaming=False, interim_results=False))
+
+    async def _recognize_impl(
+        self,
+        buffer: utils.AudioBuffer,
+        *,
+        language: NotGivenOr[str] = NOT_GIVEN,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.SpeechEvent:
+        return stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            alternatives=[stt.SpeechData(language=language or "en", text="")],
+        )
@@ -0,0 +1,202 @@
+"""Local stand-ins for SerpAPI and the YouTube Data API.
+
+Both endpoints answer with deterministic, realistically shaped payloads.
+SerpAPI returns ``organic_results`` whose snippets carry dates, chart
+positions and credits, so the fact extractors do real work. YouTube returns
+``items`` with video snippets. Each endpoint has its own latency (base plus
+uniform jitter) and error rate. Errors reply 500, or 429 when
+``--quota-errors`` is set.
+
+The agent is pointed here through ``PIPEY_SERPAPI_ENDPOINT`` and
+``PIPEY_YOUTUBE_SEARCH_ENDPOINT``. ``python -m loadtest.run`` starts the
+server by itself. To drive a real worker instead, run it standalone:
+
+    python -m loadtest.mock_upstreams --port 8089 --serp-latency-ms 400 --serp-error-rate 0.02
+    PIPEY_SERPAPI_ENDPOINT=http://127.0.0.1:8089/search \\
+    PIPEY_YOUTUBE_SEARCH_ENDPOINT=http://127.0.0.1:8089/youtube/v3/search \\
+    python Pied_Piper_local_script.py dev
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from aiohttp import web
+
+SERPAPI_PATH = "/search"
+YOUTUBE_PATH = "/youtube/v3/search"
+
+
+@dataclass
+class UpstreamProfile:
+    latency_ms: float = 300.0
+    jitter_ms: float = 200.0
+    error_rate: float = 0.0
+
+    def delay(self, rng: random.Random) -> float:
+        return (self.latency_ms + rng.uniform(0, self.jitter_ms)) / 1000
+
+
+def _seed(query: str) -> int:
+    return int.from_bytes(hashlib.sha256(query.encode("utf-8")).digest()[:8], "big")
+
+
+def serpapi_payload(query: str, num: int) -> Dict:
+    rng = random.Random(_seed(query))
+    subject = query[:60] or "the song"
+    year = rng.randint(1965, 2023)
+    results = []
+    for i in range(num):
+        results.append({
+            "position": i + 1,
+            "title": f"{subject.title()} - facts, history and meaning ({['Wikipedia', 'Songfacts', 'Billboard', 'Rolling Stone'][i % 4]})",
+            "link": f"https://example.org/{_seed(query + str(i)) % 10**8}",
+            "snippet": (
+                f"{subject.title()} was released in {year} on the album Night Lights. "
+                f"It peaked at number {rng.randint(1, 40)} on the Billboard Hot 100 and was certified "
+                f"{rng.choice(['gold', 'platinum', '2x platinum'])}. Written by {rng.choice(['A. Reyes', 'J. Park', 'M. Laurent'])} "
+                f"and produced by {rng.choice(['Rick Rubin', 'Max Martin', 'Brian Eno'])}. "
+                f"The band famously recorded it in a single take in {rng.randint(1, 5)} hours."
+            ),
+        })
+    return {
+        "search_metadata": {"status": "Success"},
+        "search_parameters": {"q": query},
+        "organic_results": results,
+        "knowledge_graph": {"title": subject.title(), "type": "Song", "description": f"Song released in {year}."},
+    }
+
+
+def youtube_payload(query: str, max_results: int) -> Dict:
+    rng = random.Random(_seed(query))
+    items = []
+    for i in range(max_results):
+        video_id = f"{_seed(query + str(i)) % 10**11:011d}"
+        items.append({
+            "id": {"kind": "youtube#video", "videoId": video_id},
+            "snippet": {
+                "title": f"{query.title()} ({['Official Video', 'Live', 'Lyrics', 'Audio', 'Remastered'][i % 5]})",
+                "description": f"Official upload of {query}.",
+                "channelTitle": rng.choice(["Artist VEVO", "Topic", "Live Sessions", "Classic Hits"]),
+                "publishedAt": f"{rng.randint(2008, 2024)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00Z",
+                "thumbnails": {"default": {"url": f"https://i.ytimg.com/vi/{video_id}/default.jpg"}},
+            },
+        })
+    return {"kind": "youtube#searchListResponse", "items": items}
+
+
+class MockUpstreams:
+    """aiohttp app serving both stand-in APIs, with per-endpoint request and error counters."""
+
+    def __init__(self, serpapi: UpstreamProfile, youtube: UpstreamProfile, quota_errors: bool = False, seed: int = 0):
+        self.profiles = {"serpapi": serpapi, "youtube": youtube}
+        self.quota_errors = quota_errors
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._rng = random.Random(seed)
+        self.app = web.Application()
+        self.app.router.add_get(SERPAPI_PATH, self._serpapi)
+        self.app.router.add_get(YOUTUBE_PATH, self._youtube)
+
+    async def _respond(self, upstream: str, payload_fn) -> web.Response:
+        profile = self.profiles[upstream]
+        self.requests[upstream] += 1
+        await asyncio.sleep(profile.delay(self._rng))
+        if self._rng.random() < profile.error_rate:
+            self.errors[upstream] += 1
+            status = 429 if self.quota_errors else 500
+            return web.json_response({"error": f"simulated {upstream} failure"}, status=status)
+        return web.json_response(payload_fn())
+
+    async def _serpapi(self, request: web.Request) -> web.Response:
+        query = request.query.get("q", "")
+        num = int(request.query.get("num", "10"))
+        return await self._respond("serpapi", lambda: serpapi_payload(query, num))
+
+    async def _youtube(self, request: web.Request) -> web.Response:
+        query = request.query.get("q", "")
+        max_results = int(request.query.get("maxResults", "5"))
+        return await self._respond("youtube", lambda: youtube_payload(query, max_results))
+
+
+class MockUpstreamServer:
+    """Run ``MockUpstreams`` on its own thread and event loop.
+
+    Keeping the stand-ins off the agent's loop means their work never shows
+    up as agent event-loop lag.
+    """
+
+    def __init__(self, upstreams: MockUpstreams, host: str = "127.0.0.1", port: int = 0):
+        self.upstreams = upstreams
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, name="mock-upstreams", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._start())
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _start(self):
+        self._runner = web.AppRunner(self.upstreams.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 picks a free port; read back the one bound
+        self.port = self._runner.addresses[0][1]
+
+    def start(self) -> "MockUpstreamServer":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    for upstream, latency in (("serp", 400), ("youtube", 150)):
+        parser.add_argument(f"--{upstream}-latency-ms", type=float, default=latency)
+        parser.add_argument(f"--{upstream}-jitter-ms", type=float, default=latency / 2)
+        parser.add_argument(f"--{upstream}-error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-errors", action="store_true", help="fail with 429 instead of 500")
+
+
+def upstreams_from_args(args: argparse.Namespace) -> MockUpstreams:
+    return MockUpstreams(
+        serpapi=UpstreamProfile(args.serp_latency_ms, args.serp_jitter_ms, args.serp_error_rate),
+        youtube=UpstreamProfile(args.youtube_latency_ms, args.youtube_jitter_ms, args.youtube_error_rate),
+        quota_errors=args.quota_errors,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    print(f"Serving SerpAPI at http://{args.host}:{args.port}{SERPAPI_PATH} "
+          f"and YouTube at http://{args.host}:{args.port}{YOUTUBE_PATH}")
+    web.run_app(upstreams_from_args(args).app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Multi-session load test for one agent worker process.
+
+Runs N concurrent simulated participants against ``MultilingualPipeyAgent``
+inside a single process, the way one LiveKit worker would host them. The
+plugins are fakes (``loadtest.fake_plugins``), and SerpAPI and YouTube are
+local stand-ins with configurable latency and error rates
+(``loadtest.mock_upstreams``). Every tool call still runs the agent's real
+code: search client, caches, fact extraction, response streaming and
+rendering.
+
+There is no audio track. Each participant waits a think time, waits the
+simulated STT delay, and then sends its utterance as the final transcript
+through ``AgentSession.run``. A turn's latency runs from the end of the
+user's speech until the agent's reply, including any tool call, has finished.
+
+For each concurrency stage the run reports turn latency percentiles (overall
+and per tool), event-loop lag, errors, upstream request counts and an RSS
+timeline. The worker's loop watchdog (``pied_piper.watchdog``) runs too and
+attributes any step that blocked the loop to its tool. ``sessions per worker`` is the largest stage that met the latency,
+lag and error targets.
+
+Usage (from the repository root; needs livekit-agents and its silero plugin):
+
+    python -m loadtest.run --sessions 1 5 10 25 --turns 6
+    python -m loadtest.run --script Pied_Piper_web.py --serp-latency-ms 900 --serp-error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+import resource
+import tempfile
+import time
+import webbrowser
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from loadtest.mock_upstreams import (
+    SERPAPI_PATH,
+    YOUTUBE_PATH,
+    MockUpstreamServer,
+    add_profile_arguments,
+    upstreams_from_args,
+)
+from pied_piper.stats import percentile
+from pied_piper.watchdog import get_watchdog
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SONGS = [
+    ("Bohemian Rhapsody", "Queen"),
+    ("Hey Jude", "The Beatles"),
+    ("Billie Jean", "Michael Jackson"),
+    ("Smells Like Teen Spirit", "Nirvana"),
+    ("Rolling in the Deep", "Adele"),
+    ("Hotel California", "Eagles"),
+    ("Superstition", "Stevie Wonder"),
+    ("Blinding Lights", "The Weeknd"),
+    ("Wonderwall", "Oasis"),
+    ("Shape of You", "Ed Sheeran"),
+    ("Purple Rain", "Prince"),
+    ("Dancing Queen", "ABBA"),
+    ("Lose Yourself", "Eminem"),
+    ("Bad Guy", "Billie Eilish"),
+    ("Take On Me", "a-ha"),
+    ("Clocks", "Coldplay"),
+]
+GENRES = ["pop", "rock", "hip hop", "jazz", "electronic"]
+FEELINGS = ["stressed", "sad", "anxious", "overwhelmed"]
+
+
+def scenario_turn(rng: random.Random) -> Tuple[str, Optional[Tuple[str, Dict]]]:
+    """One user utterance and the tool call the scripted LLM should make for it."""
+    song, artist = rng.choice(SONGS)
+    kind = rng.choices(
+        ["play", "search", "lyrics", "meaning", "therapy", "trends", "debate", "chat"],
+        weights=[25, 10, 10, 15, 10, 5, 5, 20],
+    )[0]
+    if kind == "play":
+        return f"play {song} by {artist}", ("play_youtube_music", {"song_query": f"{song} {artist}"})
+    if kind == "search":
+        return f"search for songs by {artist}", ("search_youtube_songs", {"query": artist, "num_results": 5})
+    if kind == "lyrics":
+        return f"which song has the lyrics from {song}", ("find_lyrics", {"lyrics_snippet": f"{song} chorus"})
+    if kind == "meaning":
+        return f"what does {song} by {artist} mean", (
+            "interpret_song_meaning", {"song_name": song, "artist_name": artist}
+        )
+    if kind == "therapy":
+        feeling = rng.choice(FEELINGS)
+        return f"I'm feeling {feeling} today, can music help", ("music_therapy_session", {"current_feeling": feeling})
+    if kind == "trends":
+        genre = rng.choice(GENRES)
+        return f"what are the upcoming music trends in {genre}", ("predict_music_trends", {"genre": genre})
+    if kind == "debate":
+        return f"I think {artist} is the best artist ever", (
+            "start_music_debate", {"topic": f"{artist} is the best artist", "user_position": "for"}
+        )
+    return "hi, how is your day going", None
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current RSS, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class StageMetrics:
+    sessions: int
+    turn_seconds: List[float] = field(default_factory=list)
+    tool_seconds: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    lag_seconds: List[float] = field(default_factory=list)
+    rss_timeline: List[Tuple[float, int]] = field(default_factory=list)
+    errors: int = 0
+    duration: float = 0.0
+    upstream_requests: Dict[str, int] = field(default_factory=dict)
+    upstream_errors: Dict[str, int] = field(default_factory=dict)
+    blocked_steps: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict:
+        rss = [r for _, r in self.rss_timeline] or [0]
+        turns = len(self.turn_seconds) + self.errors
+        return {
+            "sessions": self.sessions,
+            "turns": turns,
+            "errors": self.errors,
+            "error_rate": self.errors / turns if turns else 0.0,
+            "turns_per_second": len(self.turn_seconds) / self.duration if self.duration else 0.0,
+            "turn_p50_ms": _ms(percentile(self.turn_seconds, 50)),
+            "turn_p95_ms": _ms(percentile(self.turn_seconds, 95)),
+            "turn_p99_ms": _ms(percentile(self.turn_seconds, 99)),
+            "tools": {
+                name: {"calls": len(s), "p50_ms": _ms(percentile(s, 50)), "p95_ms": _ms(percentile(s, 95))}
+                for name, s in sorted(self.tool_seconds.items())
+            },
+            "loop_lag_p50_ms": _ms(percentile(self.lag_seconds, 50)),
+            "loop_lag_p99_ms": _ms(percentile(self.lag_seconds, 99)),
+            "loop_lag_max_ms": _ms(max(self.lag_seconds, default=0.0)),
+            "rss_start_mb": rss[0] / 2**20,
+            "rss_end_mb": rss[-1] / 2**20,
+            "rss_peak_mb": max(rss) / 2**20,
+            "rss_timeline": [(round(t, 1), round(r / 2**20, 1)) for t, r in self.rss_timeline],
+            "upstream_requests": self.upstream_requests,
+            "upstream_errors": self.upstream_errors,
+            "blocked_steps": self.blocked_steps,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else seconds * 1000
+
+
+async def sample_loop_lag(metrics: StageMetrics, interval: float):
+    """Record how late the loop wakes a sleeper; anything beyond ``interval`` is lag."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        metrics.lag_seconds.append(max(time.perf_counter() - started - interval, 0.0))
+
+
+async def sample_rss(metrics: StageMetrics, started: float, interval: float):
+    while True:
+        metrics.rss_timeline.append((time.perf_counter() - started, rss_bytes()))
+        await asyncio.sleep(interval)
+
+
+def load_agent_module(script_path: str):
+    spec = importlib.util.spec_from_file_location("pied_piper_agent", script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_participant(make_agent, seed: int, args: argparse.Namespace, metrics: StageMetrics):
+    from livekit.agents import AgentSession
+
+    from loadtest.fake_plugins import SCRIPTED_CALLS
+
+    rng = random.Random(seed)
+    session = AgentSession()
+    await session.start(make_agent())
+    try:
+        for _ in range(args.turns):
+            await asyncio.sleep(rng.uniform(args.think_min_s, args.think_max_s))
+            text, call = scenario_turn(rng)
+            if call is not None:
+                SCRIPTED_CALLS[text] = call
+            started = time.perf_counter()
+            await asyncio.sleep(args.stt_ms / 1000)
+            try:
+                await session.run(user_input=text)
+            except Exception as e:
+                metrics.errors += 1
+                logging.getLogger("loadtest").warning(f"Turn failed ({text!r}): {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            metrics.turn_seconds.append(elapsed)
+            metrics.tool_seconds[call[0] if call else "(none)"].append(elapsed)
+    finally:
+        await session.aclose()
+
+
+async def run_stage(make_agent, sessions: int, args: argparse.Namespace, server: MockUpstreamServer) -> StageMetrics:
+    metrics = StageMetrics(sessions)
+    requests_before = dict(server.upstreams.requests)
+    errors_before = dict(server.upstreams.errors)
+    blocks_before = dict(get_watchdog().block_counts)
+    started = time.perf_counter()
+    samplers = [
+        asyncio.ensure_future(sample_loop_lag(metrics, args.lag_interval_ms / 1000)),
+        asyncio.ensure_future(sample_rss(metrics, started, args.rss_interval_s)),
+    ]
+    try:
+        await asyncio.gather(*(
+            run_participant(make_agent, seed=sessions * 1000 + i, args=args, metrics=metrics)
+            for i in range(sessions)
+        ))
+    finally:
+        metrics.duration = time.perf_counter() - started
+        for sampler in samplers:
+            sampler.cancel()
+        metrics.rss_timeline.append((metrics.duration, rss_bytes()))
+    metrics.upstream_requests = {
+        k: v - requests_before.get(k, 0) for k, v in server.upstreams.requests.items()
+    }
+    metrics.upstream_errors = {k: v - errors_before.get(k, 0) for k, v in server.upstreams.errors.items()}
+    metrics.blocked_steps = {
+        k: v - blocks_before.get(k, 0)
+        for k, v in get_watchdog().block_counts.items()
+        if v > blocks_before.get(k, 0)
+    }
+    return metrics
+
+
+def meets_targets(summary: Dict, args: argparse.Namespace) -> bool:
+    return (
+        summary["turn_p95_ms"] is not None
+        and summary["turn_p95_ms"] <= args.max_turn_p95_ms
+        and (summary["loop_lag_p99_ms"] or 0.0) <= args.max_lag_p99_ms
+        and summary["error_rate"] <= args.max_error_rate
+    )
+
+
+def print_stage(summary: Dict, ok: bool):
+    print(f"\n== {summary['sessions']} concurrent sessions: {'within targets' if ok else 'TARGETS MISSED'}")
+    print(f"  turns {summary['turns']} ({summary['errors']} failed), {summary['turns_per_second']:.2f} turns/s")
+    print(f"  turn latency p50/p95/p99 : {summary['turn_p50_ms']:.0f} / {summary['turn_p95_ms']:.0f} / "
+          f"{summary['turn_p99_ms']:.0f} ms")
+    print(f"  event-loop lag p50/p99/max: {summary['loop_lag_p50_ms']:.1f} / {summary['loop_lag_p99_ms']:.1f} / "
+          f"{summary['loop_lag_max_ms']:.1f} ms")
+    print(f"  RSS start/end/peak       : {summary['rss_start_mb']:.0f} / {summary['rss_end_mb']:.0f} / "
+          f"{summary['rss_peak_mb']:.0f} MB")
+    print(f"  upstream requests        : {summary['upstream_requests']} (errors {summary['upstream_errors']})")
+    print(f"  steps blocking the loop  : {summary['blocked_steps'] or 'none'}")
+    for name, stats in summary["tools"].items():
+        print(f"    {name:<32} {stats['calls']:>4} turns  p50 {stats['p50_ms']:>6.0f} ms  p95 {stats['p95_ms']:>6.0f} ms")
+
+
+async def run(args: argparse.Namespace):
+    server = MockUpstreamServer(upstreams_from_args(args)).start()
+    # Read at import time by pied_piper.search and the agent script
+    os.environ["PIPEY_SERPAPI_ENDPOINT"] = server.base_url + SERPAPI_PATH
+    os.environ["PIPEY_YOUTUBE_SEARCH_ENDPOINT"] = server.base_url + YOUTUBE_PATH
+    os.environ.setdefault("SERPAPI_KEY", "loadtest")
+    os.environ.setdefault("YOUTUBE_API_KEY", "loadtest")
+    # Fresh caches, so the stand-ins see the traffic a cold worker would send
+    cache_dir = tempfile.mkdtemp(prefix="pipey-loadtest-")
+    os.environ["PIPEY_SEARCH_CACHE_PATH"] = os.path.join(cache_dir, "search_results.sqlite3")
+    os.environ["PIPEY_PHRASE_CACHE_DIR"] = os.path.join(cache_dir, "tts_phrases")
+    # Playback tools would otherwise open a browser tab per simulated play
+    webbrowser.open_new = lambda url: True
+
+    from livekit.plugins import silero
+
+    from loadtest.fake_plugins import NullSTT, ScriptedLLM, SilentTTS
+    from pied_piper.http import close_http_session
+
+    module = load_agent_module(args.script)
+    if not args.verbose:
+        # The agent script pins its logger to INFO; keep the report readable
+        logging.getLogger("multilingual-pipey").setLevel(logging.WARNING)
+    vad = silero.VAD.load()
+    get_watchdog().start()
+
+    def make_agent():
+        return module.MultilingualPipeyAgent(
+            vad=vad,
+            stt=NullSTT(),
+            llm=ScriptedLLM(ttft=args.llm_ttft_ms / 1000, token_interval=args.llm_token_ms / 1000),
+            tts=SilentTTS(latency=args.tts_ms / 1000),
+        )
+
+    summaries = []
+    try:
+        for sessions in args.sessions:
+            summary = (await run_stage(make_agent, sessions, args, server)).summary()
+            ok = meets_targets(summary, args)
+            print_stage(summary, ok)
+            summaries.append({**summary, "within_targets": ok})
+    finally:
+        get_watchdog().stop()
+        await close_http_session()
+        server.stop()
+
+    sustained = [s["sessions"] for s in summaries if s["within_targets"]]
+    print(f"\nSessions per worker: {max(sustained) if sustained else 0} "
+          f"(turn p95 <= {args.max_turn_p95_ms:.0f} ms, loop lag p99 <= {args.max_lag_p99_ms:.0f} ms, "
+          f"errors <= {args.max_error_rate:.0%})")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"stages": summaries, "sessions_per_worker": max(sustained, default=0)}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--script", default=os.path.join(ROOT, "Pied_Piper_local_script.py"))
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25],
+                        help="concurrency of each stage, run in order")
+    parser.add_argument("--turns", type=int, default=6, help="turns per simulated participant")
+    parser.add_argument("--think-min-s", type=float, default=1.0)
+    parser.add_argument("--think-max-s", type=float, default=4.0)
+    parser.add_argument("--stt-ms", type=float, default=300, help="simulated final-transcript delay")
+    parser.add_argument("--llm-ttft-ms", type=float, default=350)
+    parser.add_argument("--llm-token-ms", type=float, default=20)
+    parser.add_argument("--tts-ms", type=float, default=250, help="simulated TTS time to first audio")
+    add_profile_arguments(parser)
+    parser.add_argument("--lag-interval-ms", type=float, default=50)
+    parser.add_argument("--rss-interval-s", type=float, default=5)
+    parser.add_argument("--max-turn-p95-ms", type=float, default=6000)
+    parser.add_argument("--max-lag-p99-ms", type=float, default=100)
+    parser.add_argument("--max-error-rate", type=float, default=0.02)
+    parser.add_argument("--json", help="also write the per-stage report to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the agent's own logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
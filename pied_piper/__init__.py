@@ -0,0 +1 @@
+"""Shared runtime helpers for the Pied Piper voice agents."""
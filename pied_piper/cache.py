@@ -0,0 +1,210 @@
+"""Bounded in-memory cache for the agent's per-session music knowledge.
+
+Replaces the plain ``music_knowledge_cache`` dict, which grew without bound in
+long-lived voice sessions. Entries are evicted least-recently-used once the
+entry or byte budget is exceeded and expire according to their kind.
+
+Songs are stored under their canonical identity (see
+:mod:`pied_piper.identity`) and a secondary index maps folded titles and
+artists to those keys, so knowledge cached by one tool is found by the others.
+"""
+
+import json
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from pied_piper.identity import fold, normalize_artist, normalize_title, song_cache_key
+
+# Time-to-live in seconds for each kind of entry
+KIND_TTLS = {
+    "playback": 6 * 3600,
+    "song_info": 24 * 3600,
+    "trivia": 24 * 3600,
+}
+
+MAX_ENTRIES = 256
+MAX_BYTES = 2 * 1024 * 1024
+
+
+def classify_entry(value: Any) -> str:
+    """Infer the kind of a cached value from the fields each tool stores."""
+    if isinstance(value, dict):
+        if value.get("source") == "youtube_api":
+            return "playback"
+        if "trivia_facts" in value:
+            return "trivia"
+    return "song_info"
+
+
+def describe_entry(value: Dict) -> str:
+    """One-line description of any cached entry, used to build RAG context."""
+    title = value.get("title") or value.get("song") or "Unknown song"
+    artist = value.get("artist") or value.get("channel") or "Unknown artist"
+    trivia = value.get("trivia_facts") or []
+    info = (
+        value.get("basic_info")
+        or value.get("interesting_facts")
+        or " | ".join(trivia[:2])
+        or value.get("summary")
+        or value.get("youtube_url")
+        or ""
+    )
+    return f"{title} by {artist}: {info[:150]}…"
+
+
+def estimate_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class MusicKnowledgeCache(MutableMapping):
+    """Dict-like LRU cache with per-kind TTLs and hit/miss/eviction counters."""
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = {**KIND_TTLS, **(ttls or {})}
+        # key -> (value, kind, size, expires_at); order is least to most recently used
+        self._entries: "OrderedDict[str, Tuple[Any, str, int, float]]" = OrderedDict()
+        self._bytes = 0
+        # Secondary index: folded entity (title, artist, "title artist") -> keys
+        self._entity_index: Dict[str, Set[str]] = defaultdict(set)
+        self._entities_by_key: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, key: str, now: Optional[float] = None) -> bool:
+        return self._entries[key][3] <= (now if now is not None else time.monotonic())
+
+    def _drop(self, key: str):
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        for entity in self._entities_by_key.pop(key, ()):
+            keys = self._entity_index[entity]
+            keys.discard(key)
+            if not keys:
+                del self._entity_index[entity]
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [k for k in self._entries if self._is_expired(k, now)]:
+            self._drop(key)
+            self.expirations += 1
+
+    def set(self, key: str, value: Any, kind: Optional[str] = None):
+        """Store ``value`` under ``key``; ``kind`` defaults to :func:`classify_entry`."""
+        kind = kind or classify_entry(value)
+        size = estimate_size(value)
+        if key in self._entries:
+            self._drop(key)
+        expires_at = time.monotonic() + self.ttls.get(kind, KIND_TTLS["song_info"])
+        self._entries[key] = (value, kind, size, expires_at)
+        self._bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            if oldest == key and len(self._entries) == 1:
+                break
+            self._drop(oldest)
+            self.evictions += 1
+
+    def __setitem__(self, key: str, value: Any):
+        self.set(key, value)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._entries or self._is_expired(key):
+            if key in self._entries:
+                self._drop(key)
+                self.expirations += 1
+            self.misses += 1
+            raise KeyError(key)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key][0]
+
+    def __contains__(self, key: object) -> bool:
+        # Only misses are counted here so `if key in cache: cache[key]` counts once
+        if key in self._entries and not self._is_expired(key):
+            return True
+        self.misses += 1
+        return False
+
+    def __delitem__(self, key: str):
+        self._drop(key)
+
+    def __iter__(self) -> Iterator[str]:
+        self._purge_expired()
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        self._purge_expired()
+        return len(self._entries)
+
+    def values(self):
+        # Reading every value for a listing is not a lookup, so bypass the counters
+        self._purge_expired()
+        return [entry[0] for entry in self._entries.values()]
+
+    def items(self):
+        self._purge_expired()
+        return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    # ---------- song identity API ----------
+    def put_song(self, kind: str, title: Optional[str], artist: Optional[str], value: Any) -> str:
+        """Store knowledge about a song under its canonical key and index it."""
+        key = song_cache_key(kind, title, artist)
+        self.set(key, value, kind)
+        if key in self._entries:
+            norm_title, norm_artist = normalize_title(title), normalize_artist(artist)
+            entities = {e for e in (norm_title, norm_artist, f"{norm_title} {norm_artist}".strip()) if e}
+            self._entities_by_key[key] = entities
+            for entity in entities:
+                self._entity_index[entity].add(key)
+        return key
+
+    def find_song(self, kind: str, title: Optional[str], artist: Optional[str] = None) -> Optional[Any]:
+        """Return cached knowledge of ``kind`` about a song.
+
+        Without an artist, any entry of that kind whose title matches is used.
+        """
+        value = self.get(song_cache_key(kind, title, artist))
+        if value is not None or artist:
+            return value
+        prefix = f"{kind}:{normalize_title(title)}|"
+        for key in self._entity_index.get(normalize_title(title), ()):
+            if key.startswith(prefix):
+                return self.get(key)
+        return None
+
+    def lookup_entity(self, entity: str) -> List[Any]:
+        """Return every live entry indexed under a title or artist mention."""
+        keys = set()
+        for candidate in {normalize_title(entity), normalize_artist(entity), fold(entity)}:
+            keys |= self._entity_index.get(candidate, set())
+        found = []
+        for key in sorted(keys):
+            value = self.get(key)
+            if value is not None:
+                found.append(value)
+        return found
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
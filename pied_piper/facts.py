@@ -0,0 +1,267 @@
+"""Fact extraction engine for SerpAPI snippets.
+
+The original extractors ran ``.*`` and ``[^.!?]*...[^.!?]*`` patterns (some
+with ``re.DOTALL``) over the concatenated snippet text, which backtracks
+badly on long, punctuation-poor input. Here the input is capped, split into
+sentence segments in one linear pass, and every pattern runs on a single
+segment of bounded length. Patterns that used two unbounded stars around a
+keyword now check the keyword with a lookahead instead. Total work is
+therefore linear in the input size. A per-call time budget is kept as a
+safety net only: it sits well above the linear worst case at the input cap,
+so normal calls always run to completion and return the same facts however
+busy the process is. If it ever runs out, the facts found so far are
+returned.
+"""
+
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("multilingual-pipey")
+
+MAX_INPUT_CHARS = 20_000
+MAX_SEGMENT_CHARS = 400
+# About 5x the worst case at MAX_INPUT_CHARS (python -m benchmarks.fact_extraction)
+DEFAULT_TIME_BUDGET_SECONDS = 0.25
+
+# One pass over the text; a segment always ends at a terminator, a newline or
+# the end of input, so no start position is ever retried
+_SEGMENT_RE = re.compile(r"[^.!?\n]*(?:[.!?]+|\n|$)")
+
+
+class TimeBudget:
+    """Wall-clock deadline shared by every pattern of one extraction call."""
+
+    def __init__(self, seconds: float = DEFAULT_TIME_BUDGET_SECONDS):
+        self.deadline = time.perf_counter() + seconds
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.deadline
+
+
+def split_segments(text: str, max_input_chars: int = MAX_INPUT_CHARS) -> List[str]:
+    """Split capped input into sentence segments of at most ``MAX_SEGMENT_CHARS``.
+
+    Over-long segments keep their tail, so the sentence terminator (which most
+    fact patterns end on) survives the cut.
+    """
+    segments = []
+    for match in _SEGMENT_RE.finditer(text[:max_input_chars]):
+        segment = match.group(0)
+        if segment.strip():
+            segments.append(segment[-MAX_SEGMENT_CHARS:])
+    return segments
+
+
+def _first_match(patterns: Iterable["re.Pattern[str]"], segments: List[str], budget: TimeBudget) -> Optional["re.Match[str]"]:
+    """First match of the first pattern (in priority order) that matches any segment."""
+    for pattern in patterns:
+        for segment in segments:
+            if budget.expired():
+                return None
+            match = pattern.search(segment)
+            if match:
+                return match
+    return None
+
+
+# ---------- song details (release date, chart peak, genre, album) ----------
+DATE_PATTERNS = [
+    re.compile(r'released (?:on )?([^,.\n]+(?:19|20)\d{2})'),
+    re.compile(r'((?:19|20)\d{2})[^,.\n]*release'),
+    re.compile(r'came out (?:in )?([^,.\n]+(?:19|20)\d{2})'),
+]
+CHART_PATTERNS = [
+    re.compile(r'(?:peaked at|reached) (?:number |#)?(\d+)'),
+    re.compile(r'(?:billboard|chart) (?:number |#)?(\d+)'),
+    re.compile(r'(\d+) (?:on the|in the) (?:billboard|charts)'),
+]
+GENRE_PATTERNS = [
+    re.compile(r'(?:genre|style|music): ([^,.\n]+)'),
+    re.compile(r'(?:pop|rock|hip hop|rap|country|jazz|blues|electronic|folk|r&b|soul) (?:song|track|music)'),
+]
+ALBUM_PATTERNS = [
+    re.compile(r'from (?:the album|album) ["\']([^"\'\n]+)["\']'),
+    re.compile(r'album ["\']([^"\'\n]+)["\']'),
+    re.compile(r'appears on ([^,.\n]+(?:album|lp))'),
+]
+
+
+def extract_song_details(text: str, song_info: Dict, budget: Optional[TimeBudget] = None):
+    """Fill empty release/chart/genre/album fields of ``song_info`` from ``text``."""
+    budget = budget or TimeBudget()
+    segments = split_segments(text.lower())
+
+    if not song_info.get('release_info'):
+        match = _first_match(DATE_PATTERNS, segments, budget)
+        if match:
+            song_info['release_info'] = f"Released: {match.group(1).strip()}"
+
+    if not song_info.get('chart_performance'):
+        match = _first_match(CHART_PATTERNS, segments, budget)
+        if match:
+            song_info['chart_performance'] = f"Chart peak: #{match.group(1)}"
+
+    if not song_info.get('genre'):
+        match = _first_match(GENRE_PATTERNS, segments, budget)
+        if match:
+            song_info['genre'] = match.group(1).strip() if match.groups() else match.group(0)
+
+    if not song_info.get('album_info'):
+        match = _first_match(ALBUM_PATTERNS, segments, budget)
+        if match:
+            song_info['album_info'] = match.group(1).strip()
+
+
+# ---------- enhanced facts for find_song_info ----------
+ENHANCED_FACT_PATTERNS = [
+    # Awards and achievements
+    re.compile(r'(?:won|received|awarded|nominated for) ((?=[^,.\n]*(?:grammy|award|prize|oscar|golden globe))[^,.\n]*)'),
+    re.compile(r'(?:platinum|gold|diamond) (?:certified|selling|status)'),
+    re.compile(r'(?:million|billion) (?:copies sold|streams|downloads|views)'),
+    re.compile(r'(?:number one|#1|chart-topping) (?:hit|single|song)'),
+
+    # Historical/Cultural significance
+    re.compile(r'(?:first|only|last) (?:song|artist|band) to ([^,.\n]+)'),
+    re.compile(r'(?:banned|censored|controversial) (?:because|for|due to) ([^,.\n]+)'),
+    re.compile(r'(?:inspired|influenced) (?:by|from) ([^,.\n]+)'),
+    re.compile(r'(?:covered by|sampled by|referenced in) ([^,.\n]+)'),
+
+    # Recording/Production facts
+    re.compile(r'(?:recorded|produced|mixed) (?:in|at) ([^,.\n]+(?:studio|location))'),
+    re.compile(r'(?:took|spent) ([^,.\n]*(?:years?|months?|weeks?|days?)) (?:to (?:write|record|produce))'),
+    re.compile(r'(?:featured|includes) ([^,.\n]*(?:musician|artist|instrument))'),
+
+    # Commercial performance
+    re.compile(r'(?:stayed|remained) (?:at|on) (?:number|#) (\d+) (?:for) ([^,.\n]*(?:weeks?|months?))'),
+    re.compile(r'(?:reached|peaked at|hit) (?:number|#) (\d+) (?:in|on) ([^,.\n]*(?:chart|billboard|country))'),
+
+    # Unique characteristics
+    re.compile(r'(?:only|first|last) (?:song|track) (?:to|that) ([^,.\n]+)'),
+    re.compile(r'(?:unusual|unique|rare|special) (?:because|for) ([^,.\n]+)'),
+    re.compile(r'(?:hidden|secret|easter egg) ([^,.\n]+)'),
+]
+
+
+def extract_enhanced_facts(text: str, song_info: Dict, budget: Optional[TimeBudget] = None):
+    """Store the most interesting facts found in ``text`` on ``song_info``."""
+    budget = budget or TimeBudget()
+    segments = split_segments(text.lower())
+    interesting_facts = []
+
+    for pattern in ENHANCED_FACT_PATTERNS:
+        for segment in segments:
+            if budget.expired():
+                logger.debug("Enhanced fact extraction ran out of time budget")
+                break
+            for match in pattern.findall(segment):
+                if isinstance(match, tuple):
+                    fact = ' '.join([str(m) for m in match if m])
+                else:
+                    fact = str(match)
+
+                if len(fact.strip()) > 5:
+                    interesting_facts.append(fact.strip())
+
+    if interesting_facts:
+        unique_facts = list(dict.fromkeys(interesting_facts))
+        song_info['interesting_facts'] = ' | '.join(unique_facts[:3])
+        song_info['all_trivia'] = unique_facts
+
+
+# ---------- trivia facts for get_song_trivia ----------
+TRIVIA_SKIP_SOURCES = ['lyrics', 'youtube', 'spotify', 'apple music', 'soundcloud']
+
+# Literal anchors per pattern: a pattern can only match a segment containing one
+# of them, and a substring check is far cheaper than running the pattern
+_TRIVIA_ANCHORS: Dict["re.Pattern[str]", Tuple[str, ...]] = {}
+
+
+def _anchored(pattern: str, *anchors: str) -> "re.Pattern[str]":
+    compiled = re.compile(pattern, re.IGNORECASE)
+    _TRIVIA_ANCHORS[compiled] = anchors
+    return compiled
+
+
+TRIVIA_FACT_PATTERNS = [
+    _anchored(r'(?:interesting|surprising|unknown|secret|hidden|behind\b[^.!?]*?scenes?)[^.!?]*[.!?]',
+              "interesting", "surprising", "unknown", "secret", "hidden", "behind"),
+    _anchored(r'(?:did you know|fun fact|trivia)[^.!?]*[.!?]', "did you know", "fun fact", "trivia"),
+    _anchored(r'(?:inspired by|based on|written about)[^.!?]*[.!?]', "inspired by", "based on", "written about"),
+    _anchored(r'(?:recorded|produced|mixed) (?:in|at|by)[^.!?]*[.!?]', "recorded", "produced", "mixed"),
+    _anchored(r'(?:won|nominated|awarded|achieved)(?=[^.!?]*(?:grammy|award|chart|record))[^.!?]*[.!?]',
+              "won", "nominated", "awarded", "achieved"),
+    _anchored(r'(?:first|only|last|never|always)(?=[^.!?]*(?:song|time|artist|album))[^.!?]*[.!?]',
+              "first", "only", "last", "never", "always"),
+    _anchored(r'(?:million|billion|thousand)(?=[^.!?]*(?:copies|streams|downloads|sales))[^.!?]*[.!?]',
+              "million", "billion", "thousand"),
+    _anchored(r'(?:cover|version|sample) (?:of|by|from)[^.!?]*[.!?]', "cover", "version", "sample"),
+    _anchored(r'(?:banned|censored|controversial)[^.!?]*[.!?]', "banned", "censored", "controversial"),
+    _anchored(r'(?:meaning|about|refers to)[^.!?]*[.!?]', "meaning", "about", "refers to"),
+]
+TRIVIA_NUMBER_PATTERNS = [
+    _anchored(r'(?:peaked|reached|hit) (?:number|#) (\d+)[^.!?]*[.!?]', "peaked", "reached", "hit"),
+    _anchored(r'sold (?:over )?([0-9,]+) (?:million|thousand|copies)[^.!?]*[.!?]', "sold"),
+    _anchored(r'spent (\d+) weeks? (?:at|on)(?=[^.!?]*(?:chart|billboard))[^.!?]*[.!?]', "spent"),
+    _anchored(r'(?:19|20)\d{2}(?=[^.!?]*(?:first|debut|released))[^.!?]*[.!?]', "19", "20"),
+]
+_TRIVIA_PREFIX_RE = re.compile(r'^(?:interesting|surprising|fun fact)[:\s]*', re.IGNORECASE)
+
+
+def extract_trivia_facts(results: List[Dict], budget: Optional[TimeBudget] = None) -> List[str]:
+    """Extract interesting facts from the organic results of one trivia query.
+
+    Facts are collected in insertion order in a dict used as an ordered set.
+    Numeric facts are cut from the segment by the span of the match itself
+    (from the number to the end of its sentence), so no per-match pattern is
+    compiled and the snippet is never rescanned. A pattern only runs on the
+    segments that contain one of its literal anchors.
+    """
+    budget = budget or TimeBudget()
+    facts: Dict[str, None] = {}
+
+    for result in results:
+        snippet = result.get('snippet', '')
+        title = result.get('title', '').lower()
+
+        # Skip low-quality sources
+        if any(source in title for source in TRIVIA_SKIP_SOURCES):
+            continue
+
+        segments = [(segment, segment.lower()) for segment in split_segments(snippet)]
+
+        # Look for fact indicators in snippets
+        for pattern in TRIVIA_FACT_PATTERNS:
+            anchors = _TRIVIA_ANCHORS[pattern]
+            for segment, lowered in segments:
+                if not any(anchor in lowered for anchor in anchors):
+                    continue
+                if budget.expired():
+                    logger.debug("Trivia extraction ran out of time budget")
+                    return list(facts)
+                for match in pattern.findall(segment):
+                    cleaned_fact = match.strip()
+                    # Clean up the fact
+                    if len(cleaned_fact) > 20 and len(cleaned_fact) < 200:
+                        # Remove redundant phrases
+                        cleaned_fact = _TRIVIA_PREFIX_RE.sub('', cleaned_fact).strip()
+                        if cleaned_fact:
+                            facts.setdefault(cleaned_fact, None)
+
+        # Also look for numerical facts (chart positions, sales figures, etc.)
+        for pattern in TRIVIA_NUMBER_PATTERNS:
+            anchors = _TRIVIA_ANCHORS[pattern]
+            for segment, lowered in segments:
+                if not any(anchor in lowered for anchor in anchors):
+                    continue
+                if budget.expired():
+                    return list(facts)
+                for match in pattern.finditer(segment):
+                    # Every number pattern runs to the end of its sentence
+                    start = match.start(1) if match.re.groups else match.start()
+                    fact = segment[start:match.end()].strip()
+                    if fact and len(fact) < 150:
+                        facts.setdefault(fact, None)
+
+    return list(facts)
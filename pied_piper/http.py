@@ -0,0 +1,84 @@
+"""Process-wide pooled ``aiohttp`` session for upstream HTTP APIs.
+
+Opening a ``ClientSession`` per request pays a new connector, DNS lookup and
+TLS handshake every time. All agents in a worker process share this session
+instead; it keeps connections alive, caches DNS answers and is closed once
+the last job using it has ended.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger("multilingual-pipey")
+
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 20
+DNS_CACHE_TTL_SECONDS = 300
+KEEPALIVE_TIMEOUT_SECONDS = 30
+DEFAULT_TIMEOUT_SECONDS = 10.0
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_active_jobs = 0
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared session, creating it on the running loop if needed."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        if _session is not None:
+            _close_stale_session(_session, _session_loop)
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+            keepalive_timeout=KEEPALIVE_TIMEOUT_SECONDS,
+            enable_cleanup_closed=True,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT_SECONDS),
+        )
+        _session_loop = loop
+    return _session
+
+
+def _close_stale_session(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]):
+    """Close a session left behind on another event loop, on that loop.
+
+    A session can only be closed on the loop that created it. Its close is
+    scheduled there and runs once that loop runs again. A loop that is
+    already closed can run nothing, so its session is left to garbage
+    collection.
+    """
+    if session.closed or loop is None or loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(session.close(), loop)
+    logger.info("Closing pooled HTTP session left on a previous event loop")
+
+
+def acquire_http_session():
+    """Register a job that uses the shared session."""
+    global _active_jobs
+    _active_jobs += 1
+
+
+async def release_http_session():
+    """Unregister a job; the session is closed when no job is left using it."""
+    global _active_jobs
+    _active_jobs = max(_active_jobs - 1, 0)
+    if _active_jobs == 0:
+        await close_http_session()
+
+
+async def close_http_session():
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("Closed pooled HTTP session")
+    _session = None
+    _session_loop = None
@@ -0,0 +1,104 @@
+"""Canonical song identities shared by every cache lookup.
+
+Each tool used to invent its own cache key (``song_query`` with underscores,
+``result_{n}_{title}``, ``{song}_{artist}``, ``trivia_...``), so knowledge
+fetched by one tool was never found by another. Titles and artists are folded
+here (case, accents, punctuation, decorations such as "(Official Video)") and
+resolved through a small alias table before being combined into one key.
+"""
+
+import re
+import unicodedata
+from typing import Optional, Tuple
+
+# Folded alias -> folded canonical name
+ARTIST_ALIASES = {
+    "beatles": "the beatles",
+    "stones": "the rolling stones",
+    "rolling stones": "the rolling stones",
+    "jay z": "jayz",
+    "jayz": "jayz",
+    "beyonce knowles": "beyonce",
+    "ac dc": "acdc",
+    "guns n roses": "guns n roses",
+    "guns and roses": "guns n roses",
+    "rhcp": "red hot chili peppers",
+    "mj": "michael jackson",
+    "bts bangtan boys": "bts",
+}
+
+TITLE_ALIASES = {
+    "smells like teen spirits": "smells like teen spirit",
+    "bohemian rapsody": "bohemian rhapsody",
+}
+
+# Decorations that YouTube uploads and search queries add around the real title
+_DECORATION_RE = re.compile(
+    r"[\(\[][^\)\]]*(?:official|video|audio|lyrics?|visuali[sz]er|remaster(?:ed)?|live|hd|hq|4k|mv|explicit)[^\)\]]*[\)\]]",
+    re.IGNORECASE,
+)
+_FEATURING_RE = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s+.*$", re.IGNORECASE)
+_TRAILING_NOISE_RE = re.compile(
+    r"\s+(?:official\s+(?:music\s+)?(?:video|audio)|lyrics?|lyric\s+video|music\s+video|hd|hq)$"
+)
+_CHANNEL_SUFFIX_RE = re.compile(r"(?:\s*-\s*topic|vevo|\s+official)$", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fold(text: Optional[str]) -> str:
+    """Lower-case, strip accents and punctuation, and collapse whitespace."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    stripped = stripped.casefold().replace("&", " and ")
+    stripped = _NON_WORD_RE.sub(" ", stripped).replace("_", " ")
+    return _SPACE_RE.sub(" ", stripped).strip()
+
+
+def normalize_title(title: Optional[str]) -> str:
+    if not title:
+        return ""
+    cleaned = _DECORATION_RE.sub(" ", title)
+    cleaned = _FEATURING_RE.sub("", cleaned)
+    folded = fold(cleaned)
+    while True:
+        trimmed = _TRAILING_NOISE_RE.sub("", folded)
+        if trimmed == folded:
+            break
+        folded = trimmed
+    return TITLE_ALIASES.get(folded, folded)
+
+
+def normalize_artist(artist: Optional[str]) -> str:
+    if not artist or artist.strip().lower() == "unknown":
+        return ""
+    cleaned = _CHANNEL_SUFFIX_RE.sub("", artist.strip())
+    cleaned = _FEATURING_RE.sub("", cleaned)
+    folded = fold(cleaned)
+    return ARTIST_ALIASES.get(folded, folded)
+
+
+def song_identity(title: Optional[str], artist: Optional[str] = None) -> str:
+    """Return the canonical ``title|artist`` identity of a song."""
+    return f"{normalize_title(title)}|{normalize_artist(artist)}"
+
+
+def song_cache_key(kind: str, title: Optional[str], artist: Optional[str] = None) -> str:
+    """Cache key for one kind of knowledge (playback, song_info, trivia) about a song."""
+    return f"{kind}:{song_identity(title, artist)}"
+
+
+def split_youtube_title(video_title: str, channel_title: Optional[str] = None) -> Tuple[str, str]:
+    """Best-effort split of a YouTube upload title into ``(title, artist)``.
+
+    Uploads are usually named "Artist - Title (Official Video)"; when there is
+    no separator the channel name is used as the artist.
+    """
+    parts = re.split(r"\s+[-–—|]\s+", video_title, maxsplit=1)
+    if len(parts) == 2:
+        artist, title = parts
+        return title.strip(), artist.strip()
+    artist = _CHANNEL_SUFFIX_RE.sub("", channel_title or "").strip()
+    return video_title.strip(), artist
@@ -0,0 +1,177 @@
+"""Precompiled intent routing for typed/transcribed user messages.
+
+``handle_message`` and ``handle_enhanced_message`` used to call
+``re.search`` for ~40 patterns on every message, in priority order. Here
+every pattern is compiled once at import and tagged with the literal keywords
+it cannot match without. A single combined keyword scan of the message picks
+the candidate rules, and only those are evaluated, still in priority order.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    intent: str
+    pattern: "re.Pattern[str]"
+    # The rule is only tried when at least one of these appears in the message
+    keywords: Tuple[str, ...]
+
+
+@dataclass
+class IntentMatch:
+    intent: str
+    match: "re.Match[str]"
+    message: str
+
+    def group(self, index: int = 0) -> Optional[str]:
+        return self.match.group(index)
+
+    @property
+    def groups(self) -> Tuple[Optional[str], ...]:
+        return self.match.groups()
+
+
+def rule(intent: str, pattern: str, *keywords: str) -> IntentRule:
+    return IntentRule(intent, re.compile(pattern, re.IGNORECASE), tuple(k.lower() for k in keywords))
+
+
+class IntentRouter:
+    """Route a message to the first matching rule after one keyword prefilter pass."""
+
+    def __init__(self, rules: Sequence[IntentRule]):
+        self.rules = list(rules)
+        keywords = sorted({k for r in self.rules for k in r.keywords}, key=len, reverse=True)
+        # Zero-width lookahead so overlapping keywords are all found in one scan;
+        # longest keywords first, each implying every keyword that is its prefix
+        self._prefilter = re.compile(
+            "(?=(" + "|".join(re.escape(k) for k in keywords) + "))", re.IGNORECASE
+        )
+        self._implied: Dict[str, Set[str]] = {
+            k: {other for other in keywords if k.startswith(other)} for k in keywords
+        }
+
+    def keywords_in(self, message: str) -> Set[str]:
+        present: Set[str] = set()
+        for found in self._prefilter.finditer(message):
+            text = found.group(1)
+            implied = self._implied.get(text.lower())
+            if implied is None:
+                # IGNORECASE also matches spellings whose lower() is not the keyword (e.g. 'ſearch')
+                implied = next(
+                    v for k, v in self._implied.items() if re.fullmatch(re.escape(k), text, re.IGNORECASE)
+                )
+            present |= implied
+        return present
+
+    def route(self, message: str, exclude: Iterable[str] = ()) -> Optional[IntentMatch]:
+        """Return the highest-priority matching intent, skipping ``exclude``d intents."""
+        excluded = set(exclude)
+        present = self.keywords_in(message)
+        for r in self.rules:
+            if r.intent in excluded or not present.intersection(r.keywords):
+                continue
+            match = r.pattern.search(message)
+            if match:
+                return IntentMatch(r.intent, match, message)
+        return None
+
+    def intents(self) -> List[str]:
+        return list(dict.fromkeys(r.intent for r in self.rules))
+
+
+# ---------- handle_message: playback, search, lyrics and song info ----------
+MESSAGE_ROUTER = IntentRouter([
+    # Numbered/first-result and lyric selections come before the generic "play X"
+    # rule, which would otherwise swallow "play number 3" as a song title. A bare
+    # number only selects a result when it is the whole utterance, so titles that
+    # start with one ("play 22 by Taylor Swift", "play 99 Luftballons") still play
+    rule("play_first", r"play\s+(?:the\s+)?first\s+(?:one|result)", "play"),
+
+    rule("play_number", r"play\s+number\s+(\d+)", "play"),
+    rule("play_number", r"^\s*play\s+(\d+)[\s.!?]*$", "play"),
+    rule("play_number", r"play\s+the\s+(\d+)(?:st|nd|rd|th)?\s+(?:one|result)", "play"),
+    rule("play_number", r"(?:choose|select)\s+(?:number\s+)?(\d+)", "choose", "select"),
+
+    rule("play_lyrics", r"play\s+(?:the\s+song\s+)?that\s+goes\s+['\"]([^'\"\n]+)['\"]", "that goes"),
+    rule("play_lyrics", r"put\s+on\s+(?:the\s+song\s+)?that\s+goes\s+['\"]([^'\"\n]+)['\"]", "that goes"),
+
+    rule("play_music", r"play\s+(?:the\s+song\s+)?['\"]?([^'\"\n]+)['\"]?", "play"),
+    rule("play_music", r"put\s+on\s+['\"]?([^'\"\n]+)['\"]?", "put"),
+    rule("play_music", r"listen\s+to\s+['\"]?([^'\"\n]+)['\"]?", "listen"),
+    rule("play_music", r"start\s+playing\s+['\"]?([^'\"\n]+)['\"]?", "start"),
+    rule("play_music", r"can\s+you\s+play\s+['\"]?([^'\"\n]+)['\"]?", "play"),
+    rule("play_music", r"i\s+want\s+to\s+hear\s+['\"]?([^'\"\n]+)['\"]?", "hear"),
+
+    rule("search_music", r"search\s+(?:for\s+)?['\"]?([^'\"\n]+)['\"]?", "search"),
+    rule("search_music", r"find\s+(?:me\s+)?['\"]?([^'\"\n]+)['\"]?(?:\s+(?:songs|music))?", "find"),
+    rule("search_music", r"look\s+up\s+['\"]?([^'\"\n]+)['\"]?", "look"),
+
+    rule("find_lyrics", r"what.*song.*goes.*['\"]?([^'\"\n]+)['\"]?", "goes"),
+    rule("find_lyrics", r"which song has the lyrics.*['\"]?([^'\"\n]+)['\"]?", "which song"),
+    rule("find_lyrics", r"identify.*lyrics.*['\"]?([^'\"\n]+)['\"]?", "identify"),
+
+    rule("song_info", r"(?:what|tell me|know).*(?:about|info).*(?:song|track).*['\"]?([^'\"\n]+)['\"]?", "about", "info"),
+    rule("song_info", r"(?:who|what).*(?:sings|sang|by|artist).*['\"]?([^'\"\n]+)['\"]?", "sings", "sang", "by", "artist"),
+    rule("song_info", r"['\"]?([^'\"\n]+)['\"]?.*(?:song|lyrics|track).*(?:by|from).*['\"]?([^'\"\n]+)['\"]?", "by", "from"),
+    rule("song_info", r"(?:information|tell me|know).*(?:about|info).*['\"]?([^'\"\n]+)['\"]?.*(?:by|from).*['\"]?([^'\"\n]+)['\"]?", "about", "info"),
+    rule("song_info", r"what.*that song.*['\"]?([^'\"\n]+)['\"]?", "that song"),
+    rule("song_info", r"looking for.*song.*['\"]?([^'\"\n]+)['\"]?", "looking for"),
+    rule("song_info", r"have you heard.*['\"]?([^'\"\n]+)['\"]?", "have you heard"),
+    rule("song_info", r"do you know.*song.*['\"]?([^'\"\n]+)['\"]?", "do you know"),
+])
+
+
+# ---------- handle_enhanced_message: conversational features ----------
+CONTINUE_DEBATE_PHRASES = ("i think", "my argument is", "but what about", "to support my point", "i disagree because")
+
+ENHANCED_ROUTER = IntentRouter([
+    rule("debate", r"(?:i think|i believe|in my opinion).*(?:best|better|greatest|worst).*(?:music|song|album|artist|decade|genre)", "i think", "i believe", "in my opinion"),
+    rule("debate", r"(?:agree|disagree).*(?:music|song|album|artist)", "agree"),
+    rule("debate", r"(?:prefer|like).*(?:over|more than|better than).*(?:music|song|album|artist)", "prefer", "like"),
+    rule("debate", r"(?:debate|argue|discuss).*(?:music|song|album|artist)", "debate", "argue", "discuss"),
+
+    rule("continue_debate", "|".join(re.escape(p) for p in CONTINUE_DEBATE_PHRASES), *CONTINUE_DEBATE_PHRASES),
+
+    rule("song_meaning", r"what (?:does|is).*(?:song|lyrics?).*(?:mean|about|represent)", "mean", "about", "represent"),
+    rule("song_meaning", r"(?:meaning|interpretation) (?:of|behind).*(?:song|lyrics?)", "meaning", "interpretation"),
+    rule("song_meaning", r"(?:song|lyrics?) (?:meaning|interpretation|analysis)", "meaning", "interpretation", "analysis"),
+    rule("song_meaning", r"what (?:is|are).*(?:song|lyrics?) (?:trying to say|about)", "trying to say", "about"),
+
+    rule("therapy", r"(?:i feel|i'm feeling|feeling).*(?:anxious|sad|angry|stressed|lonely|depressed|upset|down|overwhelmed)", "feel"),
+    rule("therapy", r"(?:need|want).*(?:music|songs?) (?:for|to).*(?:relax|calm|feel better|cheer up|cope)", "need", "want"),
+    rule("therapy", r"(?:music therapy|therapeutic music|healing music|calming music)", "music therapy", "therapeutic music", "healing music", "calming music"),
+    rule("therapy", r"(?:bad day|rough day|difficult time|hard time|struggling)", "bad day", "rough day", "difficult time", "hard time", "struggling"),
+
+    rule("trends", r"(?:predict|forecast).*(?:music trends|future music)", "predict", "forecast"),
+    rule("trends", r"what's next in music", "what's next in music"),
+    rule("trends", r"upcoming music trends", "upcoming music trends"),
+    rule("trends", r"music predictions (?:for)? (?:next year|next \d+ months)", "music predictions"),
+    rule("trends", r"what genres are trending", "what genres are trending"),
+
+    rule("seasonal", r"(?:seasonal|current season|weather).*(?:music|songs|playlist|recommendations)", "seasonal", "current season", "weather"),
+    rule("seasonal", r"music for (?:summer|winter|spring|autumn)", "music for"),
+    rule("seasonal", r"what to listen to (?:this season|in the summer|etc\.)", "what to listen to"),
+
+    rule("life_event", r"(?:create|make|suggest).*(?:soundtrack|playlist).*(?:for my|for a).*(?:life event|graduation|breakup|new job|wedding|moving)", "soundtrack", "playlist"),
+    rule("life_event", r"music for (?:my|a) (?:graduation|breakup|new job|wedding|moving)", "music for"),
+    rule("life_event", r"what to listen to during (?:a big life event|my wedding)", "what to listen to during"),
+])
+
+
+# ---------- argument extraction used once an intent is known ----------
+DEBATE_TOPIC_RE = re.compile(r'(?:best|better|greatest|worst)\s+(.*?)\s+(?:music|song|album|artist|decade|genre)', re.IGNORECASE)
+DEBATE_POSITION_RE = re.compile(r'(?:i think|i believe|in my opinion)\s*(.*?)(?:\s+are|\s+is)?\s*(?:best|better|greatest|worst)', re.IGNORECASE)
+QUOTED_SONG_RE = re.compile(r'["\']([^"\']+)["\'](?:\s+by\s+([^"\']+))?')
+SONG_KEYWORD_RE = re.compile(r'(?:song|lyrics?|track)\s*(?:of|about|called)\s+(.*)', re.IGNORECASE)
+FEELING_RE = re.compile(r'(?:feel|feeling)\s*(?:a\s)?(?:bit\s)?(\w+)', re.IGNORECASE)
+SITUATION_RE = re.compile(r'(?:because of|due to|from)\s+(.*)', re.IGNORECASE)
+GOAL_RE = re.compile(r'(?:to|help me)\s+(relax|calm down|feel better|cheer up|cope|process)', re.IGNORECASE)
+TIMEFRAME_RE = re.compile(r'(?:next year|next \d+ months)', re.IGNORECASE)
+GENRE_RE = re.compile(r'genre(?:s)? (?:like|such as)?\s*(\w+)', re.IGNORECASE)
+SEASON_RE = re.compile(r'(summer|winter|spring|autumn)', re.IGNORECASE)
+EVENT_TYPE_RE = re.compile(r'(graduation|breakup|new job|wedding|moving|life event)', re.IGNORECASE)
+EVENT_DESCRIPTION_RE = re.compile(r'for (?:my|a) (?:.*?)\s+(.*?)(?:\s+playlist|\s+soundtrack)?', re.IGNORECASE)
+EMOTIONAL_TONE_RE = re.compile(r'(?:feeling|tone)\s+(positive|negative|mixed|happy|sad|excited|calm)', re.IGNORECASE)
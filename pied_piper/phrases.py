@@ -0,0 +1,246 @@
+"""Pre-rendered audio for the agent's fixed utterances.
+
+Greetings and status lines ("Looking for the song…") are the same on every
+session, yet each one was sent to ElevenLabs again every time. This cache
+synthesizes them once and keeps the PCM in memory. It also writes each phrase
+to a WAV file under ``.pipey_cache/tts_phrases`` so other worker processes
+and restarts reuse it. Cached audio goes straight to ``session.say(text,
+audio=...)``, which skips TTS entirely.
+
+Entries are keyed by the spoken text, the language, and the TTS provider with
+its options (voice, model, language, sample rate). Changing the voice or model
+therefore never plays stale audio.
+
+Worker processes render missing phrases in ``prewarm``, before they accept a
+job, so even the first caller on a cold worker hears cached audio. A job
+renders whatever pre-rendering could not finish.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import time
+import wave
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional
+
+import aiohttp
+from livekit import rtc
+
+from pied_piper.speech import render_speech
+
+logger = logging.getLogger("multilingual-pipey")
+
+DEFAULT_PHRASE_DIR = os.path.join(".pipey_cache", "tts_phrases")
+# Longest time prewarm spends rendering; raise the worker's initialize_process_timeout to match
+PRERENDER_TIMEOUT_SECONDS = float(os.environ.get("PIPEY_PHRASE_PRERENDER_SECONDS", "20"))
+FRAME_MS = 20
+
+_SECRET_OPTION_WORDS = ("key", "token", "secret")
+
+
+@dataclasses.dataclass
+class CachedPhrase:
+    sample_rate: int
+    num_channels: int
+    pcm: bytes
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (2 * self.num_channels * self.sample_rate)
+
+
+def tts_identity(tts) -> Dict:
+    """Provider, output format and synthesis options of a TTS client, minus credentials."""
+    opts = getattr(tts, "_opts", None)
+    try:
+        fields = dataclasses.asdict(opts) if dataclasses.is_dataclass(opts) else vars(opts)
+    except TypeError:
+        fields = {}
+    options = {
+        name: value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)
+        for name, value in fields.items()
+        # The language is part of the key already; the agent's client starts without one set
+        if name != "language" and not any(word in name.lower() for word in _SECRET_OPTION_WORDS)
+    }
+    return {
+        "provider": f"{type(tts).__module__}.{type(tts).__qualname__}",
+        "sample_rate": getattr(tts, "sample_rate", None),
+        "num_channels": getattr(tts, "num_channels", None),
+        "options": options,
+    }
+
+
+def make_phrase_key(text: str, language: str, tts) -> str:
+    canonical = json.dumps(
+        {"text": text, "language": language, **tts_identity(tts)},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=repr,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def audio_frames(phrase: CachedPhrase) -> AsyncIterator[rtc.AudioFrame]:
+    """Replay a cached phrase as ``FRAME_MS`` audio frames."""
+    bytes_per_sample = 2 * phrase.num_channels
+    step = phrase.sample_rate * FRAME_MS // 1000 * bytes_per_sample
+    for start in range(0, len(phrase.pcm), step):
+        chunk = phrase.pcm[start:start + step]
+        yield rtc.AudioFrame(chunk, phrase.sample_rate, phrase.num_channels, len(chunk) // bytes_per_sample)
+
+
+class PhraseCache:
+    """Memory- and disk-backed cache of synthesized fixed phrases."""
+
+    def __init__(self, directory: str = DEFAULT_PHRASE_DIR):
+        self.directory = directory
+        self._phrases: Dict[str, CachedPhrase] = {}
+        self._warm_task: Optional[asyncio.Task] = None
+        self._warmed = False
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def _load_sync(self, key: str) -> Optional[CachedPhrase]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with wave.open(path, "rb") as f:
+            return CachedPhrase(f.getframerate(), f.getnchannels(), f.readframes(f.getnframes()))
+
+    def load_all(self) -> int:
+        """Load every phrase on disk into memory (blocking; for worker prewarm)."""
+        if not os.path.isdir(self.directory):
+            return 0
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            if ext == ".wav" and key not in self._phrases:
+                try:
+                    self._phrases[key] = self._load_sync(key)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable cached phrase {name}: {e}")
+        return len(self._phrases)
+
+    def _save_sync(self, key: str, phrase: CachedPhrase):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with wave.open(tmp_path, "wb") as f:
+            f.setnchannels(phrase.num_channels)
+            f.setsampwidth(2)
+            f.setframerate(phrase.sample_rate)
+            f.writeframes(phrase.pcm)
+        os.replace(tmp_path, self._path(key))
+
+    async def get(self, key: str) -> Optional[CachedPhrase]:
+        phrase = self._phrases.get(key)
+        if phrase is None:
+            try:
+                phrase = await asyncio.to_thread(self._load_sync, key)
+            except Exception as e:
+                logger.warning(f"Error reading TTS phrase cache: {e}")
+                return None
+            if phrase is not None:
+                self._phrases[key] = phrase
+        return phrase
+
+    async def audio_for(self, tts, text: str, language: str) -> Optional[AsyncIterator[rtc.AudioFrame]]:
+        """Frames for ``text`` as ``tts`` would speak it, or ``None`` if not cached."""
+        if tts is None:
+            return None
+        phrase = await self.get(make_phrase_key(render_speech(text, language), language, tts))
+        if phrase is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return audio_frames(phrase)
+
+    async def render(self, tts, text: str, language: str) -> bool:
+        """Synthesize and store ``text`` unless already cached; return ``True`` if rendered."""
+        spoken = render_speech(text, language)
+        key = make_phrase_key(spoken, language, tts)
+        if await self.get(key) is not None:
+            return False
+
+        chunks = []
+        sample_rate = num_channels = None
+        async with tts.synthesize(spoken) as stream:
+            async for audio in stream:
+                chunks.append(bytes(audio.frame.data))
+                sample_rate, num_channels = audio.frame.sample_rate, audio.frame.num_channels
+        if not chunks:
+            return False
+        phrase = CachedPhrase(sample_rate, num_channels, b"".join(chunks))
+        self._phrases[key] = phrase
+        await asyncio.to_thread(self._save_sync, key, phrase)
+        return True
+
+    async def _warm(self, tts, phrases: Dict[str, Iterable[str]]):
+        started = time.perf_counter()
+        rendered = 0
+        try:
+            for language, texts in phrases.items():
+                if hasattr(tts, "update_options"):
+                    tts.update_options(language=language)
+                for text in texts:
+                    rendered += await self.render(tts, text, language)
+        except Exception as e:
+            logger.warning(f"TTS phrase cache warm-up failed after {rendered} phrases: {e}")
+            return
+        self._warmed = True
+        logger.info(
+            f"TTS phrase cache ready: {len(self._phrases)} phrases, {rendered} newly rendered "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    def prerender(
+        self,
+        build_tts: Callable[[aiohttp.ClientSession], object],
+        phrases: Dict[str, Iterable[str]],
+        timeout: float = PRERENDER_TIMEOUT_SECONDS,
+    ) -> int:
+        """Render missing phrases before the process takes jobs (blocking; for worker prewarm).
+
+        There is no job yet whose HTTP session the TTS plugin could borrow.
+        ``build_tts`` therefore gets a session of its own, on a private event
+        loop. Returns the number of phrases in memory afterwards.
+        """
+        async def run():
+            async with aiohttp.ClientSession() as http_session:
+                await asyncio.wait_for(self._warm(build_tts(http_session), phrases), timeout)
+
+        try:
+            asyncio.run(run())
+        except asyncio.TimeoutError:
+            logger.warning(f"TTS phrase pre-render stopped after {timeout:.0f}s; the first job renders the rest")
+        except Exception as e:
+            logger.warning(f"TTS phrase pre-render failed, the first job renders the phrases: {e}")
+        return len(self._phrases)
+
+    def warm(self, tts, phrases: Dict[str, Iterable[str]]) -> Optional[asyncio.Task]:
+        """Render missing phrases in the background, once per process.
+
+        ``tts`` should be a dedicated client built like the agent's: its
+        language is switched while rendering each language's phrases. A
+        warm-up that failed or was cancelled with its job is retried by the
+        next job.
+        """
+        if not self._warmed and (self._warm_task is None or self._warm_task.done()):
+            self._warm_task = asyncio.ensure_future(self._warm(tts, phrases))
+        return self._warm_task
+
+
+_cache: Optional[PhraseCache] = None
+
+
+def get_phrase_cache() -> PhraseCache:
+    """Return the process-wide phrase cache (directory overridable via PIPEY_PHRASE_CACHE_DIR)."""
+    global _cache
+    if _cache is None:
+        _cache = PhraseCache(os.environ.get("PIPEY_PHRASE_CACHE_DIR", DEFAULT_PHRASE_DIR))
+    return _cache
@@ -0,0 +1,125 @@
+"""Speculative cache warming from interim speech transcripts.
+
+Song titles and artists usually appear in the transcript well before the
+user's turn ends. The prefetcher extracts entities from every interim
+transcript and warms the search caches for them, cancelling prefetches whose
+entity disappeared from a later, corrected transcript. By the time
+``on_user_turn_completed`` runs, the RAG lookup is normally a cache hit.
+
+Interim transcripts change while a word is still being spoken ("by Que",
+then "by Queen"). An entity is only warmed once it is stable: it appeared
+unchanged in ``STABLE_TRANSCRIPTS`` interim transcripts in a row, or stayed
+in the transcript for ``STABLE_SECONDS``. Half-finished words therefore do
+not spend upstream quota.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+logger = logging.getLogger("multilingual-pipey")
+
+MAX_CONCURRENT_PREFETCHES = 3
+MIN_ENTITY_LENGTH = 3
+STABLE_TRANSCRIPTS = 3
+STABLE_SECONDS = 0.3
+
+
+@dataclass
+class _Candidate:
+    entity: str
+    timer: asyncio.TimerHandle
+    seen: int = 1
+
+
+class SpeculativePrefetcher:
+    """Track entities in the live transcript and keep one warm-up task per entity."""
+
+    def __init__(
+        self,
+        extract_entities: Callable[[str], List[str]],
+        warm: Callable[[str], Awaitable[None]],
+        max_concurrent: int = MAX_CONCURRENT_PREFETCHES,
+        stable_transcripts: int = STABLE_TRANSCRIPTS,
+        stable_seconds: float = STABLE_SECONDS,
+    ):
+        self._extract_entities = extract_entities
+        self._warm = warm
+        self._max_concurrent = max_concurrent
+        self._stable_transcripts = stable_transcripts
+        self._stable_seconds = stable_seconds
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Entities seen in the transcript but not stable yet
+        self._candidates: Dict[str, _Candidate] = {}
+        self.started = 0
+        self.cancelled = 0
+        self.unstable = 0
+
+    def on_transcript(self, transcript: str, is_final: bool):
+        """Feed an interim or final transcript (safe to call from event callbacks)."""
+        entities = {
+            entity.strip().lower(): entity.strip()
+            for entity in self._extract_entities(transcript or "")
+            if len(entity.strip()) >= MIN_ENTITY_LENGTH
+        }
+
+        # The transcript changed under us: drop prefetches for entities it no longer mentions
+        for key in [key for key in self._tasks if key not in entities]:
+            task = self._tasks.pop(key)
+            if not task.done():
+                task.cancel()
+                self.cancelled += 1
+
+        for key in [key for key in self._candidates if key not in entities]:
+            self._candidates.pop(key).timer.cancel()
+            self.unstable += 1
+
+        if is_final:
+            # The turn is over: the RAG lookup runs now, so there is nothing left to
+            # warm; surviving prefetches are left to finish on their own
+            self._drop_candidates()
+            self._tasks.clear()
+            return
+
+        for key, entity in entities.items():
+            if key in self._tasks:
+                continue
+            candidate = self._candidates.get(key)
+            if candidate is None:
+                timer = asyncio.get_running_loop().call_later(self._stable_seconds, self._start, key)
+                self._candidates[key] = _Candidate(entity, timer)
+                continue
+            candidate.seen += 1
+            if candidate.seen >= self._stable_transcripts:
+                self._start(key)
+
+    def _start(self, key: str):
+        """Warm a candidate that stayed stable, if a prefetch slot is free."""
+        candidate = self._candidates.pop(key, None)
+        if candidate is None:
+            return
+        candidate.timer.cancel()
+        if len(self._tasks) >= self._max_concurrent:
+            return
+        self._tasks[key] = asyncio.ensure_future(self._run(candidate.entity))
+        self.started += 1
+
+    def _drop_candidates(self):
+        for candidate in self._candidates.values():
+            candidate.timer.cancel()
+        self._candidates.clear()
+
+    async def _run(self, entity: str):
+        try:
+            await self._warm(entity)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Speculative prefetch for '{entity}' failed: {e}")
+
+    def cancel_all(self):
+        self._drop_candidates()
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,219 @@
+"""Compact system instructions and per-turn tool subsets for the LLM.
+
+Every LLM call used to carry a ~100-line prompt. It repeated its routing
+rules (the insult rule twice, every tool pattern twice) and named a
+``recommend_spotify_tracks`` tool that does not exist. It also sent the JSON
+schema of every function tool, although a turn rarely needs more than a few.
+The instructions here are written once. Each routing hint appears a single
+time, and the prompt is built for the current language, so it only changes
+on a language switch.
+
+Tools are picked per turn. The user's message goes through the existing
+intent routers to find the conversational mode (playback, debate, therapy,
+etc.), and only that mode's tools are exposed. Unrecognized messages keep
+every entry point. Follow-up tools only appear once they can do something:
+``continue_music_debate`` during a debate, and ``play_search_result_by_number``
+after a search. Token counts are estimates (about four characters per token)
+and are logged per turn, so prompt size can be compared across modes and
+releases.
+"""
+
+import inspect
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from pied_piper.intents import ENHANCED_ROUTER, MESSAGE_ROUTER
+
+CHARS_PER_TOKEN = 4
+
+LANGUAGE_TOOLS = (
+    "switch_to_english",
+    "switch_to_spanish",
+    "switch_to_french",
+    "switch_to_german",
+    "switch_to_italian",
+    "switch_to_hindi",
+)
+# Tools that start music playback; left out entirely when the deployment cannot play
+PLAYBACK_TOOLS = ("play_youtube_music", "play_search_result_by_number", "play_music_from_lyrics")
+
+MODE_TOOLS: Dict[str, Tuple[str, ...]] = {
+    "general": (
+        "find_lyrics",
+        "play_youtube_music",
+        "search_youtube_songs",
+        "play_search_result_by_number",
+        "play_music_from_lyrics",
+        "get_recently_played_songs",
+        "start_music_debate",
+        "continue_music_debate",
+        "interpret_song_meaning",
+        "music_therapy_session",
+        "predict_music_trends",
+        "seasonal_music_recommendations",
+        "life_event_soundtrack",
+    ),
+    "playback": (
+        "find_lyrics",
+        "play_youtube_music",
+        "search_youtube_songs",
+        "play_search_result_by_number",
+        "play_music_from_lyrics",
+        "get_recently_played_songs",
+    ),
+    "debate": ("start_music_debate", "continue_music_debate", "play_youtube_music"),
+    "meaning": ("interpret_song_meaning", "find_lyrics", "play_youtube_music"),
+    "wellbeing": (
+        "music_therapy_session",
+        "seasonal_music_recommendations",
+        "life_event_soundtrack",
+        "play_youtube_music",
+    ),
+    "trends": ("predict_music_trends", "search_youtube_songs", "play_youtube_music"),
+}
+
+# Router intents (pied_piper.intents) to conversational modes
+INTENT_MODES = {
+    "play_first": "playback",
+    "play_number": "playback",
+    "play_lyrics": "playback",
+    "play_music": "playback",
+    "search_music": "playback",
+    "find_lyrics": "playback",
+    "debate": "debate",
+    "continue_debate": "debate",
+    "song_meaning": "meaning",
+    "therapy": "wellbeing",
+    "seasonal": "wellbeing",
+    "life_event": "wellbeing",
+    "trends": "trends",
+}
+
+_CORE_INSTRUCTIONS = """
+You are Pied Piper, a passionate and knowledgeable music companion talking with the user by voice.
+Keep replies short and conversational, without markdown, lists or emoji, and never mention your tools.
+Keep track of the whole conversation and the user's earlier requests, and learn their tastes as you go.
+Talk about what you observe naturally, without being overly descriptive.
+If the user insults you, say you're sorry they are frustrated and ask them to try again.
+If the user asks you to speak another language, call the matching switch_to_<language> tool and keep speaking it.
+When the user quotes lyrics or asks which song goes a certain way, identify it with find_lyrics without repeating the lyrics.
+Offer debates (start_music_debate, then continue_music_debate for each new argument), song interpretations (interpret_song_meaning), music therapy (music_therapy_session), trend predictions (predict_music_trends), seasonal picks (seasonal_music_recommendations) and life event soundtracks (life_event_soundtrack) when the conversation calls for them.
+""".strip()
+
+_PLAYBACK_INSTRUCTIONS = """
+When the user wants to hear something, play it right away with play_youtube_music; offer choices with search_youtube_songs and play the one they pick with play_search_result_by_number.
+For "that song that goes...", use play_music_from_lyrics; for their listening history, use get_recently_played_songs.
+Suggest playing the tracks you discuss, but never play a song the user does not want.
+""".strip()
+
+_NO_PLAYBACK_INSTRUCTIONS = """
+You cannot play music here. If the user asks you to, say so and offer to talk about the song instead; search_youtube_songs can still list songs.
+""".strip()
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def build_instructions(language_name: str, can_play: bool = True) -> str:
+    """The system instructions for a conversation held in ``language_name``."""
+    return "\n".join([
+        _CORE_INSTRUCTIONS,
+        _PLAYBACK_INSTRUCTIONS if can_play else _NO_PLAYBACK_INSTRUCTIONS,
+        f"Speak {language_name}.",
+    ])
+
+
+def tool_name(tool) -> str:
+    """Name of a LiveKit function tool, whichever way the installed version exposes it."""
+    info = getattr(tool, "info", None) or getattr(tool, "__livekit_tool_info", None)
+    return getattr(info, "name", None) or tool.__name__
+
+
+def tool_schema_text(tool) -> str:
+    """Approximation of the schema the LLM receives for ``tool``: name, description and parameters."""
+    info = getattr(tool, "info", None) or getattr(tool, "__livekit_tool_info", None)
+    description = getattr(info, "description", None) or inspect.getdoc(tool) or ""
+    try:
+        parameters = [
+            name for name in inspect.signature(tool).parameters if name not in ("self", "context")
+        ]
+    except (TypeError, ValueError):
+        parameters = []
+    return json.dumps({"name": tool_name(tool), "description": description, "parameters": parameters})
+
+
+def detect_mode(message: str, debate_active: bool = False) -> str:
+    """Conversational mode of a user message; ``general`` when no intent is recognized."""
+    exclude = () if debate_active else ("continue_debate",)
+    routed = ENHANCED_ROUTER.route(message, exclude=exclude) or MESSAGE_ROUTER.route(message)
+    if routed is None:
+        return "general"
+    return INTENT_MODES.get(routed.intent, "general")
+
+
+@dataclass
+class ToolPlan:
+    mode: str
+    tool_names: Tuple[str, ...]
+    instruction_tokens: int
+    tool_tokens: int
+    full_tool_tokens: int
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.instruction_tokens + self.tool_tokens
+
+    def report(self) -> str:
+        return (
+            f"Prompt plan '{self.mode}': ~{self.instruction_tokens} instruction + "
+            f"~{self.tool_tokens} tool tokens ({len(self.tool_names)} tools, "
+            f"~{self.full_tool_tokens - self.tool_tokens} tool tokens saved)"
+        )
+
+
+class ToolSelector:
+    """Pick the tools to expose on each turn from an agent's full tool set."""
+
+    def __init__(self, tools: Iterable, can_play: bool = True):
+        self.tools = {tool_name(tool): tool for tool in tools}
+        self.can_play = can_play
+        self._tokens = {name: estimate_tokens(tool_schema_text(tool)) for name, tool in self.tools.items()}
+        self.full_tool_tokens = sum(self._tokens.values())
+
+    def select(
+        self,
+        mode: str,
+        debate_active: bool = False,
+        has_search_results: bool = False,
+    ) -> Tuple[str, ...]:
+        names = [*LANGUAGE_TOOLS, *MODE_TOOLS.get(mode, MODE_TOOLS["general"])]
+        if not debate_active:
+            names = [n for n in names if n != "continue_music_debate"]
+        if not has_search_results:
+            names = [n for n in names if n != "play_search_result_by_number"]
+        if not self.can_play:
+            names = [n for n in names if n not in PLAYBACK_TOOLS]
+        return tuple(n for n in dict.fromkeys(names) if n in self.tools)
+
+    def plan(
+        self,
+        message: str,
+        instructions: str,
+        debate_active: bool = False,
+        has_search_results: bool = False,
+    ) -> ToolPlan:
+        mode = detect_mode(message, debate_active)
+        names = self.select(mode, debate_active, has_search_results)
+        return ToolPlan(
+            mode=mode,
+            tool_names=names,
+            instruction_tokens=estimate_tokens(instructions),
+            tool_tokens=sum(self._tokens[n] for n in names),
+            full_tool_tokens=self.full_tool_tokens,
+        )
+
+    def tools_for(self, names: Iterable[str]) -> List:
+        return [self.tools[n] for n in names]
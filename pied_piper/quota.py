@@ -0,0 +1,305 @@
+"""Process-wide quota governor for the SerpAPI and YouTube Data API budgets.
+
+The upstream quotas are shared by every session in the fleet. Without a
+governor, background lookups compete with the requests a user is waiting on.
+Examples of background lookups are debate evidence, similar songs, RAG
+context and speculative prefetches. Each provider gets a token bucket, and
+every upstream call takes one token after a cache miss. Set the rate to this
+process's share of the fleet quota.
+
+Calls carry a priority, either ``interactive``, ``enrichment`` or
+``speculative``. Priorities differ in three ways:
+
+- How much of the bucket they may drain. Enrichment leaves a reserve of
+  tokens for interactive calls; speculative calls only run while the bucket
+  is well filled.
+- How long they may queue for a token.
+- How many of them may queue at once.
+
+Queued calls are served highest priority first. A call that cannot get a
+token in time raises ``QuotaExhausted`` instead of waiting longer. Calls
+coalesced by ``PrioritizedFlights`` compete at the priority of their most
+urgent caller. An interactive lookup that joins a speculative prefetch of the
+same key therefore raises the shared call's priority instead of inheriting
+the prefetch's policy. Callers degrade from there: the search client serves a
+stale cached result if it has one, enrichment steps are skipped, and
+prefetches are dropped.
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from pied_piper.singleflight import SingleFlight
+from pied_piper.stats import LatencyWindow
+
+T = TypeVar("T")
+
+logger = logging.getLogger("multilingual-pipey")
+
+# Tokens per second and bucket size per provider; a rate of 0 disables the limit
+PROVIDER_LIMITS = {
+    "serpapi": (
+        float(os.environ.get("PIPEY_SERPAPI_RATE", "5")),
+        float(os.environ.get("PIPEY_SERPAPI_BURST", "20")),
+    ),
+    "youtube": (
+        float(os.environ.get("PIPEY_YOUTUBE_RATE", "2")),
+        float(os.environ.get("PIPEY_YOUTUBE_BURST", "10")),
+    ),
+}
+DISPATCH_TICK_SECONDS = 0.05
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    ENRICHMENT = 1
+    SPECULATIVE = 2
+
+
+class QuotaExhausted(Exception):
+    """Raised when a call cannot get upstream quota in time; callers degrade instead of waiting."""
+
+
+@dataclass
+class PriorityPolicy:
+    # Fraction of the bucket that must stay untouched for this priority to take a token
+    reserve: float
+    # Longest time a call may queue for a token, in seconds
+    max_wait: float
+    # Calls of this priority allowed to queue at once
+    max_queue: int
+
+
+DEFAULT_POLICIES = {
+    Priority.INTERACTIVE: PriorityPolicy(reserve=0.0, max_wait=2.0, max_queue=64),
+    Priority.ENRICHMENT: PriorityPolicy(reserve=0.2, max_wait=1.0, max_queue=16),
+    Priority.SPECULATIVE: PriorityPolicy(reserve=0.5, max_wait=0.0, max_queue=0),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def take(self, reserve: float = 0.0) -> bool:
+        """Take one token if doing so leaves at least ``reserve`` tokens."""
+        self._refill()
+        if self._tokens - 1 >= reserve:
+            self._tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, reserve: float = 0.0) -> float:
+        """Seconds until ``take(reserve)`` can succeed."""
+        self._refill()
+        return max((reserve + 1 - self._tokens) / self.rate, 0.0)
+
+
+class ProviderQuota:
+    """Token bucket and priority queue for one upstream provider."""
+
+    def __init__(self, name: str, rate: float, burst: float, policies: Optional[Dict[Priority, PriorityPolicy]] = None):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.policies = policies or DEFAULT_POLICIES
+        self.granted: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.queued: Counter = Counter()
+        self.waits = LatencyWindow()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = 0
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _reserve(self, priority: Priority) -> float:
+        return self.policies[priority].reserve * self.bucket.burst
+
+    def _queue_ahead(self, priority: Priority) -> bool:
+        return any(p <= priority and not f.done() for p, _, f in self._waiters)
+
+    def try_acquire(self, priority: Priority) -> bool:
+        """Take a token only if one is free now and no call of equal or higher priority is queued."""
+        if self._queue_ahead(priority) or not self.bucket.take(self._reserve(priority)):
+            return False
+        self.granted[priority.name.lower()] += 1
+        return True
+
+    async def acquire(self, priority: Priority):
+        """Take a token, queueing for it within the priority's limits; raise ``QuotaExhausted`` otherwise."""
+        if self.try_acquire(priority):
+            return
+        policy = self.policies[priority]
+        label = priority.name.lower()
+        if policy.max_wait <= 0 or self.queued[label] >= policy.max_queue:
+            self.rejected[label] += 1
+            raise QuotaExhausted(f"{self.name} budget exhausted for {label} calls")
+
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._waiters, (priority, self._seq, future))
+        self.queued[label] += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, policy.max_wait)
+        except asyncio.TimeoutError:
+            self.rejected[label] += 1
+            raise QuotaExhausted(
+                f"{self.name} budget exhausted for {label} calls (queued {policy.max_wait:.1f}s)"
+            ) from None
+        finally:
+            self.queued[label] -= 1
+        self.waits.record(time.perf_counter() - started)
+        self.granted[label] += 1
+
+    async def _dispatch(self):
+        """Hand out tokens to queued calls as the bucket refills, highest priority first."""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.bucket.take(self._reserve(priority)):
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+                continue
+            # Short ticks, so a higher-priority call queued meanwhile is not held up
+            await asyncio.sleep(min(self.bucket.wait_time(self._reserve(priority)), DISPATCH_TICK_SECONDS))
+
+    def snapshot(self) -> Dict:
+        wait_p95 = self.waits.percentile(95)
+        return {
+            "tokens": round(self.bucket.tokens, 2),
+            "rate": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "granted": dict(self.granted),
+            "rejected": dict(self.rejected),
+            "queued": {label: count for label, count in self.queued.items() if count},
+            "queue_wait_p95_ms": None if wait_p95 is None else round(wait_p95 * 1000, 1),
+        }
+
+
+class FlightPriority:
+    """Priority of a call shared by several callers: the most urgent of them."""
+
+    def __init__(self, priority: Priority):
+        self.priority = priority
+        self._raised = asyncio.Event()
+
+    def raise_to(self, priority: Priority):
+        if priority < self.priority:
+            self.priority = priority
+            self._raised.set()
+
+    async def acquire(self, quota: ProviderQuota):
+        """Take a token at the current priority, starting over whenever a more urgent caller joins."""
+        while True:
+            priority = self.priority
+            self._raised.clear()
+            attempt = asyncio.ensure_future(quota.acquire(priority))
+            raised = asyncio.ensure_future(self._raised.wait())
+            try:
+                await asyncio.wait({attempt, raised}, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                attempt.cancel()
+                raise
+            finally:
+                raised.cancel()
+            if not attempt.done():
+                attempt.cancel()
+                try:
+                    await attempt
+                except (asyncio.CancelledError, QuotaExhausted):
+                    pass
+                continue
+            if isinstance(attempt.exception(), QuotaExhausted) and self.priority < priority:
+                continue
+            return attempt.result()
+
+
+class PrioritizedFlights(SingleFlight):
+    """Single-flight whose shared call gets quota at the priority of its most urgent caller."""
+
+    def __init__(self):
+        super().__init__()
+        self._priorities: Dict[Hashable, FlightPriority] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[FlightPriority], Awaitable[T]],
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> T:
+        """Like ``SingleFlight.do``, but ``fn`` receives the flight's (possibly raised) priority."""
+        flight = self._priorities.get(key)
+        if flight is not None and key in self._inflight:
+            flight.raise_to(priority)
+        else:
+            flight = FlightPriority(priority)
+            self._priorities[key] = flight
+        return await super().do(key, lambda: fn(flight))
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        super()._forget(key, future)
+        if key not in self._inflight:
+            self._priorities.pop(key, None)
+
+
+class QuotaGovernor:
+    """Per-provider quotas; providers without a configured rate are not limited."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.providers = {
+            name: ProviderQuota(name, rate, burst)
+            for name, (rate, burst) in (limits if limits is not None else PROVIDER_LIMITS).items()
+            if rate > 0
+        }
+
+    def try_acquire(self, provider: str, priority: Priority = Priority.INTERACTIVE) -> bool:
+        quota = self.providers.get(provider)
+        return quota is None or quota.try_acquire(priority)
+
+    async def acquire(self, provider: str, priority: Priority = Priority.INTERACTIVE):
+        quota = self.providers.get(provider)
+        if quota is not None:
+            await quota.acquire(priority)
+
+    async def acquire_flight(self, provider: str, flight: FlightPriority):
+        """``acquire`` for a shared call, at the priority of its most urgent caller."""
+        quota = self.providers.get(provider)
+        if quota is not None:
+            await flight.acquire(quota)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: quota.snapshot() for name, quota in self.providers.items()}
+
+
+_governor: Optional[QuotaGovernor] = None
+
+
+def get_quota_governor() -> QuotaGovernor:
+    """Return the process-wide quota governor (limits from PIPEY_<PROVIDER>_RATE / _BURST)."""
+    global _governor
+    if _governor is None:
+        _governor = QuotaGovernor()
+    return _governor
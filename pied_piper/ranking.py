@@ -0,0 +1,182 @@
+"""Near-duplicate collapse and informativeness ranking for spoken trivia.
+
+Trivia comes from several sites that often phrase the same fact slightly
+differently ("peaked at number 1 on the Billboard Hot 100" and "...Billboard
+Hot 100 chart"). Exact dedup keeps all of them, and they waste the few
+spoken slots. Each fact is reduced to word shingles and a MinHash signature.
+Locality-sensitive hashing over signature bands finds candidate duplicates
+without comparing every pair. A duplicate joins an existing cluster, and
+each cluster is spoken once through its most informative member. Clusters
+are ranked by informativeness plus a small bonus for facts that several
+sources agree on.
+"""
+
+import math
+import random
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SHINGLE_SIZE = 2
+NUM_PERMUTATIONS = 32
+# 8 bands of 4 rows: pairs above ~0.6 Jaccard almost always share a band
+LSH_BANDS = 8
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+DUPLICATE_THRESHOLD = 0.6
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_NUMBER_RE = re.compile(r"\d")
+_PROPER_NOUN_RE = re.compile(r"(?<=[\w,;:] )[A-Z][\w'-]+")
+_WORD_RE = re.compile(r"\S+")
+
+# Words that say little on their own; a fact made mostly of them is filler
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have he her his in is it its of on or "
+    "she that the their this to was were which with".split()
+)
+BOILERPLATE = ("click", "lyrics", "official video", "subscribe", "read more", "watch", "cookie")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Word ``size``-grams of the lowercased text (the tokens themselves for short text)."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(shingle_set: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature of a shingle set, ``NUM_PERMUTATIONS`` values long."""
+    if not shingle_set:
+        return (0,) * NUM_PERMUTATIONS
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def informativeness(fact: str) -> float:
+    """Heuristic score: concrete facts (numbers, names, content words) of speakable length win."""
+    words = _WORD_RE.findall(fact)
+    if not words:
+        return 0.0
+    tokens = _TOKEN_RE.findall(fact.lower())
+    content = [t for t in tokens if t not in STOPWORDS]
+
+    score = len(set(content)) / max(len(tokens), 1)
+    if _NUMBER_RE.search(fact):
+        score += 0.5
+    score += 0.15 * min(len(_PROPER_NOUN_RE.findall(fact)), 4)
+    # Short fragments lack context; very long sentences are tiring to listen to
+    if len(words) < 6:
+        score -= 0.5
+    elif len(words) > 30:
+        score -= 0.02 * (len(words) - 30)
+    lowered = fact.lower()
+    if any(phrase in lowered for phrase in BOILERPLATE):
+        score -= 1.0
+    return score
+
+
+class _Cluster:
+    __slots__ = ("representative", "shingles", "score", "support", "order")
+
+    def __init__(self, fact: str, shingle_set: Set[str], order: int):
+        self.representative = fact
+        self.shingles = shingle_set
+        self.score = informativeness(fact)
+        self.support = 1
+        self.order = order
+
+    def rank_key(self) -> Tuple[float, int]:
+        return (self.score + 0.25 * math.log(self.support), -self.order)
+
+
+class FactRanker:
+    """Incrementally cluster near-duplicate facts and rank the clusters."""
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._clusters: List[_Cluster] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self._seen: Dict[str, int] = {}
+        self.collapsed = 0
+
+    def add(self, fact: str) -> bool:
+        """Add one fact; return ``True`` if it started a new cluster."""
+        fact = fact.strip()
+        if not fact:
+            return False
+        if fact in self._seen:
+            self._clusters[self._seen[fact]].support += 1
+            self.collapsed += 1
+            return False
+
+        shingle_set = shingles(fact)
+        signature = minhash(shingle_set)
+        band_keys = [
+            (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            for band in range(LSH_BANDS)
+        ]
+
+        match = self._find_duplicate(band_keys, shingle_set)
+        if match is not None:
+            cluster = self._clusters[match]
+            cluster.support += 1
+            # Later facts are compared with the representative only, not with a union
+            # of every member, so a chain of small rewordings cannot drift the cluster
+            if informativeness(fact) > cluster.score:
+                cluster.representative = fact
+                cluster.score = informativeness(fact)
+                cluster.shingles = shingle_set
+                self._index(match, band_keys)
+            self._seen[fact] = match
+            self.collapsed += 1
+            return False
+
+        index = len(self._clusters)
+        self._clusters.append(_Cluster(fact, shingle_set, index))
+        self._seen[fact] = index
+        self._index(index, band_keys)
+        return True
+
+    def add_all(self, facts: Iterable[str]) -> int:
+        """Add several facts; return how many started new clusters."""
+        return sum(self.add(fact) for fact in facts)
+
+    def _index(self, index: int, band_keys):
+        for key in band_keys:
+            bucket = self._buckets.setdefault(key, [])
+            if index not in bucket:
+                bucket.append(index)
+
+    def _find_duplicate(self, band_keys, shingle_set: Set[str]) -> Optional[int]:
+        candidates = {index for key in band_keys for index in self._buckets.get(key, ())}
+        best, best_similarity = None, self.threshold
+        for index in sorted(candidates):
+            similarity = jaccard(shingle_set, self._clusters[index].shingles)
+            if similarity >= best_similarity:
+                best, best_similarity = index, similarity
+        return best
+
+    def ranked(self, limit: Optional[int] = None) -> List[str]:
+        """Cluster representatives, most informative first."""
+        ordered = sorted(self._clusters, key=_Cluster.rank_key, reverse=True)
+        return [cluster.representative for cluster in ordered[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._clusters)
@@ -0,0 +1,222 @@
+"""Non-blocking SerpAPI client shared by every search helper of the agent.
+
+The official ``serpapi`` package is synchronous, so calling it from a
+coroutine stalls the LiveKit event loop (VAD, STT streaming and TTS playback
+for every session in the worker). This client talks to the same JSON endpoint
+through the pooled ``aiohttp`` session of :mod:`pied_piper.http` instead. Responses are cached in the shared
+:class:`~pied_piper.store.SearchResultStore`.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from pied_piper.http import get_http_session
+from pied_piper.quota import FlightPriority, PrioritizedFlights, Priority, QuotaExhausted, get_quota_governor
+from pied_piper.stats import LatencyWindow
+from pied_piper.store import SearchResultStore, get_result_store, make_cache_key
+from pied_piper.tracing import span
+
+logger = logging.getLogger("multilingual-pipey")
+
+# Overridable to point the agent at a stand-in server (see loadtest/)
+SERPAPI_ENDPOINT = os.environ.get("PIPEY_SERPAPI_ENDPOINT", "https://serpapi.com/search")
+DEFAULT_TIMEOUT_SECONDS = 10.0
+PER_QUERY_TIMEOUT_SECONDS = 6.0
+
+# A hedged search fires a duplicate request once the first one has been
+# outstanding longer than this percentile of recently observed latencies
+HEDGE_PERCENTILE = float(os.environ.get("PIPEY_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = 20
+
+
+class SearchError(Exception):
+    """Raised when SerpAPI answers with an error status or payload."""
+
+
+class AsyncSearchClient:
+    """Async SerpAPI client on top of the process-wide pooled session."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        store: Optional[SearchResultStore] = None,
+    ):
+        self._api_key = api_key
+        self._store = store
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._inflight = PrioritizedFlights()
+        self.latencies = LatencyWindow()
+        self.hedged_requests = 0
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or os.environ.get("SERPAPI_KEY")
+
+    async def search(self, q: str, engine: str = "google", num: int = 10, **params) -> Dict:
+        """Run a search and return the decoded JSON payload.
+
+        Accepts the same keyword arguments as ``serpapi.search`` so call sites
+        only have to add ``await``. With ``hedge=True`` a slow upstream request
+        is duplicated after the hedge threshold and the first answer wins.
+        ``priority`` (a :class:`~pied_piper.quota.Priority`) decides how the
+        call competes for SerpAPI quota. When none is left, a stale cached
+        result is returned if there is one; otherwise ``QuotaExhausted`` is
+        raised.
+        """
+        hedge = params.pop("hedge", False)
+        priority = params.pop("priority", Priority.INTERACTIVE)
+        api_key = params.pop("api_key", None) or self.api_key
+        if not api_key:
+            raise SearchError("SERPAPI_KEY is not configured")
+
+        cache_key = make_cache_key("serpapi", q, engine=engine, num=num, **params)
+        query_params = {
+            "q": q,
+            "engine": engine,
+            "num": num,
+            "output": "json",
+            "api_key": api_key,
+            **params,
+        }
+        # Concurrent identical searches (e.g. a trending song) share one request,
+        # which gets quota at the priority of its most urgent caller
+        return await self._inflight.do(
+            cache_key, lambda flight: self._fetch(cache_key, query_params, hedge, flight), priority
+        )
+
+    async def _fetch(
+        self,
+        cache_key: str,
+        query_params: Dict,
+        hedge: bool,
+        flight: FlightPriority,
+    ) -> Dict:
+        store = self._store or get_result_store()
+        cached = await store.get("serpapi", cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            await get_quota_governor().acquire_flight("serpapi", flight)
+        except QuotaExhausted:
+            stale = await store.get_stale("serpapi", cache_key)
+            if stale is None:
+                raise
+            logger.info(f"SerpAPI budget exhausted, serving a stale result for '{query_params['q']}'")
+            return stale
+
+        if hedge:
+            data = await self._hedged_request(query_params, flight.priority)
+        else:
+            data = await self._request(query_params)
+
+        # Error payloads (e.g. "no results") are not worth keeping
+        if not data.get("error"):
+            await store.put("serpapi", cache_key, data)
+        return data
+
+    async def _request(self, query_params: Dict) -> Dict:
+        started = time.perf_counter()
+        cancelled = False
+        session = get_http_session()
+        try:
+            with span("serpapi.search", kind="upstream", **{"pipey.query": query_params["q"]}) as upstream:
+                async with session.get(SERPAPI_ENDPOINT, params=query_params, timeout=self._timeout) as response:
+                    upstream.set("http.status_code", response.status)
+                    upstream.add(upstream_calls=1, bytes=len(await response.read()))
+                    if response.status != 200:
+                        raise SearchError(f"SerpAPI error {response.status} for query '{query_params['q']}'")
+                    return await response.json()
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Errors and timeouts count too, or the hedge threshold only sees the fast
+            # successes; a cancelled attempt (e.g. a losing hedge) never finished
+            if not cancelled:
+                self.latencies.record(time.perf_counter() - started)
+
+    async def _hedged_request(self, query_params: Dict, priority: Priority = Priority.INTERACTIVE) -> Dict:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return await self._request(query_params)
+
+        hedge_delay = self.latencies.percentile(HEDGE_PERCENTILE)
+        primary = asyncio.ensure_future(self._request(query_params))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+        # The duplicate costs quota too; only send it if a token is free right now
+        if not get_quota_governor().try_acquire("serpapi", priority):
+            return await primary
+
+        self.hedged_requests += 1
+        logger.info(f"Hedging SerpAPI query '{query_params['q']}' after {hedge_delay:.3f}s")
+        backup = asyncio.ensure_future(self._request(query_params))
+        attempts = [primary, backup]
+        error: Optional[Exception] = None
+        try:
+            for next_attempt in asyncio.as_completed(attempts):
+                try:
+                    return await next_attempt
+                except Exception as e:
+                    error = e
+            raise error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def search_many(
+        self,
+        queries: List[str],
+        engine: str = "google",
+        num: int = 10,
+        timeout: float = PER_QUERY_TIMEOUT_SECONDS,
+        **params,
+    ) -> List[Optional[Dict]]:
+        """Run several searches concurrently, tolerating partial failures.
+
+        Results are returned in the order of ``queries``. A query that fails
+        or takes longer than ``timeout`` seconds yields ``None`` instead of
+        failing the whole batch.
+        """
+
+        return list(await asyncio.gather(*(
+            self.search_or_none(query, engine=engine, num=num, timeout=timeout, **params)
+            for query in queries
+        )))
+
+    async def search_or_none(
+        self,
+        query: str,
+        engine: str = "google",
+        num: int = 10,
+        timeout: float = PER_QUERY_TIMEOUT_SECONDS,
+        **params,
+    ) -> Optional[Dict]:
+        """Run one search, returning ``None`` on error or timeout."""
+        try:
+            return await asyncio.wait_for(
+                self.search(q=query, engine=engine, num=num, **params), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Query '{query}' timed out after {timeout}s")
+        except Exception as e:
+            logger.warning(f"Error in query '{query}': {e}")
+        return None
+
+
+_client: Optional[AsyncSearchClient] = None
+
+
+def get_search_client() -> AsyncSearchClient:
+    """Return the process-wide search client shared by all agents."""
+    global _client
+    if _client is None:
+        _client = AsyncSearchClient()
+    return _client
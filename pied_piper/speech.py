@@ -0,0 +1,234 @@
+"""Spoken rendering of agent responses.
+
+Tools format their answers for reading: markdown emphasis, emoji section
+markers, bullet lists and links. ElevenLabs bills and synthesizes every
+character, and markup either gets read aloud or just adds latency. The agent
+passes the text stream bound for TTS through a ``SpeechRenderer``. It strips
+markup and emoji, speaks only the first few items of a list, and caps how
+long any one section runs. The rich text still goes to the chat context and
+transcripts unchanged. ``SpeechStats`` counts the characters saved per turn.
+
+Rendering is incremental, so streamed sections and LLM tokens are spoken
+sentence by sentence rather than held back until the whole reply is ready.
+"""
+
+import os
+import re
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple
+
+SECTION_CHAR_LIMIT = int(os.environ.get("PIPEY_SPEECH_SECTION_CHARS", "500"))
+LIST_ITEM_LIMIT = 5
+
+# Spoken after an abbreviated list, in the agent's current language
+MORE_ITEMS = {
+    "en": "and {n} more.",
+    "es": "y {n} más.",
+    "fr": "et {n} de plus.",
+    "de": "und {n} weitere.",
+    "it": "e altri {n}.",
+    "hi": "और {n} अन्य।",
+}
+
+_EMOJI_RE = re.compile(
+    "["
+    "\U0001F000-\U0001FAFF"  # pictographs, emoticons, transport, symbols & pictographs
+    "\u2190-\u21FF"          # arrows
+    "\u2600-\u27BF"          # misc symbols, dingbats
+    "\u2B00-\u2BFF"          # arrows, stars
+    "\uFE0F\u200D\u20E3"     # variation selector, joiner, keycap
+    "]+"
+)
+_LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_URL_RE = re.compile(r"https?://\S+")
+_MARKUP_RE = re.compile(r"\*+|__|~~|`+")
+_LINE_PREFIX_RE = re.compile(r"^\s*(?:#{1,6}|>)\s*")
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[-*•]|\d{1,2}[.)])\s+")
+_PIPE_RE = re.compile(r"\s+\|\s+")
+_SPACE_RE = re.compile(r"[ \t]{2,}")
+_SENTENCE_END_RE = re.compile(r"[.!?…。।](?=\s)")
+_TERMINAL = ".!?…。।:;,"
+
+
+def clean_inline(text: str) -> str:
+    """Remove markup, emoji and URLs from one line of text."""
+    text = _LINK_RE.sub(r"\1", text)
+    text = _URL_RE.sub("", text)
+    text = _LINE_PREFIX_RE.sub("", text)
+    text = _MARKUP_RE.sub("", text)
+    text = _EMOJI_RE.sub("", text)
+    text = _PIPE_RE.sub(", ", text)
+    return _SPACE_RE.sub(" ", text).strip(" \t-–—")
+
+
+def _cut(text: str, limit: int) -> str:
+    """Shorten ``text`` to at most ``limit`` characters, preferring a sentence end."""
+    if limit <= 0:
+        return ""
+    head = text[:limit]
+    ends = list(_SENTENCE_END_RE.finditer(head + " "))
+    if ends:
+        return head[:ends[-1].end()]
+    space = head.rfind(" ")
+    return (head[:space] if space > 0 else head).rstrip(_TERMINAL) + "."
+
+
+class SpeechStats:
+    """Characters sent to TTS versus characters in the rich responses, per turn."""
+
+    def __init__(self):
+        self.rich_chars = 0
+        self.spoken_chars = 0
+        self.total_saved = 0
+
+    def record(self, rich_chars: int, spoken_chars: int):
+        self.rich_chars += rich_chars
+        self.spoken_chars += spoken_chars
+
+    def end_turn(self) -> Tuple[int, int]:
+        """Return ``(rich_chars, spoken_chars)`` for the turn and start a new one."""
+        turn = (self.rich_chars, self.spoken_chars)
+        self.total_saved += self.rich_chars - self.spoken_chars
+        self.rich_chars = self.spoken_chars = 0
+        return turn
+
+
+class SpeechRenderer:
+    """Turn one utterance's rich text, fed in chunks, into its spoken form.
+
+    Sections are separated by blank lines, as in the tools' responses.
+    """
+
+    def __init__(
+        self,
+        language: str = "en",
+        section_limit: int = SECTION_CHAR_LIMIT,
+        list_limit: int = LIST_ITEM_LIMIT,
+        stats: Optional[SpeechStats] = None,
+    ):
+        self.language = language
+        self.section_limit = section_limit
+        self.list_limit = list_limit
+        self.stats = stats
+        self._buffer = ""
+        self._separator = ""
+        self._emitted = False
+        self._section_chars = 0
+        self._truncated = False
+        self._list_items = 0
+        self._hidden_items = 0
+        self._mid_line = False
+
+    def feed(self, chunk: str) -> str:
+        """Add rich text; return whatever can already be spoken."""
+        self._buffer += chunk
+        out: List[str] = []
+        while True:
+            newline = self._buffer.find("\n")
+            if newline != -1:
+                line, self._buffer = self._buffer[:newline], self._buffer[newline + 1:]
+                self._line(line, out)
+                continue
+            # Long lines (LLM replies) are spoken a sentence at a time; list items are short
+            if self._mid_line or not _LIST_ITEM_RE.match(self._buffer):
+                ends = list(_SENTENCE_END_RE.finditer(self._buffer))
+                if ends:
+                    cut = ends[-1].end()
+                    piece, self._buffer = self._buffer[:cut], self._buffer[cut:]
+                    self._partial(piece, out)
+            break
+        return self._finish(chunk, out)
+
+    def flush(self) -> str:
+        """Speak whatever is left and close the last section."""
+        out: List[str] = []
+        if self._buffer:
+            line, self._buffer = self._buffer, ""
+            self._line(line, out)
+        self._end_section(out)
+        return self._finish("", out)
+
+    def render(self, text: str) -> str:
+        """Spoken form of a complete response."""
+        return self.feed(text) + self.flush()
+
+    async def render_stream(self, chunks: AsyncIterable[str]) -> AsyncIterator[str]:
+        async for chunk in chunks:
+            spoken = self.feed(chunk)
+            if spoken:
+                yield spoken
+        spoken = self.flush()
+        if spoken:
+            yield spoken
+
+    def _finish(self, rich: str, out: List[str]) -> str:
+        spoken = "".join(out)
+        if self.stats is not None:
+            self.stats.record(len(rich), len(spoken))
+        return spoken
+
+    def _partial(self, piece: str, out: List[str]):
+        if not self._mid_line:
+            if self._start_line(piece, out):
+                return
+            self._mid_line = True
+        self._write(clean_inline(piece), out)
+
+    def _line(self, line: str, out: List[str]):
+        if not self._mid_line and not line.strip():
+            self._end_section(out)
+            return
+        if not self._mid_line and self._start_line(line, out):
+            return
+        self._mid_line = False
+        text = clean_inline(line)
+        if text and text[-1] not in _TERMINAL:
+            text += "."
+        self._write(text, out)
+
+    def _start_line(self, line: str, out: List[str]) -> bool:
+        """Handle list bookkeeping for a new line; return ``True`` to skip it."""
+        if _LIST_ITEM_RE.match(line):
+            self._list_items += 1
+            if self._list_items > self.list_limit:
+                self._hidden_items += 1
+                return True
+        else:
+            self._close_list(out)
+        return False
+
+    def _close_list(self, out: List[str]):
+        if self._hidden_items:
+            more = MORE_ITEMS.get(self.language, MORE_ITEMS["en"]).format(n=self._hidden_items)
+            self._emit(more, out)
+        self._list_items = self._hidden_items = 0
+
+    def _end_section(self, out: List[str]):
+        self._close_list(out)
+        self._section_chars = 0
+        self._truncated = False
+        if self._emitted:
+            self._separator = "\n"
+
+    def _write(self, text: str, out: List[str]):
+        if not text or self._truncated:
+            return
+        room = self.section_limit - self._section_chars
+        if len(text) > room:
+            text = _cut(text, room)
+            self._truncated = True
+            if not text:
+                return
+        self._section_chars += len(text)
+        self._emit(text, out)
+
+    def _emit(self, text: str, out: List[str]):
+        if self._emitted:
+            out.append(self._separator or " ")
+        out.append(text)
+        self._emitted = True
+        self._separator = " "
+
+
+def render_speech(text: str, language: str = "en") -> str:
+    """Spoken form of a complete rich response."""
+    return SpeechRenderer(language).render(text)
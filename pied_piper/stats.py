@@ -0,0 +1,30 @@
+"""Small latency statistics helpers."""
+
+import math
+from collections import deque
+from typing import Iterable, Optional
+
+
+def percentile(values: Iterable[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (``pct`` in 0-100), ``None`` if empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LatencyWindow:
+    """Rolling window of the most recent latency samples, in seconds."""
+
+    def __init__(self, maxlen: int = 200):
+        self._samples = deque(maxlen=maxlen)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        return percentile(self._samples, pct)
+
+    def __len__(self) -> int:
+        return len(self._samples)
@@ -0,0 +1,198 @@
+"""Persistent search result cache shared by every session and worker process.
+
+Results from SerpAPI and the YouTube Data API are stored in a local SQLite
+database so a query fetched by one LiveKit job is reused by later jobs, other
+worker processes and restarts. Entries expire per source and the store is kept
+under an entry/byte budget by evicting the least recently used rows. Expired
+entries are kept for a grace period, so a stale answer can still be served
+when the upstream quota is exhausted (see :mod:`pied_piper.quota`).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from pied_piper.tracing import record_cache
+
+logger = logging.getLogger("multilingual-pipey")
+
+DEFAULT_CACHE_PATH = os.path.join(".pipey_cache", "search_results.sqlite3")
+
+# Time-to-live in seconds for each upstream source
+SOURCE_TTLS = {
+    "serpapi": 7 * 24 * 3600,
+    "youtube": 24 * 3600,
+}
+DEFAULT_TTL_SECONDS = 24 * 3600
+# Expired entries are kept this long past their TTL, to be served when upstream quota runs out
+STALE_GRACE_SECONDS = 7 * 24 * 3600
+
+MAX_ENTRIES = 50_000
+MAX_BYTES = 200 * 1024 * 1024
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share a key."""
+    return " ".join(query.casefold().split())
+
+
+def make_cache_key(source: str, query: str, **params) -> str:
+    """Build the canonical key for a lookup: source, normalized query and parameters."""
+    canonical = {
+        "source": source,
+        "q": normalize_query(query),
+        **{name: value for name, value in params.items() if value is not None},
+    }
+    return json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+
+
+class SearchResultStore:
+    """SQLite-backed TTL/LRU cache of upstream search payloads."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = {**SOURCE_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            # WAL lets several worker processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    key TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_results_last_access "
+                "ON search_results (last_access)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, DEFAULT_TTL_SECONDS)
+
+    # ---------- synchronous API (runs in a worker thread) ----------
+    def get_sync(self, source: str, key: str, allow_stale: bool = False) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT payload, created_at FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            age = now - created_at
+            if age > self.ttl_for(source) + STALE_GRACE_SECONDS:
+                conn.execute("DELETE FROM search_results WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            if age > self.ttl_for(source) and not allow_stale:
+                return None
+            conn.execute("UPDATE search_results SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return json.loads(payload)
+
+    def put_sync(self, source: str, key: str, value: Any):
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO search_results "
+                "(key, source, payload, size, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source, payload, len(payload), now, now),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_results"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # Drop least recently used rows until both budgets are met again
+        excess_rows = max(count - self.max_entries, 0)
+        excess_bytes = max(total_bytes - self.max_bytes, 0)
+        doomed = []
+        freed = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM search_results ORDER BY last_access ASC"
+        ):
+            if len(doomed) >= excess_rows and freed >= excess_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM search_results WHERE key = ?", doomed)
+        logger.info(f"Evicted {len(doomed)} cached search results ({freed} bytes)")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- async API ----------
+    async def get(self, source: str, key: str) -> Optional[Any]:
+        try:
+            value = await asyncio.to_thread(self.get_sync, source, key)
+        except Exception as e:
+            logger.warning(f"Error reading search cache: {e}")
+            value = None
+        record_cache(value is not None)
+        return value
+
+    async def get_stale(self, source: str, key: str) -> Optional[Any]:
+        """Like ``get``, but also return entries past their TTL (within the stale grace period)."""
+        try:
+            return await asyncio.to_thread(self.get_sync, source, key, True)
+        except Exception as e:
+            logger.warning(f"Error reading search cache: {e}")
+            return None
+
+    async def put(self, source: str, key: str, value: Any):
+        try:
+            await asyncio.to_thread(self.put_sync, source, key, value)
+        except Exception as e:
+            logger.warning(f"Error writing search cache: {e}")
+
+
+_store: Optional[SearchResultStore] = None
+
+
+def get_result_store() -> SearchResultStore:
+    """Return the process-wide result store (path overridable via PIPEY_SEARCH_CACHE_PATH)."""
+    global _store
+    if _store is None:
+        _store = SearchResultStore(os.environ.get("PIPEY_SEARCH_CACHE_PATH", DEFAULT_CACHE_PATH))
+    return _store
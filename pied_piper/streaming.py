@@ -0,0 +1,37 @@
+"""Incremental text streams for long spoken responses.
+
+The long-form tools used to build a full markdown response and hand it to
+``session.say`` in one piece, so TTS could not start until every section
+had been computed. Tools now produce their sections from async generators.
+``stream_sections`` turns those into the text stream ``session.say``
+accepts, so the first section is synthesized while later ones are still
+being computed.
+"""
+
+import logging
+import time
+from typing import AsyncIterable, AsyncIterator
+
+logger = logging.getLogger("multilingual-pipey")
+
+
+async def stream_sections(sections: AsyncIterable[str], separator: str = "\n\n") -> AsyncIterator[str]:
+    """Yield each non-empty section as soon as it is produced, joined by ``separator``.
+
+    A failure while producing a later section ends the stream instead of
+    failing the whole utterance; whatever was already spoken stands.
+    """
+    started = time.perf_counter()
+    first = True
+    try:
+        async for section in sections:
+            if not section:
+                continue
+            if first:
+                logger.debug(f"First response section ready after {(time.perf_counter() - started) * 1000:.0f} ms")
+                yield section
+                first = False
+            else:
+                yield separator + section
+    except Exception as e:
+        logger.error(f"Error while streaming response sections: {e}")
@@ -0,0 +1,399 @@
+"""Spans for function tools and the upstream calls they make.
+
+Every function tool runs in a ``tool`` span. The following are recorded as
+child spans of whatever span is current:
+
+- SerpAPI and YouTube requests (``upstream`` spans, with status and response
+  bytes)
+- ``session.say`` calls (``speech`` spans, which end when playout finishes)
+
+Search-cache lookups count as hits or misses on the current span. The current
+span lives in a contextvar, so tasks a tool spawns are attributed to it too.
+When a span ends, its counters are added to its parent: upstream calls, cache
+hits and misses, and bytes. A single ``find_song_info`` span therefore shows
+the total cost of that call.
+
+Finished spans go to two optional exporters:
+
+- ``PIPEY_TRACE_FILE``: spans are appended as OpenTelemetry-style JSON lines
+  (``traceId``, ``spanId``, ``parentSpanId``, ``startTimeUnixNano``, and
+  attributes as key/value pairs).
+- ``PIPEY_METRICS_PORT``: per-span-name aggregates, the loop watchdog's
+  numbers and the upstream quota state are served as Prometheus text at ``/metrics``. Each worker process
+  binds the first free port from there on.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from pied_piper.quota import get_quota_governor
+from pied_piper.watchdog import get_watchdog, tool_scope
+
+logger = logging.getLogger("multilingual-pipey")
+
+TRACE_FILE = os.environ.get("PIPEY_TRACE_FILE")
+METRICS_PORT = int(os.environ.get("PIPEY_METRICS_PORT", "0"))
+METRICS_PORT_RANGE = 16
+FLUSH_INTERVAL_SECONDS = 5.0
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Span types with an OpenTelemetry kind other than INTERNAL
+_OTEL_KINDS = {"upstream": "SPAN_KIND_CLIENT"}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("pipey_current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent: Optional["Span"] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    upstream_calls: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    bytes: int = 0
+    error: Optional[str] = None
+    # The agent the span ran for; not exported
+    owner: Any = None
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add(self, upstream_calls: int = 0, cache_hits: int = 0, cache_misses: int = 0, bytes: int = 0):
+        self.upstream_calls += upstream_calls
+        self.cache_hits += cache_hits
+        self.cache_misses += cache_misses
+        self.bytes += bytes
+
+    def end(self, error: Optional[BaseException] = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        # Children that outlive their parent keep their own counters only
+        if self.parent is not None and self.parent.end_ns is None:
+            self.parent.add(self.upstream_calls, self.cache_hits, self.cache_misses, self.bytes)
+        get_tracer().export(self)
+
+    def to_otel(self) -> Dict:
+        attributes = {
+            **self.attributes,
+            "pipey.span_type": self.kind,
+            "pipey.upstream_calls": self.upstream_calls,
+            "pipey.cache_hits": self.cache_hits,
+            "pipey.cache_misses": self.cache_misses,
+            "pipey.bytes": self.bytes,
+        }
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent.span_id if self.parent else "",
+            "name": self.name,
+            "kind": _OTEL_KINDS.get(self.kind, "SPAN_KIND_INTERNAL"),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otel_value(v)} for k, v in attributes.items()],
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"},
+        }
+
+
+def _otel_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, kind: str = "internal", **attributes) -> Span:
+    """Start a child of the current span (or a new trace) without making it current."""
+    parent = _current_span.get()
+    return Span(
+        name=name,
+        kind=kind,
+        trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent=parent,
+        attributes=attributes,
+        owner=parent.owner if parent else None,
+    )
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Run the block in a new span that is current for its duration."""
+    current = start_span(name, kind, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def record_cache(hit: bool):
+    """Count a cache lookup on the current span."""
+    current = _current_span.get()
+    if current is not None:
+        current.add(cache_hits=int(hit), cache_misses=int(not hit))
+
+
+def traced_tool(fn):
+    """Run a function tool in a ``tool`` span; place it below ``@function_tool``.
+
+    The tool is also registered with the loop watchdog (see ``tool_scope``).
+    """
+    tool_scope(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with span(fn.__name__, kind="tool") as current:
+            # Tools are agent methods (or take the agent as their first argument)
+            current.owner = args[0] if args else None
+            return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument_session(session):
+    """Record every ``session.say`` of ``session`` as a ``speech`` span lasting until playout ends."""
+    say = session.say
+
+    @functools.wraps(say)
+    def traced_say(text, *args, **kwargs):
+        speech = start_span("session.say", kind="speech")
+        speech.set("pipey.cached_audio", kwargs.get("audio") is not None)
+        if isinstance(text, str):
+            speech.set("pipey.chars", len(text))
+        try:
+            handle = say(text, *args, **kwargs)
+        except BaseException as e:
+            speech.end(error=e)
+            raise
+        handle.add_done_callback(lambda _: speech.end())
+        return handle
+
+    session.say = traced_say
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+    upstream_calls: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    bytes: int = 0
+
+    def record(self, finished: Span):
+        duration = finished.duration
+        self.count += 1
+        self.errors += finished.error is not None
+        self.seconds += duration
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if duration <= bound:
+                self.buckets[i] += 1
+        self.upstream_calls += finished.upstream_calls
+        self.cache_hits += finished.cache_hits
+        self.cache_misses += finished.cache_misses
+        self.bytes += finished.bytes
+
+
+class Tracer:
+    """Aggregate finished spans and hand them to the file and Prometheus exporters."""
+
+    def __init__(self, trace_file: Optional[str] = TRACE_FILE, metrics_port: int = METRICS_PORT):
+        self.trace_file = trace_file
+        self.metrics_port = metrics_port
+        self.stats: Dict[Tuple[str, str], SpanStats] = defaultdict(SpanStats)
+        self._buffer: List[Dict] = []
+        self._listeners: List[Callable[[Span], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_listener(self, listener: Callable[[Span], None]):
+        """Call ``listener`` with every span as it finishes."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Span], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def export(self, finished: Span):
+        self.stats[(finished.name, finished.kind)].record(finished)
+        for listener in self._listeners:
+            try:
+                listener(finished)
+            except Exception as e:
+                logger.warning(f"Error in span listener: {e}")
+        if self.trace_file:
+            self._buffer.append(finished.to_otel())
+
+    def start(self):
+        """Start the exporters on the running loop; a no-op if they already run there."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        if self.trace_file:
+            self._flusher = loop.create_task(self._flush_periodically())
+            logger.info(f"Writing spans to {self.trace_file}")
+        if self.metrics_port:
+            loop.create_task(self._serve_metrics())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+
+    async def flush(self):
+        """Append the buffered spans to the trace file."""
+        if not self._buffer or not self.trace_file:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._append, lines)
+        except OSError as e:
+            logger.warning(f"Error writing spans to {self.trace_file}: {e}")
+
+    def _append(self, lines: List[Dict]):
+        directory = os.path.dirname(self.trace_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.trace_file, "a", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line) + "\n")
+
+    async def _serve_metrics(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._metrics_handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        # Every job process of a worker has its own tracer; take the first free port
+        for port in range(self.metrics_port, self.metrics_port + METRICS_PORT_RANGE):
+            try:
+                await web.TCPSite(self._runner, "0.0.0.0", port).start()
+            except OSError:
+                continue
+            logger.info(f"Serving Prometheus metrics on port {port}")
+            return
+        logger.warning(
+            f"No free port for Prometheus metrics in {self.metrics_port}-{self.metrics_port + METRICS_PORT_RANGE - 1}"
+        )
+
+    async def _metrics_handler(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics_text(), content_type="text/plain", charset="utf-8")
+
+    def metrics_text(self) -> str:
+        """Span and event-loop metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP pipey_span_duration_seconds Duration of tool, upstream and speech spans.",
+            "# TYPE pipey_span_duration_seconds histogram",
+        ]
+        for (name, kind), stats in sorted(self.stats.items()):
+            labels = f'name="{name}",kind="{kind}"'
+            for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                lines.append(f'pipey_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'pipey_span_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"pipey_span_duration_seconds_sum{{{labels}}} {stats.seconds:.6f}")
+            lines.append(f"pipey_span_duration_seconds_count{{{labels}}} {stats.count}")
+
+        counters = (
+            ("errors", "Spans that ended with an error."),
+            ("upstream_calls", "Upstream API calls made within spans, including their children."),
+            ("cache_hits", "Search-cache hits within spans, including their children."),
+            ("cache_misses", "Search-cache misses within spans, including their children."),
+            ("bytes", "Upstream response bytes within spans, including their children."),
+        )
+        for attribute, description in counters:
+            metric = f"pipey_span_{attribute}_total"
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+            for (name, kind), stats in sorted(self.stats.items()):
+                lines.append(f'{metric}{{name="{name}",kind="{kind}"}} {getattr(stats, attribute)}')
+
+        loop = get_watchdog().snapshot()
+        lines += [
+            "# HELP pipey_event_loop_lag_seconds Event-loop lag over the recent samples.",
+            "# TYPE pipey_event_loop_lag_seconds summary",
+        ]
+        for quantile in ("50", "95", "99"):
+            value = loop[f"lag_p{quantile}_ms"]
+            if value is not None:
+                lines.append(f'pipey_event_loop_lag_seconds{{quantile="0.{quantile}"}} {value / 1000:.6f}')
+        lines.append(f"pipey_event_loop_lag_seconds_count {loop['samples']}")
+        lines += [
+            "# HELP pipey_event_loop_lag_max_seconds Largest event-loop lag observed.",
+            "# TYPE pipey_event_loop_lag_max_seconds gauge",
+            f"pipey_event_loop_lag_max_seconds {(loop['lag_max_ms'] or 0) / 1000:.6f}",
+            "# HELP pipey_event_loop_blocked_steps_total Steps that blocked the loop past the threshold.",
+            "# TYPE pipey_event_loop_blocked_steps_total counter",
+        ]
+        for tag, blocked in loop["blocked_steps"].items():
+            lines.append(f'pipey_event_loop_blocked_steps_total{{tool="{tag}"}} {blocked["count"]}')
+        lines += [
+            "# HELP pipey_event_loop_blocked_seconds_total Time the loop spent blocked, per tool.",
+            "# TYPE pipey_event_loop_blocked_seconds_total counter",
+        ]
+        for tag, blocked in loop["blocked_steps"].items():
+            lines.append(f'pipey_event_loop_blocked_seconds_total{{tool="{tag}"}} {blocked["total_ms"] / 1000:.6f}')
+
+        quotas = get_quota_governor().snapshot()
+        lines += [
+            "# HELP pipey_quota_tokens Tokens left in each upstream provider's bucket.",
+            "# TYPE pipey_quota_tokens gauge",
+        ]
+        lines += [f'pipey_quota_tokens{{provider="{provider}"}} {quota["tokens"]}' for provider, quota in quotas.items()]
+        for field_name, metric, metric_type, description in (
+            ("granted", "pipey_quota_granted_total", "counter", "Upstream calls granted quota, per priority."),
+            ("rejected", "pipey_quota_rejected_total", "counter", "Upstream calls refused quota, per priority."),
+            ("queued", "pipey_quota_queued", "gauge", "Upstream calls waiting for quota, per priority."),
+        ):
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {metric_type}"]
+            for provider, quota in quotas.items():
+                for priority, count in quota[field_name].items():
+                    lines.append(f'{metric}{{provider="{provider}",priority="{priority}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
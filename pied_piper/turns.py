@@ -0,0 +1,290 @@
+"""Per-turn latency breakdown, from the end of the user's speech to the agent's first audio.
+
+A ``TurnRecorder`` follows one ``AgentSession`` through its events. A turn
+starts when VAD hears the user stop speaking. It is written when the user
+speaks again or the session closes, so that every tool the reply ran is
+included. Each stage is timed from the end of speech, except ``tool``, which
+is the time spent inside tools:
+
+- ``stt_final``: the final transcript (``transcription_delay`` of the
+  end-of-utterance metrics)
+- ``end_of_turn``: the end-of-turn decision
+- ``turn_hook``: ``on_user_turn_completed``, which includes the RAG lookup
+- ``llm_ttft``: first token of the turn's first LLM call
+- ``tool``: time spent in function tools, taken from the tool spans of
+  :mod:`pied_piper.tracing`
+- ``tts_ttfb``: the TTS's first audio byte
+- ``first_audio``: the agent starts speaking, which is the delay the user
+  hears
+
+Each turn is appended to a rolling JSON-lines log, tagged with the language,
+the tools called and the release (``PIPEY_RELEASE``). For the process,
+p50/p95/p99 of every stage are kept per language and per tool and logged
+every ``REPORT_EVERY_TURNS`` turns. ``python -m benchmarks.turn_latency``
+builds the same tables from the log, per release.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pied_piper.stats import LatencyWindow, percentile
+from pied_piper.tracing import Span, get_tracer
+
+logger = logging.getLogger("multilingual-pipey")
+
+TURN_LOG_PATH = os.environ.get("PIPEY_TURN_LOG", os.path.join(".pipey_cache", "turns.jsonl"))
+TURN_LOG_MAX_BYTES = int(os.environ.get("PIPEY_TURN_LOG_MAX_BYTES", str(5 * 2**20)))
+TURN_LOG_BACKUPS = 3
+RELEASE = os.environ.get("PIPEY_RELEASE", "dev")
+REPORT_EVERY_TURNS = 20
+
+STAGES = ("stt_final", "end_of_turn", "turn_hook", "llm_ttft", "tool", "tts_ttfb", "first_audio")
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class TurnTiming:
+    language: str
+    # Wall-clock time the user stopped speaking
+    started_at: float
+    stages: Dict[str, float] = field(default_factory=dict)
+    tools: List[str] = field(default_factory=list)
+    release: str = RELEASE
+
+    def to_record(self) -> Dict:
+        return {
+            "ts": round(self.started_at, 3),
+            "release": self.release,
+            "language": self.language,
+            "tools": self.tools,
+            **{f"{stage}_ms": round(self.stages[stage] * 1000, 1) for stage in STAGES if stage in self.stages},
+        }
+
+    def report(self) -> str:
+        first_audio = self.stages.get("first_audio")
+        parts = ", ".join(
+            f"{stage} {self.stages[stage] * 1000:.0f}" for stage in STAGES[:-1] if stage in self.stages
+        )
+        tools = f", {'/'.join(self.tools)}" if self.tools else ""
+        heard = f"{first_audio * 1000:.0f} ms" if first_audio is not None else "n/a"
+        return f"Turn timing ({self.language}{tools}): first audio {heard} ({parts} ms)"
+
+
+def stage_percentiles(records: Iterable[Dict], key: str) -> Dict[str, Dict[str, Dict]]:
+    """p50/p95/p99 and count of each stage (ms) for turn records grouped by ``key``.
+
+    ``key`` is a record field: ``language``, ``release`` or ``tools``. A turn
+    counts once for each tool it called, and turns without tools are grouped
+    as ``(none)``.
+    """
+    groups: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for record in records:
+        value = record.get(key)
+        for group in (value if isinstance(value, list) else [value]) or ["(none)"]:
+            for stage in STAGES:
+                ms = record.get(f"{stage}_ms")
+                if ms is not None:
+                    groups[str(group)][stage].append(ms)
+    return {
+        group: {
+            stage: {"count": len(values), **{f"p{p}": percentile(values, p) for p in PERCENTILES}}
+            for stage, values in stages.items()
+        }
+        for group, stages in groups.items()
+    }
+
+
+class TurnLog:
+    """Append-only JSON-lines log of turn records, rotated by size."""
+
+    def __init__(self, path: str = TURN_LOG_PATH, max_bytes: int = TURN_LOG_MAX_BYTES, backups: int = TURN_LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def append_sync(self, record: Dict):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    async def append(self, record: Dict):
+        try:
+            await asyncio.to_thread(self.append_sync, record)
+        except OSError as e:
+            logger.warning(f"Error writing turn log {self.path}: {e}")
+
+    def read(self) -> List[Dict]:
+        """Every record still on disk, oldest first."""
+        paths = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)] + [self.path]
+        records = []
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            records.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+        return records
+
+
+class TurnStats:
+    """Rolling per-stage latency windows for the process, per language and per tool."""
+
+    def __init__(self, maxlen: int = 500):
+        self._maxlen = maxlen
+        self.windows: Dict[Tuple[str, str, str], LatencyWindow] = {}
+        self.turns = 0
+
+    def _window(self, dimension: str, group: str, stage: str) -> LatencyWindow:
+        key = (dimension, group, stage)
+        if key not in self.windows:
+            self.windows[key] = LatencyWindow(maxlen=self._maxlen)
+        return self.windows[key]
+
+    def record(self, turn: TurnTiming):
+        self.turns += 1
+        for stage, seconds in turn.stages.items():
+            self._window("language", turn.language, stage).record(seconds)
+            for tool in turn.tools or ["(none)"]:
+                self._window("tool", tool, stage).record(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Dict]]]:
+        """``{dimension: {group: {stage: {p50, p95, p99 (ms), count}}}}``."""
+        result: Dict[str, Dict[str, Dict[str, Dict]]] = defaultdict(lambda: defaultdict(dict))
+        for (dimension, group, stage), window in sorted(self.windows.items()):
+            result[dimension][group][stage] = {
+                "count": len(window),
+                **{f"p{p}": round(window.percentile(p) * 1000, 1) for p in PERCENTILES},
+            }
+        return result
+
+    def report(self) -> str:
+        lines = [f"Turn latency over the last {self.turns} turns (first audio p50/p95/p99 ms):"]
+        for dimension, groups in self.snapshot().items():
+            for group, stages in groups.items():
+                first_audio = stages.get("first_audio")
+                if first_audio:
+                    lines.append(
+                        f"  {dimension} {group}: {first_audio['p50']:.0f} / {first_audio['p95']:.0f} / "
+                        f"{first_audio['p99']:.0f} ({first_audio['count']} turns)"
+                    )
+        return "\n".join(lines)
+
+
+_turn_stats: Optional[TurnStats] = None
+
+
+def get_turn_stats() -> TurnStats:
+    """Return the process-wide turn statistics."""
+    global _turn_stats
+    if _turn_stats is None:
+        _turn_stats = TurnStats()
+    return _turn_stats
+
+
+class TurnRecorder:
+    """Time each turn of ``session`` from the ``AgentSession`` events and the agent's tool spans."""
+
+    def __init__(
+        self,
+        session,
+        language: Callable[[], str],
+        owner=None,
+        log: Optional[TurnLog] = None,
+        stats: Optional[TurnStats] = None,
+    ):
+        self.language = language
+        self.owner = owner
+        self.log = log or TurnLog()
+        self.stats = stats or get_turn_stats()
+        self._turn: Optional[TurnTiming] = None
+        self._writes: List[asyncio.Future] = []
+        session.on("user_state_changed", self._on_user_state_changed)
+        session.on("agent_state_changed", self._on_agent_state_changed)
+        session.on("metrics_collected", self._on_metrics_collected)
+        session.on("close", lambda _: self._finish())
+        get_tracer().add_listener(self._on_span)
+
+    def _on_user_state_changed(self, event):
+        if event.new_state == "speaking":
+            self._finish()
+        elif event.old_state == "speaking":
+            self._finish()
+            self._turn = TurnTiming(
+                language=self.language(), started_at=getattr(event, "created_at", None) or time.time()
+            )
+
+    def _on_agent_state_changed(self, event):
+        turn = self._turn
+        if turn is not None and event.new_state == "speaking" and "first_audio" not in turn.stages:
+            created_at = getattr(event, "created_at", None) or time.time()
+            turn.stages["first_audio"] = max(created_at - turn.started_at, 0.0)
+
+    def _on_metrics_collected(self, event):
+        turn = self._turn
+        if turn is None:
+            return
+        metrics = event.metrics
+        kind = getattr(metrics, "type", None)
+        # Only the first LLM call and TTS request of the turn are on the path to first audio
+        if kind == "eou_metrics":
+            turn.stages.setdefault("stt_final", metrics.transcription_delay)
+            turn.stages.setdefault("end_of_turn", metrics.end_of_utterance_delay)
+            turn.stages.setdefault("turn_hook", metrics.on_user_turn_completed_delay)
+        elif kind == "llm_metrics" and metrics.ttft >= 0:
+            turn.stages.setdefault("llm_ttft", metrics.ttft)
+        elif kind == "tts_metrics" and metrics.ttfb >= 0:
+            turn.stages.setdefault("tts_ttfb", metrics.ttfb)
+
+    def _on_span(self, finished: Span):
+        turn = self._turn
+        if (
+            turn is None
+            or finished.kind != "tool"
+            or finished.owner is not self.owner
+            or finished.start_ns / 1e9 < turn.started_at
+        ):
+            return
+        turn.stages["tool"] = turn.stages.get("tool", 0.0) + finished.duration
+        # Every call counts towards the tool stage, but a tool is listed (and grouped) once per turn
+        if finished.name not in turn.tools:
+            turn.tools.append(finished.name)
+
+    def _finish(self):
+        turn, self._turn = self._turn, None
+        # A pause the user spoke through never got a reply; there is nothing to time
+        if turn is None or not {"first_audio", "llm_ttft"} & turn.stages.keys():
+            return
+        self.stats.record(turn)
+        logger.info(turn.report())
+        if self.stats.turns % REPORT_EVERY_TURNS == 0:
+            logger.info(self.stats.report())
+        self._writes = [w for w in self._writes if not w.done()]
+        self._writes.append(asyncio.ensure_future(self.log.append(turn.to_record())))
+
+    async def aclose(self):
+        """Write the open turn and wait for pending log writes."""
+        self._finish()
+        get_tracer().remove_listener(self._on_span)
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
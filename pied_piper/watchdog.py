@@ -0,0 +1,239 @@
+"""Event-loop lag watchdog for the agent worker process.
+
+All sessions in a worker share one event loop, and their audio is paced by
+it. A coroutine step that runs synchronous code for too long delays every
+session at once and is heard as a glitch. Examples are a blocking HTTP
+client, opening a browser, or heavy parsing.
+
+The watchdog has two halves. A task on the loop sleeps for a short interval
+and records how late it wakes up; that delay is the loop lag. A daemon thread
+watches the task's heartbeat. When the loop has not come back for longer than
+the threshold, the thread captures the loop thread's stack while the step is
+still running. The warning therefore shows the blocking code, not just how
+long it took. Steps are attributed to the function tool they ran under: tools
+are registered with ``tool_scope``, and the stack is searched for the
+innermost registered tool. Lag percentiles and per-tool block counts are
+logged periodically and returned by ``snapshot()``.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict
+from dataclasses import dataclass
+from types import CodeType, FrameType
+from typing import Dict, List, Optional
+
+from pied_piper.stats import LatencyWindow
+
+logger = logging.getLogger("multilingual-pipey")
+
+BLOCK_THRESHOLD_MS = float(os.environ.get("PIPEY_BLOCK_THRESHOLD_MS", "100"))
+SAMPLE_INTERVAL_MS = 50.0
+REPORT_INTERVAL_SECONDS = float(os.environ.get("PIPEY_WATCHDOG_REPORT_SECONDS", "60"))
+STACK_DEPTH = 12
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+# Code object of every function registered with tool_scope -> tool name
+_TOOL_CODES: Dict[CodeType, str] = {}
+
+
+def tool_scope(fn):
+    """Register ``fn`` as a tool so blocking steps inside it are attributed to it.
+
+    The function is returned unchanged. Place the decorator below
+    ``@function_tool``.
+    """
+    _TOOL_CODES[fn.__code__] = fn.__name__
+    return fn
+
+
+@dataclass
+class BlockedStep:
+    tag: str
+    location: str
+    stack: str
+    seconds: float = 0.0
+
+
+def _loop_frames(frame: FrameType) -> List[FrameType]:
+    """Frames of the step the loop is running, outermost first, without the loop's own frames."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    for i in range(len(frames) - 1, -1, -1):
+        code = frames[i].f_code
+        if code.co_name == "_run" and code.co_filename.startswith(_ASYNCIO_DIR):
+            return frames[i + 1:] or frames
+    return frames
+
+
+def capture_step(frame: FrameType) -> BlockedStep:
+    """Describe the step running in ``frame``: tool tag, innermost location and stack."""
+    frames = _loop_frames(frame)
+    tag = next((_TOOL_CODES[f.f_code] for f in reversed(frames) if f.f_code in _TOOL_CODES), None)
+    if tag is None:
+        # Not inside a tool: name the coroutine or callback the loop was stepping
+        tag = f"{frames[0].f_code.co_name} (no tool)" if frames else "(unknown)"
+    stack = traceback.StackSummary.extract(((f, f.f_lineno) for f in frames[-STACK_DEPTH:]))
+    innermost = stack[-1] if stack else None
+    location = f"{os.path.basename(innermost.filename)}:{innermost.lineno} in {innermost.name}" if innermost else "?"
+    return BlockedStep(tag=tag, location=location, stack="".join(stack.format()))
+
+
+class LoopWatchdog:
+    """Sample event-loop lag and capture the stack of steps that block the loop."""
+
+    def __init__(
+        self,
+        threshold_ms: float = BLOCK_THRESHOLD_MS,
+        interval_ms: float = SAMPLE_INTERVAL_MS,
+        report_interval: float = REPORT_INTERVAL_SECONDS,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.report_interval = report_interval
+        self.lag = LatencyWindow(maxlen=2000)
+        self.max_lag = 0.0
+        self.samples = 0
+        self.block_counts: Dict[str, int] = defaultdict(int)
+        self.blocked_seconds: Dict[str, float] = defaultdict(float)
+        self.max_blocked: Dict[str, float] = defaultdict(float)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._pending: Optional[BlockedStep] = None
+        self._logged_locations = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start watching the running loop; a no-op if it is already watched."""
+        loop = asyncio.get_running_loop()
+        if self.running and self._loop is loop:
+            return
+        self.stop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        # Each thread gets its own stop event, so a restart cannot revive the old thread
+        self._stopped = threading.Event()
+        self._task = loop.create_task(self._sample())
+        self._thread = threading.Thread(
+            target=self._watch, args=(self._stopped,), name="pipey-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Event-loop watchdog started (threshold {self.threshold * 1000:.0f} ms, "
+            f"sampling every {self.interval * 1000:.0f} ms)"
+        )
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # Not joined: stop() runs on the loop, and the thread exits within one interval on its own event
+        self._thread = None
+
+    async def _sample(self):
+        last_report = time.monotonic()
+        while True:
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - self._heartbeat - self.interval, 0.0)
+            self.lag.record(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self.samples += 1
+            with self._lock:
+                blocked, self._pending = self._pending, None
+            if blocked is not None:
+                blocked.seconds = lag
+                self._record_block(blocked)
+            if self.report_interval and now - last_report >= self.report_interval:
+                last_report = now
+                self._logged_locations.clear()
+                logger.info(self.report())
+
+    def _watch(self, stopped: threading.Event):
+        """Watchdog thread: capture the loop's stack once per stall that exceeds the threshold."""
+        while not stopped.wait(self.interval):
+            if time.monotonic() - self._heartbeat - self.interval < self.threshold:
+                continue
+            with self._lock:
+                if self._pending is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._pending = capture_step(frame)
+
+    def _record_block(self, blocked: BlockedStep):
+        self.block_counts[blocked.tag] += 1
+        self.blocked_seconds[blocked.tag] += blocked.seconds
+        self.max_blocked[blocked.tag] = max(self.max_blocked[blocked.tag], blocked.seconds)
+        # Full stacks once per location per report interval; repeats get one line
+        if blocked.location in self._logged_locations:
+            logger.warning(
+                f"Event loop blocked for {blocked.seconds * 1000:.0f} ms in {blocked.tag} at {blocked.location}"
+            )
+            return
+        self._logged_locations.add(blocked.location)
+        logger.warning(
+            f"Event loop blocked for {blocked.seconds * 1000:.0f} ms in {blocked.tag} "
+            f"at {blocked.location}:\n{blocked.stack.rstrip()}"
+        )
+
+    def snapshot(self) -> Dict:
+        """Current lag statistics (milliseconds) and blocked steps per tool."""
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 1)
+
+        return {
+            "samples": self.samples,
+            "lag_p50_ms": ms(self.lag.percentile(50)),
+            "lag_p95_ms": ms(self.lag.percentile(95)),
+            "lag_p99_ms": ms(self.lag.percentile(99)),
+            "lag_max_ms": ms(self.max_lag),
+            "blocked_steps": {
+                tag: {
+                    "count": count,
+                    "total_ms": ms(self.blocked_seconds[tag]),
+                    "max_ms": ms(self.max_blocked[tag]),
+                }
+                for tag, count in sorted(self.block_counts.items())
+            },
+        }
+
+    def report(self) -> str:
+        snap = self.snapshot()
+        blocked = ", ".join(f"{tag} x{s['count']}" for tag, s in snap["blocked_steps"].items()) or "none"
+        return (
+            f"Event-loop lag p50/p95/p99/max: {snap['lag_p50_ms']} / {snap['lag_p95_ms']} / "
+            f"{snap['lag_p99_ms']} / {snap['lag_max_ms']} ms over {snap['samples']} samples; "
+            f"blocked steps: {blocked}"
+        )
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def get_watchdog() -> LoopWatchdog:
+    """Return the process-wide watchdog."""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = LoopWatchdog()
+    return _watchdog